@@ -0,0 +1,271 @@
+import argparse
+import heapq
+import itertools
+import json
+import sys
+from functools import lru_cache
+from multiprocessing import Pool
+from settings import *
+
+# offline puzzle checker - reads level_N.json and works out which rooms / doors / switches
+# can actually be reached b4 the memories they need fade away.
+#
+# this doesnt simulate physics. getting from A 2 B costs the walking time 4 the
+# manhattan distance (times --slack 4 jumps, detours etc). everything else follows the
+# game rules:
+#   - has_memory() is only true until a memory's duration runs out (red never fades)
+#   - doors need the memory when u press E, then take open_duration 2 swing open
+#   - switches need their memory, levers dont, both only fire once
+#   - rooms keep their state between visits, so orbs are gone once taken,
+#     mechanisms stay flipped and opened doors stay open (no memory, no wait next time)
+#
+# search state = (room, where u stand, taken/flipped bits 4 every room, time left on
+# each memory type). memory time is stored relative 2 "now" so revisiting a state
+# at a different clock time still hits the transposition table, and a state is pruned
+# when an already-seen one has at least as much time left on every memory
+
+DOOR_OPEN_MS = 1000
+PERMANENT = 10 ** 9
+MEMORY_ORDER = tuple(sorted(MEMORY_TYPES))
+QUANTUM_MS = 250  # memory time gets rounded down 2 this so near-identical states merge
+SERIAL_FIRST = 20000  # --jobs tries this many states in one process b4 sharding
+
+
+class RoomGraph:
+    def __init__(self, level_data, slack=1.5):
+        self.slack = slack
+        self.start = (level_data["player_start"]["x"], level_data["player_start"]["y"])
+        self.rooms = {}
+        self.room_index = {name: i for i, name in enumerate(level_data["rooms"])}
+        self.missing_rooms = set()
+
+        for name, room in level_data["rooms"].items():
+            nodes = []
+            for i, orb in enumerate(room.get("memory_orbs", [])):
+                duration = orb.get("duration")
+                if duration is None:
+                    duration = MEMORY_TYPES[orb["memory_type"]]["duration"]
+                nodes.append({"kind": "orb", "index": i, "pos": (orb["x"], orb["y"]),
+                              "memory": orb["memory_type"], "duration": duration})
+            for i, door in enumerate(room.get("doors", [])):
+                nodes.append({"kind": "door", "index": i,
+                              "pos": (door["x"] + door["width"] // 2, door["y"] + door["height"] // 2),
+                              "memory": door["required_memory"], "target": door["target_room"],
+                              "entry": (door.get("target_x", 0), door.get("target_y", 0))})
+                if door["target_room"] and door["target_room"] not in level_data["rooms"]:
+                    self.missing_rooms.add(door["target_room"])
+            for i, lever in enumerate(room.get("levers", [])):
+                nodes.append({"kind": "lever", "index": i, "pos": (lever["x"], lever["y"]), "memory": None})
+            for i, switch in enumerate(room.get("switches", [])):
+                nodes.append({"kind": "switch", "index": i, "pos": (switch["x"], switch["y"]),
+                              "memory": switch["required_memory"]})
+
+            # each orb / mechanism gets a bit in its room's state mask
+            for bit, node in enumerate(nodes):
+                node["bit"] = 1 << bit
+            self.rooms[name] = nodes
+
+    @lru_cache(maxsize=None)
+    def travel_ms(self, a, b):
+        distance = abs(a[0] - b[0]) + abs(a[1] - b[1])
+        return int(distance / PLAYER_SPEED * 1000 / FPS * self.slack)
+
+
+def initial_memories():
+    return tuple(0 for _ in MEMORY_ORDER)
+
+
+def decay(memories, elapsed):
+    return tuple(left if left >= PERMANENT else max(0, left - elapsed) for left in memories)
+
+
+def holds(memories, memory_type):
+    return memory_type is None or memories[MEMORY_ORDER.index(memory_type)] > 0
+
+
+def dominated(seen, memories):
+    for other in seen:
+        if all(a >= b for a, b in zip(other, memories)):
+            return True
+    return False
+
+
+def successors(graph, state):
+    # every single thing u could walk over and do from here
+    elapsed, room, pos, flags, memories = state
+    slot_room = graph.room_index.get(room)
+    done = flags[slot_room] if slot_room is not None else 0
+    for node in graph.rooms.get(room, []):
+        opened = node["bit"] & done
+        if opened and node["kind"] != "door":
+            continue
+        flags_after = flags[:slot_room] + (done | node["bit"],) + flags[slot_room + 1:]
+        travel = graph.travel_ms(pos, node["pos"])
+        arrived = decay(memories, travel)
+
+        if node["kind"] == "orb":
+            left = PERMANENT if node["duration"] is None else node["duration"]
+            slot = MEMORY_ORDER.index(node["memory"])
+            memories_after = arrived[:slot] + (max(arrived[slot], left),) + arrived[slot + 1:]
+            yield ("orb", room, node), (elapsed + travel, room, node["pos"], flags_after, memories_after)
+
+        elif node["kind"] == "door":
+            if not node["target"]:
+                continue
+            if opened:  # still open from last time, just walk thru
+                yield ("door", room, node), (elapsed + travel, node["target"], node["entry"], flags, arrived)
+            elif holds(arrived, node["memory"]):
+                # wait 4 it 2 open, then walk thru
+                yield ("door", room, node), (elapsed + travel + DOOR_OPEN_MS, node["target"], node["entry"],
+                                            flags_after, decay(arrived, DOOR_OPEN_MS))
+
+        elif holds(arrived, node["memory"]):  # lever / switch
+            yield (node["kind"], room, node), (elapsed + travel, room, node["pos"], flags_after, arrived)
+
+
+def quantize(memories):
+    return tuple(left if left >= PERMANENT else left // QUANTUM_MS * QUANTUM_MS for left in memories)
+
+
+def search(graph, seeds, max_states=2000000):
+    """Earliest-time search from the seed states. Returns (rooms, used, explored)."""
+    rooms = {}  # room -> earliest ms
+    used = {}   # (kind, room, index) -> earliest ms
+    table = {}  # (room, pos, flags) -> non-dominated memory vectors
+    counter = itertools.count()
+    heap = [(s[0], next(counter), s) for s in seeds]
+    heapq.heapify(heap)
+    explored = 0
+    # everything there is 2 find, once its all found + nothing left can beat it we're done
+    wanted = sum(1 for nodes in graph.rooms.values() for node in nodes
+                 if node["kind"] != "orb" and (node["kind"] != "door" or node["target"]))
+
+    while heap and explored < max_states:
+        found = len(used) == wanted and rooms.keys() >= graph.rooms.keys()
+        if found and heap[0][0] >= max(used.values(), default=0):
+            break  # states come out in time order, so every later use would be later still
+        _, _, state = heapq.heappop(heap)
+        elapsed, room, pos, flags, memories = state
+        memories = quantize(memories)
+
+        key = (room, pos, flags)
+        seen = table.setdefault(key, [])
+        if dominated(seen, memories):
+            continue
+        # anything this one beats is dead weight now
+        seen[:] = [m for m in seen if not all(a >= b for a, b in zip(memories, m))]
+        seen.append(memories)
+        explored += 1
+
+        if room not in rooms:
+            rooms[room] = elapsed
+
+        for (kind, at_room, node), nxt in successors(graph, (elapsed, room, pos, flags, memories)):
+            if kind != "orb":
+                use_key = (kind, at_room, node["index"])
+                used[use_key] = min(nxt[0], used.get(use_key, nxt[0]))
+            heapq.heappush(heap, (nxt[0], next(counter), nxt))
+
+    return rooms, used, explored
+
+
+def start_state(graph):
+    return (0, "start", graph.start, tuple(0 for _ in graph.room_index), initial_memories())
+
+
+def _search_shard(args):
+    level_path, slack, seeds, max_states = args
+    with open(level_path, 'r') as file:
+        graph = RoomGraph(json.load(file), slack)
+    return search(graph, seeds, max_states)
+
+
+def analyze(level_path, slack=1.5, jobs=1, max_states=2000000):
+    with open(level_path, 'r') as file:
+        graph = RoomGraph(json.load(file), slack)
+
+    if jobs <= 1:
+        return graph, search(graph, [start_state(graph)], max_states)
+
+    # a level where everything gets found stops early (see search), shards cant since
+    # none of them sees everything. so try it in one go first
+    budget = min(SERIAL_FIRST, max_states)
+    result = search(graph, [start_state(graph)], budget)
+    if result[2] < budget:
+        return graph, result
+
+    # shard by first move: each process takes a slice of the opening branches.
+    # tables arent shared so some work gets repeated, but each shard finds the earliest
+    # time along its own branches, so the min over shards is the same as one big search
+    # (only the explored count comes out bigger)
+    opening = list(successors(graph, start_state(graph)))
+    first = [nxt for _, nxt in opening]
+    shards = [first[i::jobs] for i in range(jobs)]
+    shards = [shard for shard in shards if shard]
+    with Pool(processes=len(shards)) as pool:
+        parts = pool.map(_search_shard, [(level_path, slack, shard, max_states) for shard in shards])
+
+    rooms = {"start": 0}
+    used = {}
+    explored = 1
+    for part_rooms, part_used, part_explored in parts:
+        for room, at in part_rooms.items():
+            rooms[room] = min(at, rooms.get(room, at))
+        for key, at in part_used.items():
+            used[key] = min(at, used.get(key, at))
+        explored += part_explored
+
+    # the opening moves themselves count as used, at the time they happen (like search does)
+    for (kind, room, node), nxt in opening:
+        if kind != "orb":
+            key = (kind, room, node["index"])
+            used[key] = min(nxt[0], used.get(key, nxt[0]))
+    return graph, (rooms, used, explored)
+
+
+def report(graph, result):
+    rooms, used, explored = result
+    problems = 0
+    print(f"explored {explored} states\n")
+    for room, nodes in graph.rooms.items():
+        if room in rooms:
+            print(f"{room}: reachable @ {rooms[room] / 1000:.1f}s")
+        else:
+            print(f"{room}: UNREACHABLE")
+            problems += 1
+        for node in nodes:
+            if node["kind"] == "orb":
+                continue
+            label = f"{node['kind']} {node['index']}"
+            if node["kind"] == "door":
+                label += f" -> {node['target']}"
+            if node["memory"]:
+                label += f" (needs {node['memory']})"
+            at = used.get((node["kind"], room, node["index"]))
+            if at is None:
+                print(f"    {label}: never usable")
+                problems += 1
+            else:
+                print(f"    {label}: ok @ {at / 1000:.1f}s")
+
+    for room in sorted(graph.missing_rooms):
+        print(f"doors lead 2 missing room '{room}'")
+        problems += 1
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="check that a level's rooms and exits are reachable")
+    parser.add_argument("level", help="level json file")
+    parser.add_argument("--slack", type=float, default=1.5, help="travel time multiplier (default 1.5)")
+    parser.add_argument("--jobs", type=int, default=1, help="shard the search across processes")
+    parser.add_argument("--max-states", type=int, default=2000000, help="give up after this many states")
+    args = parser.parse_args()
+
+    graph, result = analyze(args.level, args.slack, args.jobs, args.max_states)
+    problems = report(graph, result)
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+import bisect
+
+# sweep and prune broadphase 4 the stuff that moves or gets touched - orbs, ghosts, doors,
+# levers, switches, platforms, players. every body has a min + max endpoint on the x axis.
+#
+# static bodies (orbs, doors, levers, switches) sit in one sorted list that only changes when
+# something gets added or removed, their overlaps with each other never change after that.
+# the moving ones (player, platforms, ghosts) have their own small list. things only move a
+# few px a tick so it's nearly sorted already and an insertion sort fixes it in ~O(n + swaps),
+# every swap is exactly the moment two moving bodies start / stop overlapping on x. each
+# moving body then bisects in2 the static list 4 what it overlaps now. so a tick costs the
+# moving bodies + what they touch, 5000 orbs sitting still r free
+
+MAX, MIN = 0, 1  # at the same x a max sorts first, touching edges dont overlap (like colliderect)
+
+
+class Body:
+    __slots__ = ("id", "obj", "kind", "pad", "lo", "hi", "statics")
+
+    def __init__(self, body_id, obj, kind, pad, dynamic):
+        self.id = body_id
+        self.obj = obj
+        self.kind = kind
+        self.pad = pad
+        self.lo = [0, MIN, body_id]  # endpoints r lists so the sort can move them around
+        self.hi = [0, MAX, body_id]
+        self.statics = set() if dynamic else None  # static bodies a moving one overlaps
+        self.refresh()
+
+    def refresh(self):
+        rect = self.obj.rect
+        self.lo[0] = rect.left - self.pad
+        self.hi[0] = rect.right + self.pad
+
+
+class SweepAndPrune:
+    def __init__(self):
+        self.static = []  # endpoints of bodies that never move, always sorted
+        self.moving = []  # endpoints of the dynamic bodies, sorted by update()
+        self.bodies = {}  # id -> Body
+        self.by_obj = {}  # entity -> Body
+        self.dynamic = []  # bodies re-read every tick
+        self.overlaps = {}  # id -> ids of bodies overlapping it on x
+        self.widest = 0  # widest static body, how far left of a spot 2 start looking
+        self.next_id = 0
+        self.dirty = False  # something got added or jumped, re-sort from scratch next time
+
+    def __contains__(self, obj):
+        return obj in self.by_obj
+
+    def add(self, obj, kind, pad=0, dynamic=False):
+        body = Body(self.next_id, obj, kind, pad, dynamic)
+        self.next_id += 1
+        self.bodies[body.id] = body
+        self.by_obj[obj] = body
+        self.overlaps[body.id] = set()
+        if dynamic:
+            self.dynamic.append(body)
+            self.moving += (body.lo, body.hi)
+        else:
+            self.static += (body.lo, body.hi)
+            self.widest = max(self.widest, body.hi[0] - body.lo[0])
+        self.dirty = True
+
+    def remove(self, obj):
+        body = self.by_obj.pop(obj, None)
+        if body is None:
+            return
+        del self.bodies[body.id]
+        endpoints = self.static
+        if body.statics is not None:
+            self.dynamic.remove(body)
+            endpoints = self.moving
+        endpoints.remove(body.lo)
+        endpoints.remove(body.hi)
+        for other in self.overlaps.pop(body.id):
+            self.overlaps[other].discard(body.id)
+            statics = self.bodies[other].statics
+            if statics is not None:
+                statics.discard(body.id)
+
+    def rebuild(self):
+        # full sort + sweep, after bodies get added or moved without update() seeing it
+        for body in self.bodies.values():
+            body.refresh()
+        self.static.sort()
+        self.moving.sort()
+        self.overlaps = {body_id: set() for body_id in self.bodies}
+        active = set()
+        for _, kind, body_id in sorted(self.static + self.moving):
+            if kind == MIN:
+                for other in active:
+                    self.overlaps[body_id].add(other)
+                    self.overlaps[other].add(body_id)
+                active.add(body_id)
+            else:
+                active.discard(body_id)
+        for body in self.dynamic:
+            body.statics = {other for other in self.overlaps[body.id] if self.bodies[other].statics is None}
+        self.dirty = False
+
+    def update(self):
+        """Re-read the moving bodies, once a tick after everything has moved."""
+        if self.dirty:
+            self.rebuild()
+            return
+        for body in self.dynamic:
+            body.refresh()
+
+        endpoints, bodies, overlaps = self.moving, self.bodies, self.overlaps
+        for i in range(1, len(endpoints)):
+            ep = endpoints[i]
+            j = i - 1
+            while j >= 0 and endpoints[j] > ep:
+                other = endpoints[j]
+                a, b = ep[2], other[2]
+                if ep[1] == MIN and other[1] == MAX:
+                    # our min slid left past their max - overlap starts if the other side agrees
+                    if bodies[b].lo[0] < bodies[a].hi[0]:
+                        overlaps[a].add(b)
+                        overlaps[b].add(a)
+                elif ep[1] == MAX and other[1] == MIN:
+                    # our max slid left past their min - not overlapping anymore
+                    overlaps[a].discard(b)
+                    overlaps[b].discard(a)
+                endpoints[j + 1] = other
+                j -= 1
+            endpoints[j + 1] = ep
+
+        for body in self.dynamic:
+            now = set(self.static_ids(body.lo[0], body.hi[0], strict=True))
+            for other in body.statics - now:
+                overlaps[body.id].discard(other)
+                overlaps[other].discard(body.id)
+            for other in now - body.statics:
+                overlaps[body.id].add(other)
+                overlaps[other].add(body.id)
+            body.statics = now
+
+    def static_ids(self, left, right, strict=False):
+        # static bodies whose x range overlaps left..right (strict = touching doesnt count)
+        endpoints, bodies = self.static, self.bodies
+        # nothing that starts further left than the widest body could still reach us
+        start = bisect.bisect_left(endpoints, [left - self.widest, MAX, -1])
+        stop = bisect.bisect_left(endpoints, [right, MAX, -1]) if strict else \
+            bisect.bisect_right(endpoints, [right, MIN, self.next_id])
+        for _, end, body_id in endpoints[start:stop]:
+            if end == MIN:
+                hi = bodies[body_id].hi[0]
+                if hi > left or (hi == left and not strict):
+                    yield body_id
+
+    def near(self, obj, kind=None):
+        """Bodies overlapping obj on x (kind = only that kind), in the order they were added."""
+        if self.dirty:
+            self.rebuild()
+        body = self.by_obj.get(obj)
+        if body is None:
+            return []
+        bodies = self.bodies
+        return [bodies[other].obj for other in sorted(self.overlaps[body.id])
+                if kind is None or bodies[other].kind == kind]
+
+    def query(self, left, right, kind=None):
+        """Bodies whose x range touches [left, right], in the order they were added."""
+        if self.dirty:
+            self.rebuild()
+        found = [self.bodies[body_id] for body_id in self.static_ids(left, right)]
+        found += [body for body in self.dynamic if body.hi[0] >= left and body.lo[0] <= right]
+        found = [body for body in found if kind is None or body.kind == kind]
+        found.sort(key=lambda body: body.id)
+        return [body.obj for body in found]
@@ -0,0 +1,234 @@
+import io
+import json
+import mmap
+import os
+import struct
+import pygame
+from settings import *
+
+# asset bundle - the whole assets/ tree packed into one file so startup is one open + one
+# mmap instead of dozens of tiny reads (and doesnt care what folder u ran the game from).
+#
+#   header:  magic "ECHA", version, entry count
+#   index:   per entry - name length, offset, size, format (file extension), name
+#   data:    every file's bytes back 2 back
+#
+# names r the same relative paths the code already uses ("assets/tiles/grass.png"), so
+# callers dont change, they just go through asset() / image() / sound() / read_json().
+# loads get a View: a file-like window straight onto the mmap, no copy of the file first -
+# read() hands back memoryview slices of the map. pygame's file reader only takes bytes back
+# from read(), so image / sound / music loads get a PygameView that copies just the chunks
+# pygame asks 4, and json gets decoded straight off the map.
+# anything not in the bundle (or everything, in --dev) comes from the loose files instead,
+# and so does anything whose loose file got edited after the bundle was built - with a
+# warning, since it means the bundle wants re-packing
+#
+#   python bundle.py            pack assets/ into assets.pak
+#   python bundle.py --list     show whats in it
+
+MAGIC = b"ECHA"
+VERSION = 1
+HEADER = struct.Struct("<4sBI")
+ENTRY = struct.Struct("<HQI8s")
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+class BundleError(Exception):
+    pass
+
+
+class View(io.RawIOBase):
+    """Read-only file object over a slice of the mapped bundle, read() gives memoryviews."""
+
+    def __init__(self, data, name):
+        super().__init__()
+        self.data = data
+        self.name = name
+        self.pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = max(0, min(len(buffer), len(self.data) - self.pos))
+        buffer[:n] = self.data[self.pos:self.pos + n]
+        self.pos += n
+        return n
+
+    def read(self, size=-1):
+        end = len(self.data) if size is None or size < 0 else min(len(self.data), self.pos + size)
+        chunk = self.data[self.pos:end]
+        self.pos = max(self.pos, end)
+        return chunk
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.pos
+        elif whence == io.SEEK_END:
+            offset += len(self.data)
+        self.pos = max(0, offset)
+        return self.pos
+
+    def tell(self):
+        return self.pos
+
+
+class PygameView(View):
+    """View 4 pygame loads - its reader wants real bytes back from read()."""
+
+    def read(self, size=-1):
+        return bytes(super().read(size))
+
+
+class Bundle:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.built = os.fstat(self.file.fileno()).st_mtime_ns  # loose files newer than this r stale in here
+        self.data = memoryview(self.map)
+
+        magic, version, count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise BundleError(f"{path} isnt an asset bundle")
+        if version != VERSION:
+            raise BundleError(f"{path} is bundle version {version}, we read {VERSION}")
+
+        self.index = {}  # name -> (offset, size, format)
+        at = HEADER.size
+        for _ in range(count):
+            name_len, offset, size, fmt = ENTRY.unpack_from(self.data, at)
+            at += ENTRY.size
+            name = bytes(self.data[at:at + name_len]).decode("utf-8")
+            at += name_len
+            self.index[name] = (offset, size, fmt.rstrip(b"\0").decode("ascii"))
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def view(self, name, kind=View):
+        offset, size, _ = self.index[name]
+        return kind(self.data[offset:offset + size], name)
+
+
+def pack(source=os.path.join(ROOT, "assets"), out=os.path.join(ROOT, BUNDLE_PATH)):
+    entries = []
+    for folder, dirs, files in os.walk(source):
+        dirs.sort()
+        for filename in sorted(files):
+            full = os.path.join(folder, filename)
+            name = os.path.relpath(full, ROOT).replace(os.sep, "/")
+            fmt = os.path.splitext(filename)[1].lstrip(".").lower()[:8]
+            entries.append((name, full, os.path.getsize(full), fmt))
+
+    # work out where the data starts so the index can point straight at it
+    index_size = sum(ENTRY.size + len(name.encode("utf-8")) for name, _, _, _ in entries)
+    offset = HEADER.size + index_size
+
+    tmp = out + ".tmp"
+    with open(tmp, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(entries)))
+        for name, _, size, fmt in entries:
+            encoded = name.encode("utf-8")
+            file.write(ENTRY.pack(len(encoded), offset, size, fmt.encode("ascii")))
+            file.write(encoded)
+            offset += size
+        for _, full, _, _ in entries:
+            with open(full, "rb") as src:
+                file.write(src.read())
+    os.replace(tmp, out)
+    return len(entries), offset
+
+
+# --- the one bundle the game reads from ---
+
+bundle = None
+loose_only = False  # --dev: always read the loose files so edits show up
+_tried = False
+stale = set()  # bundled names we already warned about
+
+
+def mount(path=os.path.join(ROOT, BUNDLE_PATH)):
+    global bundle, _tried
+    _tried = True
+    try:
+        bundle = Bundle(path)
+    except (OSError, ValueError, struct.error, BundleError):
+        bundle = None  # no bundle (or a bad one), loose files it is
+    return bundle
+
+
+def loose_path(path):
+    if os.path.isabs(path) or os.path.exists(path):
+        return path
+    return os.path.join(ROOT, path)  # relative 2 the game, not wherever we got run from
+
+
+def asset(path, kind=View):
+    """Binary file object 4 path - a view into the bundle if its in there, else the loose file."""
+    if not loose_only:
+        if not _tried:
+            mount()
+        name = path.replace(os.sep, "/")
+        if bundle is not None and name in bundle and not newer_than_bundle(name, path):
+            return bundle.view(name, kind)
+    return open(loose_path(path), "rb")
+
+
+def newer_than_bundle(name, path):
+    # one stat per load, way cheaper than the open + read the bundle saves
+    try:
+        edited = os.stat(loose_path(path)).st_mtime_ns
+    except OSError:
+        return False  # shipped without loose files, the bundle is all there is
+    if edited <= bundle.built:
+        return False
+    if name not in stale:
+        stale.add(name)
+        print(f"bundle: {name} changed since {BUNDLE_PATH} was built, using the loose file (re-run bundle.py)")
+    return True
+
+
+def namehint(path):
+    return os.path.splitext(path)[1].lstrip(".")
+
+
+def image(path):
+    with asset(path, PygameView) as file:
+        return pygame.image.load(file, namehint(path))
+
+
+def sound(path):
+    with asset(path, PygameView) as file:
+        return pygame.mixer.Sound(file=file)
+
+
+def music(path):
+    # music streams while it plays, so the file object has 2 stay open - pygame holds on 2 it
+    pygame.mixer.music.load(asset(path, PygameView), namehint(path))
+
+
+def read_json(path):
+    with asset(path) as file:
+        return json.loads(str(file.read(), "utf-8"))  # decoded right off the map, no bytes copy first
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="pack assets/ into one bundle file")
+    parser.add_argument("--out", default=os.path.join(ROOT, BUNDLE_PATH))
+    parser.add_argument("--list", action="store_true", help="list the bundle instead of building it")
+    args = parser.parse_args()
+
+    if args.list:
+        packed = Bundle(args.out)
+        for name, (offset, size, fmt) in sorted(packed.index.items()):
+            print(f"{offset:10d} {size:9d} {fmt:5s} {name}")
+    else:
+        count, total = pack(out=args.out)
+        print(f"packed {count} files into {args.out} ({total} bytes)")
@@ -0,0 +1,71 @@
+import math
+
+# swept AABB helpers - instead of moving the full step and shoving the player back out,
+# we work out WHEN along the step the box first touches something and stop right there.
+# that way fast falls / big speeds cant skip over thin platforms
+
+EPSILON = 1e-6
+
+
+def sweep_aabb(x, y, w, h, dx, dy, box):
+    """Time of impact (0..1) of box (x, y, w, h) moving by (dx, dy) against a static rect.
+
+    Returns (toi, nx, ny) where (nx, ny) is the surface normal that got hit,
+    or None if the two never touch during this step.
+    """
+    # x axis entry/exit times
+    if dx > 0:
+        x_entry = (box.left - (x + w)) / dx
+        x_exit = (box.right - x) / dx
+    elif dx < 0:
+        x_entry = (box.right - x) / dx
+        x_exit = (box.left - (x + w)) / dx
+    elif x < box.right and x + w > box.left:
+        x_entry, x_exit = -math.inf, math.inf
+    else:
+        return None  # not moving sideways and not lined up = never touches
+
+    # same thing 4 y
+    if dy > 0:
+        y_entry = (box.top - (y + h)) / dy
+        y_exit = (box.bottom - y) / dy
+    elif dy < 0:
+        y_entry = (box.bottom - y) / dy
+        y_exit = (box.top - (y + h)) / dy
+    elif y < box.bottom and y + h > box.top:
+        y_entry, y_exit = -math.inf, math.inf
+    else:
+        return None
+
+    entry = max(x_entry, y_entry)
+    exit_ = min(x_exit, y_exit)
+
+    # already overlapping at the start or no overlap this step
+    if entry > exit_ or entry < -EPSILON or entry > 1.0:
+        return None
+    # just grazing past each other (exit at the same moment we enter)
+    if exit_ - entry <= EPSILON:
+        return None
+
+    # whichever axis entered last is the side we hit
+    if x_entry > y_entry:
+        return max(0.0, entry), (-1 if dx > 0 else 1), 0
+    return max(0.0, entry), 0, (-1 if dy > 0 else 1)
+
+
+def swept_bounds(x, y, w, h, dx, dy):
+    """Bounding box (left, top, right, bottom) covering the whole move - used 2 pick candidates."""
+    return (min(x, x + dx), min(y, y + dy), max(x, x + dx) + w, max(y, y + dy) + h)
+
+
+def penetration(x, y, w, h, box):
+    """Smallest push (px, py) that gets the box out of rect, or None if they dont overlap."""
+    overlap_x = min(x + w, box.right) - max(x, box.left)
+    overlap_y = min(y + h, box.bottom) - max(y, box.top)
+    if overlap_x <= EPSILON or overlap_y <= EPSILON:
+        return None
+
+    # push out along whichever axis is shallower
+    if overlap_x < overlap_y:
+        return (-overlap_x if x + w / 2 < box.centerx else overlap_x), 0
+    return 0, (-overlap_y if y + h / 2 < box.centery else overlap_y)
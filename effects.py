@@ -0,0 +1,184 @@
+import pygame
+from itertools import repeat
+from settings import *
+
+try:
+    import numpy as np
+except ImportError:  # effects are optional, the game runs fine without numpy
+    np = None
+
+# particle effects - one big preallocated pool of numpy arrays (position, velocity, life...)
+# so spawning / killing particles never makes python objects, everything moves in one
+# vectorized step, and drawing is one Surface.blits() per cached dot sprite (one per
+# color x fade step) with the spots straight out of the arrays.
+#
+# the scratch space 4 a tick is preallocated 2: dead particles get packed out thru an index
+# buffer (cumsum gives every live one its new slot) + spare arrays, and draw works out
+# screen spots + sprite ids in buffers of its own, so a frame doesnt build a list per particle
+
+FADE_STEPS = 8
+DOT_RADIUS = 3
+
+# name: (count, min speed, max speed, min life, max life, gravity, spread up)
+PRESETS = {
+    "collect": (40, 1.0, 4.0, 30, 50, -0.03, 0.0),
+    "fade": (25, 0.3, 1.2, 40, 70, -0.02, 0.5),
+    "death": (90, 2.0, 6.0, 30, 60, 0.2, 1.5),
+    "door": (30, 0.5, 2.0, 25, 45, 0.05, 1.0),
+}
+DEFAULT_COLORS = {"death": (220, 220, 255), "door": (160, 150, 140)}
+
+
+class EffectsEngine:
+    def __init__(self, capacity=PARTICLE_CAPACITY, budget=PARTICLE_BUDGET, enabled=True, seed=None):
+        self.enabled = enabled and np is not None
+        self.capacity = capacity
+        self.budget = budget  # most particles spawned in one frame
+        self.density = 1.0  # quality knob, scales every burst
+        self.spawned = 0
+        self.count = 0
+
+        self.colors = []  # color index -> rgb
+        self.color_index = {}
+        self.frames = []  # color index * FADE_STEPS + fade step -> dot surface
+
+        if not self.enabled:
+            return
+        self.rng = np.random.default_rng(seed)
+        self.pos = np.zeros((capacity, 2), np.float32)
+        self.vel = np.zeros((capacity, 2), np.float32)
+        self.gravity = np.zeros(capacity, np.float32)
+        self.life = np.zeros(capacity, np.float32)
+        self.max_life = np.ones(capacity, np.float32)
+        self.color = np.zeros(capacity, np.int32)
+
+        # scratch, so update + draw dont allocate per frame
+        self.mask = np.empty(capacity, bool)
+        self.mask2 = np.empty(capacity, bool)
+        self.slot = np.empty(capacity, np.intp)  # where each live particle goes when packing
+        self.order = np.empty(capacity + 1, np.intp)  # live particles in order, the extra slot soaks up dead ones
+        self.every = np.arange(capacity, dtype=np.intp)
+        self.spare = {array.shape: np.empty_like(array) for array in (self.pos, self.life)}
+        self.spare_color = np.empty_like(self.color)
+        self.screen = np.empty((capacity, 2), np.float32)
+        self.dest = np.empty((capacity, 2), np.int32)
+        self.fade = np.empty(capacity, np.float32)
+        self.frame_id = np.empty(capacity, np.int32)
+
+    def clear(self):
+        self.count = 0
+
+    def _color_id(self, color):
+        color = tuple(color[:3])
+        index = self.color_index.get(color)
+        if index is None:
+            index = len(self.colors)
+            self.color_index[color] = index
+            self.colors.append(color)
+            # soft dots, fully opaque down 2 nearly gone
+            size = DOT_RADIUS * 2
+            for step in range(FADE_STEPS):
+                alpha = int(255 * (step + 1) / FADE_STEPS)
+                dot = pygame.Surface((size, size), pygame.SRCALPHA)
+                pygame.draw.circle(dot, (*color, alpha), (DOT_RADIUS, DOT_RADIUS), DOT_RADIUS)
+                self.frames.append(dot)
+        return index
+
+    def burst(self, name, pos, color=None):
+        if not self.enabled:
+            return
+        count, lo, hi, life_lo, life_hi, gravity, spread_up = PRESETS[name]
+        count = int(count * self.density)
+        count = min(count, self.budget - self.spawned, self.capacity - self.count)
+        if count <= 0:
+            return
+
+        start, end = self.count, self.count + count
+        angle = self.rng.uniform(0, 2 * np.pi, count)
+        speed = self.rng.uniform(lo, hi, count)
+        self.pos[start:end] = pos
+        self.vel[start:end, 0] = np.cos(angle) * speed
+        self.vel[start:end, 1] = np.sin(angle) * speed - spread_up
+        self.gravity[start:end] = gravity
+        self.life[start:end] = self.rng.uniform(life_lo, life_hi, count)
+        self.max_life[start:end] = self.life[start:end]
+        self.color[start:end] = self._color_id(color or DEFAULT_COLORS.get(name, WHITE))
+
+        self.count = end
+        self.spawned += count
+
+    def update(self):
+        self.spawned = 0  # new frame, new budget
+        if not self.enabled or not self.count:
+            return
+        n = self.count
+        self.vel[:n, 1] += self.gravity[:n]
+        self.pos[:n] += self.vel[:n]
+        self.life[:n] -= 1
+
+        # pack the live ones 2 the front, in order
+        alive = self.mask[:n]
+        np.greater(self.life[:n], 0, out=alive)
+        k = int(np.count_nonzero(alive))
+        if k < n:
+            slot = self.slot[:n]
+            np.copyto(slot, alive)  # cumsum straight off the bools would cast thru a temp array
+            np.cumsum(slot, out=slot)
+            slot -= 1
+            np.copyto(slot, k, where=np.logical_not(alive, out=self.mask2[:n]))  # dead ones all go 2 slot k
+            np.put(self.order, slot, self.every[:n])
+            order = self.order[:k]
+            for array in (self.pos, self.vel, self.gravity, self.life, self.max_life, self.color):
+                spare = self.spare_color if array is self.color else self.spare[array.shape]
+                np.take(array[:n], order, axis=0, out=spare[:k], mode="clip")
+                array[:k] = spare[:k]
+        self.count = k
+
+    def draw(self, target, offset):
+        if not self.enabled or not self.count:
+            return
+        n = self.count
+        scale = getattr(target, "scale", 1.0)
+        surface = getattr(target, "surface", target)
+
+        # screen coords (top left of the dot)
+        screen = self.screen[:n]
+        np.add(self.pos[:n], (offset.x - DOT_RADIUS, offset.y - DOT_RADIUS), out=screen)
+        screen *= scale
+        np.copyto(self.dest[:n], screen, casting="unsafe")
+
+        # which dot sprite each one uses
+        fade = self.fade[:n]
+        np.divide(self.life[:n], self.max_life[:n], out=fade)
+        fade *= FADE_STEPS
+        np.minimum(fade, FADE_STEPS - 1, out=fade)
+        ids = self.frame_id[:n]
+        np.multiply(self.color[:n], FADE_STEPS, out=ids)
+        np.add(ids, fade, out=ids, casting="unsafe")
+
+        # off screen ones go in a bucket past the last sprite + never get drawn
+        w, h = surface.get_size()
+        hidden, edge = self.mask[:n], self.mask2[:n]
+        np.less_equal(screen[:, 0], -DOT_RADIUS * 2, out=hidden)
+        for column, limit in ((0, w), (1, h)):
+            hidden |= np.greater_equal(screen[:, column], limit, out=edge)
+        hidden |= np.less_equal(screen[:, 1], -DOT_RADIUS * 2, out=edge)
+        skip = len(self.frames)
+        np.copyto(ids, skip, where=hidden)
+
+        # one blits per sprite, in pool order within each
+        counts = np.bincount(ids, minlength=skip + 1)[:skip].tolist()
+        dest = self.dest[:n][np.argsort(ids, kind="stable")]
+        scaled = getattr(target, "scaled", False)
+        start = 0
+        for frame_id, count in enumerate(counts):
+            if count:
+                frame = self.frames[frame_id]
+                if scaled:
+                    frame = target.image(frame)  # scaled copies r cached by the target
+                surface.blits(zip(repeat(frame, count), dest[start:start + count].tolist()), doreturn=False)
+                start += count
+
+
+def register_quality(governor, effects):
+    governor.register("particle_density", [1.0, 0.6, 0.3, 0.1], lambda density: setattr(effects, "density", density))
@@ -1,8 +1,12 @@
 import pygame
 from settings import *
+import images
 
 class Ghost(pygame.sprite.Sprite):
-    def __init__(self, x, y, patrol_left, patrol_right, speed=2):
+    # quality knob - ghosts off screen only animate every Nth frame
+    far_anim_stride = 1
+
+    def __init__(self, x, y, patrol_left, patrol_right, speed=2, chase=False):
         super().__init__()
         self.pos = pygame.math.Vector2(x, y)
         self.patrol_left = patrol_left
@@ -10,20 +14,48 @@ class Ghost(pygame.sprite.Sprite):
         self.speed = speed
         self.moving_right = True
 
-        # load the 2 horizontal frames
-        frames_raw = [
-            pygame.image.load(f"assets/enemies/enemy_ghost/horizontal/{i}.png").convert_alpha()
-            for i in range(2)
-        ]
-        # scale 2 a reasonable size (same width as player, bit shorter)
-        self.frames = [pygame.transform.scale(f, (50, 60)) for f in frames_raw]
+        # chasers follow the room's flow field (level sets nav), others just patrol
+        self.chase = chase
+        self.nav = None
+
+        # the 2 horizontal frames, scaled 2 a reasonable size (same width as player, bit shorter)
+        # + flipped once up front instead of every frame. shared by every ghost
+        paths = [f"assets/enemies/enemy_ghost/horizontal/{i}.png" for i in range(2)]
+        self.frames = [images.load(path, (50, 60), alpha=True) for path in paths]
+        self.frames_left = [images.load(path, (50, 60), alpha=True, flip=True) for path in paths]
 
         self.current_frame = 0
         self.animation_speed = 0.08
         self.image = self.frames[0]
         self.rect = self.image.get_rect(topleft=(x, y))
 
+        # level flags this each frame so far away ghosts can animate less
+        self.on_screen = True
+        self.anim_clock = 0
+
     def update(self):
+        if self.chase and self.nav:
+            self.follow_field()
+        else:
+            self.patrol()
+
+        self.rect.x = int(self.pos.x)
+        self.rect.y = int(self.pos.y)
+
+        # tick animation (in bigger steps, less often, when nobody can see it)
+        stride = 1 if self.on_screen else self.far_anim_stride
+        self.anim_clock += 1
+        if self.anim_clock % stride:
+            return
+        self.current_frame += self.animation_speed * stride
+        if self.current_frame >= len(self.frames):
+            self.current_frame = 0
+
+        # flipped frames when going left
+        frames = self.frames if self.moving_right else self.frames_left
+        self.image = frames[int(self.current_frame)]
+
+    def patrol(self):
         # walk horizontally, bounce off patrol bounds
         if self.moving_right:
             self.pos.x += self.speed
@@ -34,18 +66,24 @@ class Ghost(pygame.sprite.Sprite):
             if self.pos.x <= self.patrol_left:
                 self.moving_right = True
 
-        self.rect.x = int(self.pos.x)
-
-        # tick animation
-        self.current_frame += self.animation_speed
-        if self.current_frame >= len(self.frames):
-            self.current_frame = 0
+    def follow_field(self):
+        # float 2 the middle of the next cell the field points at
+        center = self.pos + pygame.math.Vector2(self.rect.width / 2, self.rect.height / 2)
+        cell = self.nav.next_cell(center)
+        if cell is None:
+            return  # field not ready yet or no way thru - just hover
 
-        frame = self.frames[int(self.current_frame)]
-        # flip when going left
-        if not self.moving_right:
-            frame = pygame.transform.flip(frame, True, False)
-        self.image = frame
+        goal = pygame.math.Vector2((cell[0] + 0.5) * TILE_SIZE, (cell[1] + 0.5) * TILE_SIZE)
+        step = goal - center
+        if step.length() > self.speed:
+            step.scale_to_length(self.speed)
+        self.pos += step
+        if step.x:
+            self.moving_right = step.x > 0
 
     def draw(self, screen, offset):
         screen.blit(self.image, (self.rect.x + offset.x, self.rect.y + offset.y))
+
+
+def register_quality(governor):
+    governor.register("far_ghost_anim", [1, 2, 4, 8], lambda stride: setattr(Ghost, "far_anim_stride", stride))
@@ -0,0 +1,69 @@
+import os
+import pygame
+from collections import defaultdict
+from settings import *
+from level import Level
+from player import Player
+from replay import ReplayKeys
+from effects import EffectsEngine
+from scheduler import Scheduler
+
+# runs Level + Player with no window and no audio - used by the tools that
+# simulate levels in bulk (regression runs etc). mirrors what Game.update does
+# while playing, but u drive it one tick at a time
+
+
+class SilentSound:
+    def play(self, *args, **kwargs):
+        pass
+
+    def set_volume(self, volume):
+        pass
+
+
+def init_headless():
+    # dummy drivers so this works on CI boxes / ssh / worker processes
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    # SDL turns SIGTERM in2 a quit event by default, then Pool.terminate() waits on us forever
+    os.environ.setdefault("SDL_NO_SIGNAL_HANDLERS", "1")
+    pygame.init()
+    # convert_alpha() in the sprites needs some display mode set
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((1, 1))
+
+
+class HeadlessGame:
+    def __init__(self, level_path=None, level_number=1, auto_respawn=True):
+        init_headless()
+        self.sounds = defaultdict(SilentSound)
+        self.effects = EffectsEngine(enabled=False)
+        self.memory = None
+        self.telemetry = None
+        self.ticks = 0
+        self.keys = ReplayKeys(0)
+        self.scheduler = Scheduler(self)
+        # replays turn this off since they carry their own respawns
+        self.auto_respawn = auto_respawn
+
+        self.level = Level(self, level_number, level_path)
+        self.player = Player(self, self.level.player_start_pos)
+
+    def get_ticks(self):
+        return self.ticks * 1000 // FPS
+
+    def step(self, keys=None, events=()):
+        if keys is not None:
+            self.keys = keys
+        for event in events:
+            if not self.player.is_dead:
+                self.player.handle_event(event)
+
+        self.ticks += 1
+        self.scheduler.advance()
+        self.player.update()
+        self.level.update(self.player)
+
+    def respawn(self):
+        if self.player.is_dead:
+            self.player.respawn()
@@ -0,0 +1,176 @@
+import os
+from settings import *
+from nav import FlowField
+import bundle
+
+# dev mode hot reload - watches the level json (just polls the mtime, no extra deps)
+# and patches the rooms that r already built instead of restarting. only the tiles and
+# entities that actually changed get rebuilt, the player and everything else stays put.
+# rooms that arent built yet just pick up the new json next time they load
+
+
+class LevelWatcher:
+    def __init__(self, game, interval=HOT_RELOAD_INTERVAL):
+        self.game = game
+        self.interval = interval
+        self.countdown = interval
+        self.path = None
+        self.mtime = None
+
+    def poll(self):
+        self.countdown -= 1
+        if self.countdown > 0:
+            return
+        self.countdown = self.interval
+
+        level = self.game.level
+        try:
+            mtime = os.stat(bundle.loose_path(level.level_path)).st_mtime_ns
+        except OSError:
+            return
+        if level.level_path != self.path:
+            # new level (restart / load) - just start watching it
+            self.path, self.mtime = level.level_path, mtime
+            return
+        if mtime != self.mtime:
+            self.mtime = mtime
+            self.reload()
+
+    def reload(self):
+        level = self.game.level
+        try:
+            level_data = bundle.read_json(level.level_path)
+        except (OSError, ValueError) as e:
+            # probably saved halfway thru an edit, try again on the next save
+            print(f"hot reload: couldnt read {level.level_path}: {e}")
+            return
+
+        changes = apply_level_diff(level, level_data)
+        summary = ", ".join(f"{room}: {n}" for room, n in changes.items() if n) or "nothing live changed"
+        print(f"hot reload: {summary}")
+
+
+def tile_type_at(room_data, layer_name, x, y):
+    layer = room_data.get("layers", {}).get(layer_name, [])
+    if y >= len(layer) or x >= len(layer[y]) or layer[y][x] == 0:
+        return None
+    return room_data["tile_mapping"][str(layer[y][x])]
+
+
+def apply_level_diff(level, level_data):
+    """Patch the level's live rooms 2 match level_data. Returns {room: things changed}."""
+    old_rooms = level.rooms
+    new_rooms = level_data["rooms"]
+    level.rooms = new_rooms
+    level.player_start_pos = (level_data["player_start"]["x"], level_data["player_start"]["y"])
+
+    changes = {}
+    for name, room in list(level.room_pool.items()):
+        if name not in new_rooms:
+            if room is not level.room:
+                del level.room_pool[name]  # room got deleted, cant go back there anyway
+            continue
+        old, new = old_rooms.get(name, {}), new_rooms[name]
+        if old != new:
+            changes[name] = diff_room(level, room, old, new)
+
+    for name in list(level.room_snapshots):
+        if name not in new_rooms:
+            del level.room_snapshots[name]
+            continue
+        # restore() lines saved state up with entities by list position, so once a list
+        # changed the old states would land on the wrong things - rebuild that room fresh
+        old, new = old_rooms.get(name, {}), new_rooms[name]
+        stale = [key for key in level.ENTITY_KINDS if old.get(key, []) != new.get(key, [])]
+        if stale:
+            del level.room_snapshots[name]
+            changes[name] = len(stale)
+    return changes
+
+
+def diff_room(level, room, old, new):
+    changed = diff_tiles(level, room, old, new)
+
+    for key, (group_name, builder) in level.ENTITY_KINDS.items():
+        old_list, new_list = old.get(key, []), new.get(key, [])
+        if old_list == new_list:
+            continue
+
+        group = getattr(room, group_name)
+        by_index = {entity.index: entity for entity in group}
+        for i in range(max(len(old_list), len(new_list))):
+            before = old_list[i] if i < len(old_list) else None
+            after = new_list[i] if i < len(new_list) else None
+            if before == after:
+                continue  # untouched (collected orbs stay collected)
+            existing = by_index.pop(i, None)
+            if existing is not None:
+                room.remove_entity(group_name, existing)
+            if after is not None:
+                room.add_entity(group_name, getattr(level, builder)(room, after, i))
+            changed += 1
+
+        # keep json order, snapshots line entities up by it
+        entities = sorted(group, key=lambda entity: entity.index)
+        group.empty()
+        group.add(*entities)
+
+    old_signs, new_signs = old.get("signs", []), new.get("signs", [])
+    if old_signs != new_signs:
+        del room.signs[len(new_signs):]
+        for i, sign_data in enumerate(new_signs):
+            if i >= len(old_signs) or old_signs[i] != sign_data:
+                sign = level.build_sign(sign_data)
+                if i < len(room.signs):
+                    room.signs[i] = sign
+                else:
+                    room.signs.append(sign)
+                changed += 1
+
+    return changed
+
+
+def diff_tiles(level, room, old, new):
+    changed = 0
+    nav_stale = False
+    same_mapping = old.get("tile_mapping") == new.get("tile_mapping")
+    old_layers, new_layers = old.get("layers", {}), new.get("layers", {})
+
+    for layer_name in set(old_layers) | set(new_layers):
+        old_layer, new_layer = old_layers.get(layer_name, []), new_layers.get(layer_name, [])
+        if same_mapping and old_layer == new_layer:
+            continue
+        foreground = layer_name == "foreground"
+        grid = room.tile_grid if foreground else room.background_grid
+        group = room.tiles if foreground else room.background_tiles
+
+        for y in range(max(len(old_layer), len(new_layer))):
+            old_row = old_layer[y] if y < len(old_layer) else []
+            new_row = new_layer[y] if y < len(new_layer) else []
+            if same_mapping and old_row == new_row:
+                continue  # most rows dont change, skip them at list-compare speed
+            for x in range(max(len(old_row), len(new_row))):
+                before = tile_type_at(old, layer_name, x, y)
+                after = tile_type_at(new, layer_name, x, y)
+                if before == after:
+                    continue
+                tile = grid.pop((x, y), None)
+                if tile is not None:
+                    group.remove(tile)
+                if after is not None:
+                    level.place_tile(room, layer_name, x, y, after)
+                if foreground:
+                    room.nav.set_open(x, y, after is None)
+                    nav_stale = nav_stale or x >= room.nav.cols or y >= room.nav.rows
+                changed += 1
+
+    if nav_stale:
+        # room got bigger - new field, and point the ghosts at it
+        foreground = new_layers.get("foreground", [])
+        cols = max((len(row) for row in foreground), default=0)
+        room.nav = FlowField(room.tile_grid, cols, len(foreground))
+        for enemy in room.enemies:
+            enemy.nav = room.nav
+        if room is level.room:
+            level.nav = room.nav
+    return changed
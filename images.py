@@ -0,0 +1,38 @@
+import weakref
+import pygame
+import bundle
+
+# shared image loading - every tile / door / ghost used 2 load + scale its own copy of the
+# same png. now each (file, size, flags) combo is loaded once and handed out 2 everyone.
+# nothing draws INTO these surfaces, so sharing them is safe
+#
+# clear() just drops the cache's references (memory budgets call it), surfaces that r still
+# in use stay alive til their sprites go away
+#
+# flipped copies remember which image they mirror, so the texture backend (texture.py) can
+# upload just the original and flip it per copy
+
+cache = {}
+mirrors = weakref.WeakKeyDictionary()  # flipped image -> the image it mirrors
+
+
+def load(path, size=None, alpha=False, flip=False):
+    key = (path, size, alpha, flip)
+    image = cache.get(key)
+    if image is None:
+        if flip:
+            original = load(path, size, alpha)
+            image = pygame.transform.flip(original, True, False)
+            mirrors[image] = original
+        else:
+            image = bundle.image(path)
+            if alpha:
+                image = image.convert_alpha()
+            if size is not None:
+                image = pygame.transform.scale(image, size)
+        cache[key] = image
+    return image
+
+
+def clear():
+    cache.clear()
@@ -1,5 +1,7 @@
 import pygame
 from settings import *
+import images
+import telemetry
 
 class Door(pygame.sprite.Sprite):
     def __init__(self, x, y, width, height, required_memory, target_room, target_x, target_y):
@@ -15,12 +17,11 @@ class Door(pygame.sprite.Sprite):
         self.opening = False
         self.opening_time = 0
         self.open_duration = 1000  # ms
+        self.timer = None
         
         # load the door sprites
-        self.closed_img = pygame.image.load("assets/objects/door_closed.png")
-        self.open_img = pygame.image.load("assets/objects/door_open.png")
-        self.closed_img = pygame.transform.scale(self.closed_img, (width, height))
-        self.open_img = pygame.transform.scale(self.open_img, (width, height))
+        self.closed_img = images.load("assets/objects/door_closed.png", (width, height))
+        self.open_img = images.load("assets/objects/door_open.png", (width, height))
         
     def update(self, player):
         if not self.is_open and not self.opening:
@@ -28,11 +29,22 @@ class Door(pygame.sprite.Sprite):
             if interact_zone.colliderect(player.rect) and player.interacting:
                 if self.required_memory is None or player.has_memory(self.required_memory):
                     self.opening = True
-                    self.opening_time = pygame.time.get_ticks()
+                    self.opening_time = player.game.get_ticks()
+                    self.schedule(player.game.scheduler)
                     player.game.sounds['door_open'].play()
-        if self.opening and not self.is_open:
-            if pygame.time.get_ticks() - self.opening_time > self.open_duration:
-                self.is_open = True
+                    player.game.effects.burst("door", self.rect.midbottom)
+                    if player.game.telemetry:
+                        player.game.telemetry.record(telemetry.DOOR_OPEN, player.game.level.current_room,
+                                                     self.target_room, self.required_memory)
+
+    def schedule(self, scheduler):
+        # swings open once open_duration of game time has gone by
+        scheduler.cancel(self.timer)
+        self.timer = scheduler.past_ms(self.opening_time + self.open_duration, self.finish_opening)
+
+    def finish_opening(self):
+        self.is_open = True
+        self.timer = None
     
     def draw(self, screen, offset):
         if self.is_open:
@@ -49,16 +61,17 @@ class Lever(pygame.sprite.Sprite):
         self.activated = False
         
         # load lever sprites
-        self.off_img = pygame.image.load("assets/objects/lever_off.png")
-        self.on_img = pygame.image.load("assets/objects/lever_on.png")
-        self.off_img = pygame.transform.scale(self.off_img, (40, 40))
-        self.on_img = pygame.transform.scale(self.on_img, (40, 40))
+        self.off_img = images.load("assets/objects/lever_off.png", (40, 40))
+        self.on_img = images.load("assets/objects/lever_on.png", (40, 40))
         
     def update(self, player):
         interact_zone = self.rect.inflate(40, 40)
         if interact_zone.colliderect(player.rect) and player.interacting and not self.activated:
             self.activated = True
             player.game.sounds['switch'].play()
+            if player.game.telemetry:
+                player.game.telemetry.record(telemetry.LEVER, player.game.level.current_room,
+                                             self.target_id, self.action)
             for platform in player.game.level.platforms:
                 if platform.id == self.target_id:
                     if self.action == "activate":
@@ -84,10 +97,8 @@ class Switch(pygame.sprite.Sprite):
         self.activated = False
         
         # load switch sprites
-        self.off_img = pygame.image.load("assets/objects/switch_off.png")
-        self.on_img = pygame.image.load("assets/objects/switch_on.png")
-        self.off_img = pygame.transform.scale(self.off_img, (40, 40))
-        self.on_img = pygame.transform.scale(self.on_img, (40, 40))
+        self.off_img = images.load("assets/objects/switch_off.png", (40, 40))
+        self.on_img = images.load("assets/objects/switch_on.png", (40, 40))
         
     def update(self, player):
         interact_zone = self.rect.inflate(40, 40)
@@ -95,6 +106,9 @@ class Switch(pygame.sprite.Sprite):
             if self.required_memory is None or player.has_memory(self.required_memory):
                 self.activated = True
                 player.game.sounds['switch'].play()
+                if player.game.telemetry:
+                    player.game.telemetry.record(telemetry.SWITCH, player.game.level.current_room,
+                                                 self.target_id, self.required_memory)
                 for platform in player.game.level.platforms:
                     if platform.id == self.target_id:
                         if self.action == "activate":
@@ -111,43 +125,39 @@ class Switch(pygame.sprite.Sprite):
             screen.blit(self.off_img, (self.rect.x + offset.x, self.rect.y + offset.y))
 
 class MovingPlatform(pygame.sprite.Sprite):
-    def __init__(self, x, y, width, height, move_x, move_y, speed, platform_id):
+    def __init__(self, x, y, width, height, path, platform_id):
         super().__init__()
         self.id = platform_id
         self.rect = pygame.Rect(int(x), int(y), int(width), int(height))
-        self.start_pos = pygame.math.Vector2(x, y)
-        self.move_distance = pygame.math.Vector2(move_x, move_y)
-        self.speed = speed
-        self.progress = 0.0
-        self.forward = True
+        self.path = path  # baked paths.Path, one whole pixel spot per tick
+        self.frame = 0  # where in the path's cycle we r
         self.active = False
         self.is_moving_platform = True
+        self.rect.topleft = path.at(0)
         self.prev_rect = self.rect.copy()
         self.delta = (0, 0)
         
         # load the platform sprite
-        self.image = pygame.image.load("assets/objects/platform.png")
-        self.image = pygame.transform.scale(self.image, (width, height))
+        self.image = images.load("assets/objects/platform.png", (int(width), int(height)))
+
+    def go_to(self, frame):
+        # jump straight 2 a frame (restoring a room), no delta 4 whoever's on it
+        self.frame = frame % self.path.period
+        self.rect.topleft = self.path.at(self.frame)
+        self.prev_rect = self.rect.copy()
+        self.delta = (0, 0)
+
+    def reach(self):
+        """Rect covering everywhere the platform can get 2."""
+        left, top, right, bottom = self.path.bounds
+        return pygame.Rect(left, top, right - left + self.rect.width, bottom - top + self.rect.height)
         
     def update(self):
         self.prev_rect = self.rect.copy()
         if self.active:
-            if self.forward:
-                self.progress += self.speed
-                if self.progress >= 1.0:
-                    self.progress = 1.0
-                    self.forward = False
-            else:
-                self.progress -= self.speed
-                if self.progress <= 0.0:
-                    self.progress = 0.0
-                    self.forward = True
-                    
-            current_x = int(self.start_pos.x + self.move_distance.x * self.progress)
-            current_y = int(self.start_pos.y + self.move_distance.y * self.progress)
-            
-            self.rect.x = current_x
-            self.rect.y = current_y
+            # one table lookup, the path was baked when the room got built (see paths.py)
+            self.frame = (self.frame + 1) % self.path.period
+            self.rect.topleft = self.path.points[self.frame]
 
         self.delta = (self.rect.x - self.prev_rect.x, self.rect.y - self.prev_rect.y)
     
@@ -0,0 +1,105 @@
+import time
+import pygame
+from collections import deque
+from settings import *
+
+# input latency - how long from a key actually arriving til the first frame that shows it
+# hits the screen. pygame events dont carry a usable timestamp, so the FramePacer does the
+# frame wait itself (instead of clock.tick) in ~1ms slices, pulling events off the queue
+# as they show up and stamping them. the LatencyTracker buckets stamp -> present times.
+#
+# late sampling (--late-input): instead of reading input right after the last present and
+# then sleeping, sleep FIRST and read input as late as possible - just early enough that
+# update + draw (predicted from the last few frames) still make the next present. this
+# matters most with --vsync where flip() blocks til the display refresh
+
+
+class LatencyTracker:
+    def __init__(self, bucket_ms=LATENCY_BUCKET_MS):
+        self.bucket_ms = bucket_ms
+        self.pending = []  # stamps of input the current frame is reacting 2
+        self.samples = []
+
+    def input(self, stamp):
+        if stamp is not None:
+            self.pending.append(stamp)
+
+    def take(self):
+        # the render thread presents later, so the frame carries its own stamps
+        pending, self.pending = self.pending, []
+        return tuple(pending)
+
+    def presented(self, now, stamps=None):
+        if stamps is None:
+            stamps = self.take()
+        for stamp in stamps:
+            self.samples.append((now - stamp) * 1000)
+
+    def percentile(self, p):
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+    def report(self):
+        if not self.samples:
+            print("latency: no input recorded")
+            return
+        print(f"input -> photon latency over {len(self.samples)} inputs: "
+              f"p50 {self.percentile(50):.1f}ms  p95 {self.percentile(95):.1f}ms  "
+              f"p99 {self.percentile(99):.1f}ms  max {max(self.samples):.1f}ms")
+
+        buckets = {}
+        for ms in self.samples:
+            bucket = int(ms // self.bucket_ms)
+            buckets[bucket] = buckets.get(bucket, 0) + 1
+        most = max(buckets.values())
+        for bucket in range(min(buckets), max(buckets) + 1):
+            count = buckets.get(bucket, 0)
+            lo = bucket * self.bucket_ms
+            bar = "#" * max(1 if count else 0, round(count * 40 / most))
+            print(f"  {lo:5.0f}-{lo + self.bucket_ms:<4.0f}ms {count:6d} {bar}")
+
+
+class FramePacer:
+    def __init__(self, fps=FPS, late=False, margin_ms=LATE_INPUT_MARGIN_MS):
+        self.frame = 1 / fps
+        self.late = late
+        self.margin = margin_ms / 1000
+        self.work = deque(maxlen=10)  # how long update + draw took lately
+        self.queue = []
+        self.frame_start = time.perf_counter()
+        self.next_present = self.frame_start + self.frame
+
+    def _collect(self):
+        now = time.perf_counter()
+        for event in pygame.event.get():
+            self.queue.append((event, now))
+
+    def wait(self):
+        """Sleep til its time 2 start the next frame, stamping input as it comes in."""
+        if self.late:
+            # worst of the recent frames, so one slow frame doesnt make us miss
+            predicted = max(self.work, default=self.frame / 2)
+            wake = self.next_present - predicted - self.margin
+        else:
+            wake = self.frame_start + self.frame  # same pacing as clock.tick
+
+        now = time.perf_counter()
+        while now < wake:
+            self._collect()
+            time.sleep(min(0.001, wake - now))
+            now = time.perf_counter()
+        self._collect()
+        self.frame_start = time.perf_counter()
+
+    def events(self):
+        """(event, arrival time) pairs since the last call."""
+        queue, self.queue = self.queue, []
+        return queue
+
+    def presented(self):
+        now = time.perf_counter()
+        self.work.append(now - self.frame_start)
+        self.next_present += self.frame
+        if self.next_present < now:
+            self.next_present = now + self.frame  # fell behind, dont try 2 catch up
+        return now
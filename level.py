@@ -1,26 +1,43 @@
 import pygame
-import json
 import os
+from collections import OrderedDict
 from settings import *
 from memory_orb import MemoryOrb
 from interactive_objects import Door, Lever, Switch, MovingPlatform
+from paths import platform_path
 from ghost import Ghost
+from nav import FlowField
+from broadphase import SweepAndPrune
+from memstats import room_bytes
+import images
+import bundle
+import telemetry
 
 class Tile(pygame.sprite.Sprite):
     def __init__(self, x, y, tile_type):
         super().__init__()
         self.tile_type = tile_type
-        self.image = pygame.image.load(f"assets/tiles/{tile_type}.png")
-        self.image = pygame.transform.scale(self.image, (TILE_SIZE, TILE_SIZE))
+        self.image = images.load(f"assets/tiles/{tile_type}.png", (TILE_SIZE, TILE_SIZE))
         self.rect = self.image.get_rect()
         self.rect.x = x
         self.rect.y = y
 
-class Level:
-    def __init__(self, game, level_number):
-        self.game = game
-        self.level_number = level_number
-        
+class Room:
+    """Everything built 4 one room. Level keeps a few of these alive so going back is instant."""
+
+    # group -> (broadphase kind, how far past its rect it can be used from, moves?)
+    BROADPHASE = {
+        "memory_orbs": ("orb", 0, False),
+        "doors": ("door", 30, False),  # doors + levers + switches work from a bit away
+        "levers": ("lever", 20, False),
+        "switches": ("switch", 20, False),
+        "platforms": ("platform", 0, True),
+        "enemies": ("enemy", 0, True),
+    }
+
+    def __init__(self, name):
+        self.name = name
+
         # sprite groups 4 everything
         self.tiles = pygame.sprite.Group()
         self.background_tiles = pygame.sprite.Group()
@@ -30,15 +47,100 @@ class Level:
         self.switches = pygame.sprite.Group()
         self.platforms = pygame.sprite.Group()
 
+        # foreground tiles by grid cell so collision only looks at nearby ones
+        self.tile_grid = {}
+        self.background_grid = {}
+
+        # shared chase field 4 ghosts
+        self.nav = None
+
         # signs are just images, not sprites
         self.signs = []
 
         # enemies
         self.enemies = pygame.sprite.Group()
-        
+
+        # who's near who (see broadphase.py)
+        self.broadphase = SweepAndPrune()
+
+        # surface bytes, worked out once by memstats.room_bytes when theres a memory ledger
+        self.bytes = None
+
+    def add_entity(self, group_name, entity):
+        getattr(self, group_name).add(entity)
+        kind, pad, dynamic = self.BROADPHASE[group_name]
+        self.broadphase.add(entity, kind, pad, dynamic)
+
+    def remove_entity(self, group_name, entity):
+        getattr(self, group_name).remove(entity)
+        self.broadphase.remove(entity)
+
+    def snapshot(self):
+        # just the puzzle state, small enough 2 keep 4 every room forever
+        return {
+            "orbs": sorted(orb.index for orb in self.memory_orbs),
+            "doors": [(door.is_open, door.opening, door.opening_time) for door in self.doors],
+            "levers": [lever.activated for lever in self.levers],
+            "switches": [switch.activated for switch in self.switches],
+            "platforms": [(p.frame, p.active) for p in self.platforms],
+            "enemies": [(e.pos.x, e.pos.y, e.moving_right) for e in self.enemies],
+        }
+
+    def restore(self, snapshot):
+        # put a freshly built room back the way the player left it
+        kept = set(snapshot["orbs"])
+        for orb in list(self.memory_orbs):
+            if orb.index not in kept:
+                self.remove_entity("memory_orbs", orb)
+
+        for door, (is_open, opening, opening_time) in zip(self.doors, snapshot["doors"]):
+            door.is_open, door.opening, door.opening_time = is_open, opening, opening_time
+        for lever, activated in zip(self.levers, snapshot["levers"]):
+            lever.activated = activated
+        for switch, activated in zip(self.switches, snapshot["switches"]):
+            switch.activated = activated
+        for platform, (frame, active) in zip(self.platforms, snapshot["platforms"]):
+            platform.active = active
+            platform.go_to(frame)
+        for enemy, (x, y, moving_right) in zip(self.enemies, snapshot["enemies"]):
+            enemy.pos.update(x, y)
+            enemy.moving_right = moving_right
+            enemy.rect.topleft = (int(x), int(y))
+        self.broadphase.dirty = True  # platforms + ghosts jumped, re-read them all
+
+class Level:
+    # groups + lookups that belong to whichever room we're standing in
+    ROOM_ATTRS = ("tiles", "background_tiles", "memory_orbs", "doors", "levers", "switches",
+                  "platforms", "enemies", "signs", "tile_grid", "nav")
+
+    # json list -> (room group, builder) 4 every kind of thing in a room
+    ENTITY_KINDS = {
+        "memory_orbs": ("memory_orbs", "build_orb"),
+        "doors": ("doors", "build_door"),
+        "levers": ("levers", "build_lever"),
+        "switches": ("switches", "build_switch"),
+        "moving_platforms": ("platforms", "build_platform"),
+        "enemies": ("enemies", "build_enemy"),
+    }
+
+    def __init__(self, game, level_number, level_path=None):
+        self.game = game
+        self.level_number = level_number
+        self.level_path = level_path or f"assets/levels/level_{level_number}.json"
+
+        # built rooms, least recently visited first. rooms pushed out of the pool
+        # only keep a snapshot of their puzzle state
+        self.room_pool = OrderedDict()
+        self.room_snapshots = {}
+
+        # doors the player was standing in when they arrived - ignored till they step off
+        self.arrival_doors = []
+
         # track which room we're in
         self.current_room = "start"
+        self.room = None
         self.rooms = {}
+        self.room_entered = 0  # ms, 4 telemetry
         
         # camera 4 scrolling
         self.camera_offset = pygame.math.Vector2(0, 0)
@@ -48,8 +150,7 @@ class Level:
     
     def load_level(self):
         # read the JSON file 4 this level
-        with open(f"assets/levels/level_{self.level_number}.json", 'r') as file:
-            level_data = json.load(file)
+        level_data = bundle.read_json(self.level_path)
             
         # grab all the room data
         self.rooms = level_data["rooms"]
@@ -61,17 +162,52 @@ class Level:
         self.load_room(self.current_room)
     
     def load_room(self, room_name):
-        # wipe everything b4 loading the new room
-        self.tiles.empty()
-        self.background_tiles.empty()
-        self.memory_orbs.empty()
-        self.doors.empty()
-        self.levers.empty()
-        self.switches.empty()
-        self.platforms.empty()
-        self.enemies.empty()
-        self.signs = []
-        
+        left = self.current_room if self.room else None
+        room = self.room_pool.pop(room_name, None)
+        if room is None:
+            room = self.build_room(room_name)
+            snapshot = self.room_snapshots.pop(room_name, None)
+            if snapshot:
+                room.restore(snapshot)
+                self.schedule_doors(room)
+        self.room_pool[room_name] = room  # most recently used goes last
+
+        self.shrink_pool(ROOM_POOL_SIZE)
+
+        # point the level at this room's stuff
+        self.room = room
+        for attr in self.ROOM_ATTRS:
+            setattr(self, attr, getattr(room, attr))
+        self.arrival_doors = []
+        self.game.effects.clear()
+
+        if self.game.telemetry:
+            now = self.game.get_ticks()
+            self.game.telemetry.record(telemetry.ROOM, left, room_name, now - self.room_entered)
+            self.room_entered = now
+
+        # done - save which room we're in
+        self.current_room = room_name
+        if self.game.memory:
+            self.game.memory.room_loaded(self)
+
+    def shrink_pool(self, size):
+        # too many live rooms? shrink the oldest 2 a snapshot (the current room is always newest)
+        while len(self.room_pool) > max(1, size):
+            old_name, old_room = self.room_pool.popitem(last=False)
+            self.room_snapshots[old_name] = old_room.snapshot()
+            for door in old_room.doors:
+                self.game.scheduler.cancel(door.timer)  # restore() reschedules it
+
+    def schedule_doors(self, room):
+        # doors that were still swinging open when the room got snapshotted / saved
+        for door in room.doors:
+            if door.opening and not door.is_open:
+                door.schedule(self.game.scheduler)
+
+    def build_room(self, room_name):
+        room = Room(room_name)
+
         # grab this room's data from the dict
         room_data = self.rooms[room_name]
         
@@ -81,137 +217,179 @@ class Level:
                 for x, tile_id in enumerate(row):
                     if tile_id != 0:  # 0 = empty, skip it
                         tile_type = room_data["tile_mapping"][str(tile_id)]
-                        tile_x = x * TILE_SIZE
-                        tile_y = y * TILE_SIZE
-                        
-                        if layer_name == "foreground":
-                            tile = Tile(tile_x, tile_y, tile_type)
-                            self.tiles.add(tile)
-                        else:  # background layer
-                            bg_tile = Tile(tile_x, tile_y, tile_type)
-                            self.background_tiles.add(bg_tile)
-        
-        # spawn the cassettes
-        for orb_data in room_data.get("memory_orbs", []):
-            orb = MemoryOrb(
-                orb_data["x"], 
-                orb_data["y"],
-                orb_data["memory_type"],
-                orb_data.get("duration", None)
-            )
-            self.memory_orbs.add(orb)
-            
-        # add doors
-        for door_data in room_data.get("doors", []):
-            door = Door(
-                door_data["x"],
-                door_data["y"],
-                door_data["width"],
-                door_data["height"],
-                door_data["required_memory"],
-                door_data["target_room"],
-                door_data.get("target_x", 0),
-                door_data.get("target_y", 0)
-            )
-            self.doors.add(door)
-            
-        # add levers
-        for lever_data in room_data.get("levers", []):
-            lever = Lever(
-                lever_data["x"],
-                lever_data["y"],
-                lever_data["target_id"],
-                lever_data["action"]
-            )
-            self.levers.add(lever)
-            
-        # add switches
-        for switch_data in room_data.get("switches", []):
-            switch = Switch(
-                switch_data["x"],
-                switch_data["y"],
-                switch_data["required_memory"],
-                switch_data["target_id"],
-                switch_data["action"]
-            )
-            self.switches.add(switch)
-            
-        # add moving platforms
-        for platform_data in room_data.get("moving_platforms", []):
-            platform = MovingPlatform(
-                platform_data["x"],
-                platform_data["y"],
-                platform_data["width"],
-                platform_data["height"],
-                platform_data["move_x"],
-                platform_data["move_y"],
-                platform_data["speed"],
-                platform_data["id"]
-            )
-            platform.active = platform_data.get("active", False)  # can start active if json says so
-            self.platforms.add(platform)
-            
-        # spawn enemies
-        for enemy_data in room_data.get("enemies", []):
-            ghost = Ghost(
-                enemy_data["x"],
-                enemy_data["y"],
-                enemy_data["patrol_left"],
-                enemy_data["patrol_right"],
-                enemy_data.get("speed", 2)
-            )
-            self.enemies.add(ghost)
+                        self.place_tile(room, layer_name, x, y, tile_type)
+
+        # open cells of the room 4 ghosts that chase
+        foreground = room_data["layers"].get("foreground", [])
+        cols = max((len(row) for row in foreground), default=0)
+        room.nav = FlowField(room.tile_grid, cols, len(foreground))
+
+        # cassettes, doors, levers, switches, platforms, enemies
+        for key, (group_name, builder) in self.ENTITY_KINDS.items():
+            for i, data in enumerate(room_data.get(key, [])):
+                room.add_entity(group_name, getattr(self, builder)(room, data, i))
 
         # load sign images (just load + store, no logic)
         for sign_data in room_data.get("signs", []):
-            img = pygame.image.load(f"assets/{sign_data['image']}")
-            img = pygame.transform.scale(img, (sign_data["width"], sign_data["height"]))
-            rect = img.get_rect(topleft=(sign_data["x"], sign_data["y"]))
-            self.signs.append({"image": img, "rect": rect})
+            room.signs.append(self.build_sign(sign_data))
 
-        # done - save which room we're in
-        self.current_room = room_name
+        if self.game.memory:
+            room_bytes(room)  # the one walk over every tile, checks just add these up
+        return room
+
+    def place_tile(self, room, layer_name, x, y, tile_type):
+        tile = Tile(x * TILE_SIZE, y * TILE_SIZE, tile_type)
+        if layer_name == "foreground":
+            room.tiles.add(tile)
+            room.tile_grid[(x, y)] = tile
+        else:  # background layer
+            room.background_tiles.add(tile)
+            room.background_grid[(x, y)] = tile
+        return tile
+
+    def build_orb(self, room, orb_data, index):
+        orb = MemoryOrb(
+            orb_data["x"], 
+            orb_data["y"],
+            orb_data["memory_type"],
+            orb_data.get("duration", None)
+        )
+        orb.index = index
+        return orb
+
+    def build_door(self, room, door_data, index):
+        door = Door(
+            door_data["x"],
+            door_data["y"],
+            door_data["width"],
+            door_data["height"],
+            door_data["required_memory"],
+            door_data["target_room"],
+            door_data.get("target_x", 0),
+            door_data.get("target_y", 0)
+        )
+        door.index = index
+        return door
+
+    def build_lever(self, room, lever_data, index):
+        lever = Lever(
+            lever_data["x"],
+            lever_data["y"],
+            lever_data["target_id"],
+            lever_data["action"]
+        )
+        lever.index = index
+        return lever
+
+    def build_switch(self, room, switch_data, index):
+        switch = Switch(
+            switch_data["x"],
+            switch_data["y"],
+            switch_data["required_memory"],
+            switch_data["target_id"],
+            switch_data["action"]
+        )
+        switch.index = index
+        return switch
+
+    def build_platform(self, room, platform_data, index):
+        platform = MovingPlatform(
+            platform_data["x"],
+            platform_data["y"],
+            platform_data["width"],
+            platform_data["height"],
+            platform_path(platform_data),  # baked once, then its just a table lookup per tick
+            platform_data["id"]
+        )
+        platform.active = platform_data.get("active", False)  # can start active if json says so
+        platform.index = index
+        return platform
+
+    def build_enemy(self, room, enemy_data, index):
+        ghost = Ghost(
+            enemy_data["x"],
+            enemy_data["y"],
+            enemy_data["patrol_left"],
+            enemy_data["patrol_right"],
+            enemy_data.get("speed", 2),
+            enemy_data.get("chase", False)
+        )
+        ghost.nav = room.nav
+        ghost.index = index
+        return ghost
+
+    def build_sign(self, sign_data):
+        img = images.load(f"assets/{sign_data['image']}", (sign_data["width"], sign_data["height"]))
+        rect = img.get_rect(topleft=(sign_data["x"], sign_data["y"]))
+        return {"image": img, "rect": rect}
     
     def get_colliding_tiles(self, entity):
         # returns everything the entity is touching
-        colliding_tiles = []
-        
-        for tile in list(self.tiles):
-            if entity.rect.colliderect(tile.rect):
-                colliding_tiles.append(tile)
-                
-        for platform in list(self.platforms):
-            if entity.rect.colliderect(platform.rect):
-                colliding_tiles.append(platform)
-                
-        return colliding_tiles
+        rect = entity.rect
+        return [tile for tile in self.get_solids_in_area(rect.left, rect.top, rect.right, rect.bottom)
+                if rect.colliderect(tile.rect)]
+
+    def get_solids_in_area(self, left, top, right, bottom):
+        # tiles from the grid cells the area covers + any platform near it
+        solids = []
+        for cy in range(int(top // TILE_SIZE), int(bottom // TILE_SIZE) + 1):
+            for cx in range(int(left // TILE_SIZE), int(right // TILE_SIZE) + 1):
+                tile = self.tile_grid.get((cx, cy))
+                if tile is not None:
+                    solids.append(tile)
+
+        for platform in self.room.broadphase.query(left, right, "platform"):
+            r = platform.rect
+            if r.right >= left and r.left <= right and r.bottom >= top and r.top <= bottom:
+                solids.append(platform)
+
+        return solids
         
     def update(self, player):
-        # tick everything
+        broadphase = self.room.broadphase
+        if player not in broadphase:
+            broadphase.add(player, "player", dynamic=True)
+
+        # tick everything (doors, levers + switches only do anything when the player's right there,
+        # they dont move so a query finds them without re-sorting the player in yet)
         self.memory_orbs.update()
-        self.doors.update(player)
-        self.levers.update(player)
-        self.switches.update(player)
+        left, right = player.rect.left, player.rect.right
+        for door in broadphase.query(left, right, "door"):
+            door.update(player)
+        for lever in broadphase.query(left, right, "lever"):
+            lever.update(player)
+        for switch in broadphase.query(left, right, "switch"):
+            switch.update(player)
         self.platforms.update()
+        if any(enemy.chase for enemy in self.enemies):
+            self.nav.update(player.rect.center)
+        view = pygame.Rect(-self.camera_offset.x, -self.camera_offset.y, WIDTH, HEIGHT)
+        for enemy in self.enemies:
+            enemy.on_screen = view.colliderect(enemy.rect)
         self.enemies.update()
+        broadphase.update()  # player, platforms + ghosts all moved, once a tick
         
         # did player walk into a cassette?
-        for orb in list(self.memory_orbs):
+        for orb in broadphase.near(player, "orb"):
             if player.rect.colliderect(orb.rect):
+                orb.collect(self.game.get_ticks())
                 player.collect_memory(orb)
-                orb.collect()
-                self.memory_orbs.remove(orb)
+                self.game.effects.burst("collect", orb.rect.center, orb.color)
+                self.room.remove_entity("memory_orbs", orb)
                 
         # did player touch a ghost?
         if not player.is_dead:
-            for enemy in self.enemies:
+            for enemy in broadphase.near(player, "enemy"):
                 if player.rect.colliderect(enemy.rect):
                     player.die()
                     break
 
+        # rooms remember open doors now, so dont bounce straight back out of the one we arrived in
+        self.arrival_doors = [door for door in self.arrival_doors if player.rect.colliderect(door.rect)]
+
         # did player go thru a door?
-        for door in list(self.doors):
-            if door.is_open and player.rect.colliderect(door.rect):
+        for door in broadphase.near(player, "door"):
+            if door.is_open and door not in self.arrival_doors and player.rect.colliderect(door.rect):
                 if door.target_room:
                     # teleport 2 new room
                     self.load_room(door.target_room)
@@ -219,6 +397,7 @@ class Level:
                     player.pos.y = door.target_y
                     player.rect.x = player.pos.x
                     player.rect.y = player.pos.y
+                    self.arrival_doors = [d for d in self.doors if player.rect.colliderect(d.rect)]
                     break
 
         # camera lerps toward player
@@ -0,0 +1,169 @@
+import math
+import pygame
+from settings import *
+
+try:
+    import numpy as np
+except ImportError:  # no numpy = every light is a blit, still fine 4 a normal room
+    np = None
+
+# dynamic darkness. every frame the world gets multiplied by a darkness map: the ambient
+# color everywhere, plus a soft radial light 4 the player (+ a glow per memory they carry),
+# every orb and every door. doing that per pixel in python would take forever, so:
+#
+#   - each light is a pre-rendered radial mask, cached by (radius, color). intensity is folded
+#     in2 the color in LIGHT_STEPS steps and radii snap 2 LIGHT_RADIUS_STEP, so theres only
+#     ever a few hundred masks and a light is one additive blit
+#   - lights off screen get culled (orbs + doors come from the room's broadphase, not a scan)
+#   - the map only gets recomposited when the light list changes - something moved (the
+#     camera counts), an orb's pulse crossed a radius step, a memory faded a step, a door
+#     opened a bit. otherwise last frame's map is reused as is
+#   - past LIGHT_NUMPY_AT lights on screen, one numpy pass works out the whole map on a
+#     coarse grid and smoothscales it up, instead of a blit per light. the falloff is a
+#     gaussian, which splits in2 (x part) * (y part), so summing every light over every cell
+#     is just one matrix multiply
+#
+# a recomposite always makes a NEW surface, and nothing draws in2 one once its handed out -
+# so the render thread + the texture backend can hang on2 it like any other image.
+# targets take it thru shade(), which multiplies it over whatever's been drawn so far
+
+SHARPNESS = 2.0  # gaussian falloff, exp(-(SHARPNESS * dist / radius)^2) - ~2% left at the edge
+REACH = 256  # furthest any orb / door light gets past its rect, 4 the broadphase query
+
+
+def falloff(dist, radius):
+    return math.exp(-(SHARPNESS * dist / radius) ** 2)
+
+
+class Lighting:
+    enabled = True  # quality knob, see register_quality
+
+    def __init__(self, ambient=LIGHT_AMBIENT, numpy_at=LIGHT_NUMPY_AT):
+        self.ambient = ambient
+        self.numpy_at = numpy_at if np is not None else None
+        self.masks = {}  # (radius, color) -> mask surface
+        self.key = None  # what the current darkness map was built from
+        self.darkness = None
+        self.composites = 0
+
+    def clear(self):
+        self.masks.clear()
+        self.key = None
+        self.darkness = None
+
+    def mask(self, radius, color):
+        mask = self.masks.get((radius, color))
+        if mask is None:
+            size = radius * 2
+            if np is not None:
+                coords = np.arange(size, dtype=np.float32) - radius + 0.5
+                line = np.exp(-(SHARPNESS * coords / radius) ** 2)
+                rgb = (line[:, None] * line[None, :])[:, :, None] * np.array(color, np.float32)
+                mask = pygame.surfarray.make_surface(rgb.astype(np.uint8))
+            else:
+                # rings from the outside in, each a bit brighter
+                mask = pygame.Surface((size, size))
+                for r in range(radius, 0, -2):
+                    level = falloff(r, radius)
+                    pygame.draw.circle(mask, [int(c * level) for c in color], (radius, radius), r)
+            self.masks[(radius, color)] = mask
+        return mask
+
+    # --- what's lit ---
+
+    def add(self, lights, size, scale, x, y, radius, color, intensity=1.0):
+        step = min(LIGHT_STEPS, round(intensity * LIGHT_STEPS))
+        if step <= 0:
+            return
+        x, y, radius = x * scale, y * scale, radius * scale
+        if x + radius < 0 or y + radius < 0 or x - radius > size[0] or y - radius > size[1]:
+            return  # off screen
+        radius = max(LIGHT_RADIUS_STEP, round(radius / LIGHT_RADIUS_STEP) * LIGHT_RADIUS_STEP)
+        color = tuple(c * step // LIGHT_STEPS for c in color)
+        lights.append((round(x), round(y), radius, color))
+
+    def gather(self, level, player, size, scale):
+        """Every light on screen as (x, y, radius, color) in target pixels."""
+        lights = []
+        ox, oy = level.camera_offset.x, level.camera_offset.y
+        now = player.game.get_ticks()
+
+        cx, cy = player.rect.center
+        self.add(lights, size, scale, cx + ox, cy + oy, LIGHT_PLAYER_RADIUS, LIGHT_PLAYER_COLOR)
+        for memory in player.memories:
+            intensity = LIGHT_MEMORY_LEVEL
+            if memory.is_fading:
+                intensity *= max(0.0, 1 - (now - memory.fade_start_time) / MEMORY_FADE_MS)
+            self.add(lights, size, scale, cx + ox, cy + oy, LIGHT_MEMORY_RADIUS, memory.color, intensity)
+
+        left, right = -ox - REACH, -ox + WIDTH + REACH
+        for orb in level.room.broadphase.query(left, right, "orb"):
+            if not orb.collected:
+                self.add(lights, size, scale, orb.pos.x + ox, orb.pos.y + oy,
+                         orb.pulse_radius() * LIGHT_ORB_SCALE, orb.color)
+
+        for door in level.room.broadphase.query(left, right, "door"):
+            if door.is_open:
+                intensity = 1.0
+            elif door.opening:
+                swung = min(1.0, (now - door.opening_time) / door.open_duration)
+                intensity = LIGHT_DOOR_CLOSED + (1 - LIGHT_DOOR_CLOSED) * swung
+            else:
+                intensity = LIGHT_DOOR_CLOSED
+            color = MEMORY_TYPES[door.required_memory]['color'] if door.required_memory else LIGHT_DOOR_COLOR
+            self.add(lights, size, scale, door.rect.centerx + ox, door.rect.centery + oy,
+                     LIGHT_DOOR_RADIUS, color, intensity)
+        return lights
+
+    # --- building the map ---
+
+    def composite(self, lights, size):
+        darkness = pygame.Surface(size)  # already the display format, no convert() copy
+        darkness.fill(self.ambient)
+        darkness.blits([(self.mask(radius, color), (x - radius, y - radius), None, pygame.BLEND_RGB_ADD)
+                        for x, y, radius, color in lights], doreturn=False)
+        return darkness
+
+    def spread(self, cells, centers, radii):
+        d = (cells[None, :] - centers[:, None]) / radii[:, None]
+        # hard 0 past the radius like the masks - the far tail would be denormals, which r
+        # slow enough 2 make the matmul 20x slower
+        return np.where(np.abs(d) < 1, np.exp(-(SHARPNESS * d) ** 2), 0).astype(np.float32)
+
+    def composite_numpy(self, lights, size):
+        # every light at once on a coarse grid: light[x, y] = sum of color * gx[x] * gy[y]
+        w, h = size
+        xs = (np.arange(-(-w // LIGHT_GRID), dtype=np.float32) + 0.5) * LIGHT_GRID
+        ys = (np.arange(-(-h // LIGHT_GRID), dtype=np.float32) + 0.5) * LIGHT_GRID
+        table = np.array([(x, y, radius, *color) for x, y, radius, color in lights], np.float32)
+        gx = self.spread(xs, table[:, 0], table[:, 2])  # lights x columns
+        gy = self.spread(ys, table[:, 1], table[:, 2])  # lights x rows
+        # (color * gx) 4 all 3 channels side by side, then one matmul against gy
+        weighted = (table[:, 3:6, None] * gx[:, None, :]).reshape(len(table), -1)
+        light = (weighted.T @ gy).reshape(3, len(xs), len(ys)).transpose(1, 2, 0)
+        light += self.ambient
+        np.minimum(light, 255, out=light)
+        coarse = pygame.surfarray.make_surface(light.astype(np.uint8))
+        return pygame.transform.smoothscale(coarse.convert(), size)
+
+    def draw(self, target, level, player, scale=None):
+        if not self.enabled:
+            return
+        if scale is None:
+            scale = getattr(target, "scale", 1.0)  # a DrawList passes the world's in
+        size = (max(1, round(WIDTH * scale)), max(1, round(HEIGHT * scale)))
+        lights = self.gather(level, player, size, scale)
+
+        key = (size, lights)
+        if key != self.key:
+            if self.numpy_at is not None and len(lights) >= self.numpy_at:
+                self.darkness = self.composite_numpy(lights, size)
+            else:
+                self.darkness = self.composite(lights, size)
+            self.key = key
+            self.composites += 1
+        target.shade(self.darkness)
+
+
+def register_quality(governor, lighting):
+    governor.register("lighting", [True, True, True, False], lambda on: setattr(lighting, "enabled", on))
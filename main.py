@@ -1,24 +1,88 @@
 import pygame
 import sys
 import os
+import time
 from settings import *
 from player import Player
 from level import Level
 from ui import UI
 from menu import Menu
+from replay import ReplayRecorder, ReplayPlayer
+from savegame import SaveWriter, SaveError, load_game
+from hotreload import LevelWatcher
+from render import RenderTarget
+from texture import TextureTarget
+from quality import QualityGovernor, TIERS
+from effects import EffectsEngine
+from lighting import Lighting
+from latency import LatencyTracker, FramePacer
+from memstats import memory_ledger
+from telemetry import Telemetry
+from scheduler import Scheduler
+import bundle
+from renderthread import RenderThread, capture
+import effects
+import lighting
+import memory_orb
+import ghost
+import ui
 
 class Game:
-    def __init__(self):
+    def __init__(self, record_path=None, replay_path=None, fast=False, dev=False,
+                 render_scale=RENDER_SCALE, pixel_perfect=PIXEL_PERFECT, quality=None,
+                 latency=False, late_input=False, vsync=False, memory=False, render_thread=False,
+                 telemetry=None, backend="surface", lights=LIGHTING):
+        # dev mode reads the loose asset files, otherwise assets.pak if its there (see bundle.py)
+        bundle.loose_only = dev
+
         # init pygame
         pygame.init()
         pygame.mixer.init()
         
         # set up display
-        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
-        pygame.display.set_caption("Echoes of the Labyrinth")
+        self.textured = backend in ("texture", "software")
+        if self.textured:
+            # SDL renderer + textures (see texture.py). the hidden display is just there so
+            # convert() has a pixel format, menus draw in2 an offscreen overlay
+            pygame.display.set_mode((1, 1), pygame.HIDDEN)
+            self.world = TextureTarget(software=backend == "software", vsync=vsync)
+            self.screen = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+        else:
+            self.screen = pygame.display.set_mode((WIDTH, HEIGHT), vsync=int(vsync))
+            pygame.display.set_caption("Echoes of the Labyrinth")
+
+            # the level + player draw in here, then get scaled up 2 the window once
+            self.world = RenderTarget(self.screen, render_scale, pixel_perfect, offscreen=render_thread)
+        # the hud goes wherever the world went, on top
+        self.hud = self.world if self.textured else self.screen
+
+        # quality tiers - auto unless a tier was picked on the command line
+        if quality in TIERS:
+            self.quality = QualityGovernor(TIERS.index(quality), auto=False)
+        else:
+            self.quality = QualityGovernor(auto=QUALITY_AUTO)
+        # particles 4 orbs, fading memories, deaths, doors
+        self.effects = EffectsEngine()
+        # darkness + lights over the world (see lighting.py)
+        self.lighting = Lighting()
+        self.lighting.enabled = lights
+
+        # surface / sound bytes per category, with budgets (see memstats.py), None if neither is wanted
+        self.memory = memory_ledger(memory)
+
+        # deaths / pickups / doors / room changes streamed 2 disk (see telemetry.py)
+        self.telemetry = Telemetry(self, telemetry) if telemetry else None
+
+        self.pause_overlay = True
+        self.pause_surf = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+        self.pause_surf.fill((0, 0, 0, 128))
         
         # set up the clock
         self.clock = pygame.time.Clock()
+
+        # input latency measuring / late input sampling (see latency.py)
+        self.latency = LatencyTracker() if latency else None
+        self.pacer = FramePacer(late=late_input) if latency or late_input else None
         
         # game states
         self.state = "menu"  # menu, story, playing, paused, game_over
@@ -41,18 +105,53 @@ class Game:
         
         # pause menu buttons
         self.pause_buttons = []
+
+        # game clock - counts simulated ticks so timers dont care about lag or replays
+        self.ticks = 0
+        self.keys = pygame.key.get_pressed()
+        self.scheduler = Scheduler(self)
+
+        # input replays (see replay.py)
+        self.recorder = ReplayRecorder(record_path) if record_path else None
+        self.replay = ReplayPlayer(replay_path) if replay_path else None
+        self.fast_replay = fast
+        self.auto_respawn = self.replay is None  # replays bring their own respawns
+
+        # quick-save writes in the background
+        self.saver = SaveWriter(SAVE_PATH)
+
+        # dev mode picks up level json edits while u play
+        self.watcher = LevelWatcher(self) if dev else None
         
         # set music volume after loading
         pygame.mixer.music.set_volume(self.music_volume)
+
+        # everything with optional eye candy hooks into the governor
+        memory_orb.register_quality(self.quality)
+        ghost.register_quality(self.quality)
+        ui.register_quality(self.quality)
+        self.world.register_quality(self.quality)
+        effects.register_quality(self.quality, self.effects)
+        if lights:
+            lighting.register_quality(self.quality, self.lighting)
+        self.quality.register("pause_overlay", [True, True, True, False],
+                              lambda on: setattr(self, "pause_overlay", on))
+
+        # drawing on its own thread (see renderthread.py), starts once everything above exists
+        self.renderer = RenderThread(self) if render_thread else None
+        if self.renderer:
+            self.quality.guard = self.renderer.lock
+            if self.memory:
+                self.memory.guard = self.renderer.lock
         
     def load_assets(self):
         # load all the sounds
         self.sounds = {
-            'jump': pygame.mixer.Sound('assets/sounds/jump.wav'),
-            'collect': pygame.mixer.Sound('assets/sounds/collect.wav'),
-            'door_open': pygame.mixer.Sound('assets/sounds/door_open.wav'),
-            'memory_fade': pygame.mixer.Sound('assets/sounds/memory_fade.wav'),
-            'switch': pygame.mixer.Sound('assets/sounds/switch.wav')
+            'jump': bundle.sound('assets/sounds/jump.wav'),
+            'collect': bundle.sound('assets/sounds/collect.wav'),
+            'door_open': bundle.sound('assets/sounds/door_open.wav'),
+            'memory_fade': bundle.sound('assets/sounds/memory_fade.wav'),
+            'switch': bundle.sound('assets/sounds/switch.wav')
         }
         
         for sound in self.sounds.values():
@@ -64,15 +163,31 @@ class Game:
             'level1': 'assets/music/level1.mp3',
         }
     
+    def get_ticks(self):
+        # ms of game time, only moves while the level is actually running
+        return self.ticks * 1000 // FPS
+
     def start_level(self, level_number):
+        self.ticks = 0
+        self.scheduler.clear()
+        self.effects.clear()
         self.level = Level(self, level_number)
         self.player = Player(self, self.level.player_start_pos)
         self.state = "playing"
+        if self.recorder:
+            self.recorder.begin(level_number)
         
         # play the music 4 this level
-        pygame.mixer.music.load(self.music[f'level{level_number}'])
+        bundle.music(self.music[f'level{level_number}'])
         pygame.mixer.music.play(-1)
     
+    def respawn(self):
+        # RESPAWN_TICKS after Player.die
+        if self.player and self.player.is_dead:
+            self.player.respawn()
+            if self.recorder:
+                self.recorder.record_respawn()
+
     def pause_game(self):
         if self.state == "playing":
             self.state = "paused"
@@ -83,7 +198,7 @@ class Game:
     
     def show_story(self):
         """Show intro story screen before level start"""
-        img = pygame.image.load("assets/objects/initial_sign.png").convert_alpha()
+        img = bundle.image("assets/objects/initial_sign.png").convert_alpha()
         orig_w, orig_h = img.get_size()
         max_h = int(HEIGHT * 0.80)
         scale = max_h / orig_h
@@ -94,10 +209,11 @@ class Game:
         """Return to main menu from pause screen"""
         self.level = None
         self.player = None
+        self.scheduler.clear()
         self.state = "menu"
         self.menu.showing_controls = False
         try:
-            pygame.mixer.music.load(self.music['menu'])
+            bundle.music(self.music['menu'])
             pygame.mixer.music.play(-1)
         except Exception:
             pass
@@ -108,27 +224,40 @@ class Game:
         elif self.state == "story":
             pass  # nothing 2 update, just sitting there
         elif self.state == "playing":
+            self.ticks += 1
+            self.scheduler.advance()  # respawns, doors, memory fades due this tick
             self.player.update()
             self.level.update(self.player)
+            self.effects.update()
             self.ui.update()
+            if self.memory:
+                self.memory.update(self)
+            if self.watcher:
+                self.watcher.poll()
     
     def draw(self):
-        self.screen.fill(BG_COLOR)
+        if self.textured and self.state in ("playing", "paused"):
+            self.screen.fill((0, 0, 0, 0))  # only the pause screen goes in the overlay
+        else:
+            self.screen.fill(BG_COLOR)
         
         if self.state == "menu":
             self.menu.draw()
         elif self.state == "story":
             self._draw_story()
         elif self.state == "playing" or self.state == "paused":
-            self.level.draw(self.screen)
-            self.player.draw(self.screen)
-            self.ui.draw()
+            self.world.fill(BG_COLOR)
+            self.level.draw(self.world)
+            self.player.draw(self.world)
+            self.lighting.draw(self.world, self.level, self.player)
+            self.effects.draw(self.world, self.level.camera_offset)
+            self.world.present()
+            self.ui.draw(self.hud)
             
             if self.state == "paused":
-                # dark overlay so it looks paused
-                pause_surf = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-                pause_surf.fill((0, 0, 0, 128))
-                self.screen.blit(pause_surf, (0, 0))
+                # dark overlay so it looks paused (built once in __init__)
+                if self.pause_overlay:
+                    self.screen.blit(self.pause_surf, (0, 0))
                 
                 # big PAUSED text
                 font = pygame.font.Font(None, 72)
@@ -175,7 +304,10 @@ class Game:
                     btn_text_rect = btn_text.get_rect(center=btn_rect.center)
                     self.screen.blit(btn_text, btn_text_rect)
         
-        pygame.display.flip()
+        if self.textured:
+            self.world.flip(None if self.state == "playing" else self.screen)
+        else:
+            pygame.display.flip()
 
     def _draw_story(self):
         self.screen.fill((10, 8, 20))
@@ -186,27 +318,90 @@ class Game:
         prompt = font.render("Press any key to begin...", True, (170, 170, 170))
         self.screen.blit(prompt, prompt.get_rect(center=(WIDTH // 2, HEIGHT - 40)))
 
+    def quick_save(self):
+        rooms = self.saver.save(self)
+        print(f"quick-saved ({rooms} rooms written)")
+
+    def quick_load(self):
+        self.saver.flush()  # make sure the last save actually hit the disk
+        try:
+            load_game(self, SAVE_PATH)
+        except (OSError, SaveError) as e:
+            print(f"couldnt load: {e}")
+            return
+        self.saver.forget()
+
+    def quit(self):
+        if self.renderer:
+            self.renderer.stop()
+            print(f"render thread: {self.renderer.presented} frames shown, {self.renderer.skipped} skipped")
+        self.saver.flush()
+        if self.telemetry:
+            self.telemetry.close()
+            if self.telemetry.dropped:
+                print(f"telemetry: writer fell behind, {self.telemetry.dropped} events dropped")
+        if self.latency:
+            self.latency.report()
+        if self.memory and self.memory.verbose:
+            self.memory.measure(self)
+            print(self.memory.report())
+        if self.recorder:
+            self.recorder.save()
+        pygame.quit()
+        sys.exit()
+
+    def run_replay_fast(self):
+        # no drawing, no frame cap - just chew thru the log as fast as we can
+        self.start_level(self.replay.level_number)
+        while not self.replay.finished:
+            if self.replay.index % 1000 == 0:
+                pygame.event.pump()  # keep the OS happy
+            self.replay.feed(self)
+            self.update()
+            self.replay.verify(self)
+        self.report_replay()
+        self.quit()
+
+    def report_replay(self):
+        if self.replay.mismatch is None:
+            print(f"replay ok: {len(self.replay.ticks)} ticks matched")
+        else:
+            print(f"replay desynced at tick {self.replay.mismatch}")
+
     def run(self):
-        # kick things off with menu music
-        pygame.mixer.music.load(self.music['menu'])
-        pygame.mixer.music.play(-1)
+        if self.replay and self.fast_replay:
+            self.run_replay_fast()
+
+        if self.replay:
+            self.start_level(self.replay.level_number)
+        else:
+            # kick things off with menu music
+            bundle.music(self.music['menu'])
+            pygame.mixer.music.play(-1)
         
         while True:
+            if self.pacer:
+                self.pacer.wait()  # sleeps here instead of in clock.tick
+                events = self.pacer.events()
+            else:
+                events = [(event, None) for event in pygame.event.get()]
+            frame_start = time.perf_counter()
+
             # handle all input events
-            for event in pygame.event.get():
+            for event, stamp in events:
                 if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+                    self.quit()
                 
-                # timer fires when its time 2 respawn
-                if event.type == pygame.USEREVENT + 1:
-                    if self.player and self.player.is_dead:
-                        self.player.respawn()
-                    
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
                         if self.state in ["playing", "paused"]:
                             self.pause_game()
+                    elif event.key in (pygame.K_F5, pygame.K_F9):
+                        if self.state in ["playing", "paused"] and not self.replay:
+                            if event.key == pygame.K_F5:
+                                self.quick_save()
+                            else:
+                                self.quick_load()
                 
                 # snapshot state b4 any transitions - prevents click fallthrough bugs
                 event_state = self.state
@@ -231,19 +426,82 @@ class Game:
                         self.start_level(1)
                 elif event_state == "menu":
                     self.menu.handle_event(event)
-                elif event_state == "playing":
+                elif event_state == "playing" and not self.replay:
                     if self.player and not self.player.is_dead:
                         self.player.handle_event(event)
-            
+                        if self.latency and event.type in (pygame.KEYDOWN, pygame.KEYUP):
+                            self.latency.input(stamp)
+                        if self.recorder:
+                            self.recorder.record_event(event)
+
+            # poll held keys once per tick, replays swap in their own
+            self.keys = pygame.key.get_pressed()
+            simulating = self.state == "playing"
+            if simulating and self.replay:
+                if self.replay.finished:
+                    self.report_replay()
+                    self.quit()
+                self.replay.feed(self)
+
             # update all the game logic
             self.update()
+
+            if simulating and self.recorder:
+                self.recorder.end_tick(self.keys, self)
+            elif simulating and self.replay:
+                self.replay.verify(self)
             
-            # draw all the stuff
-            self.draw()
+            # draw all the stuff - or just write it down 4 the render thread
+            threaded = self.renderer and self.state == "playing"
+            if threaded:
+                self.renderer.show()  # whatever the render thread finished since last tick
+                self.renderer.publish(capture(self))
+            elif self.renderer:
+                with self.renderer.lock:
+                    self.renderer.drop()
+                    self.draw()
+            else:
+                self.draw()
+            if self.pacer:
+                presented = self.pacer.presented()
+                if self.latency and not threaded:
+                    self.latency.presented(presented)
+
+            # how long the real work took, sleeping in tick() doesnt count
+            self.quality.frame((time.perf_counter() - frame_start) * 1000)
             
             # cap it at FPS
-            self.clock.tick(FPS)
+            if not self.pacer:
+                self.clock.tick(FPS)
 
 if __name__ == "__main__":
-    game = Game()
+    import argparse
+
+    parser = argparse.ArgumentParser(description=TITLE)
+    parser.add_argument("--record", metavar="FILE", help="record an input replay 2 FILE")
+    parser.add_argument("--replay", metavar="FILE", help="play back a recorded replay")
+    parser.add_argument("--fast", action="store_true", help="play the replay unthrottled without drawing")
+    parser.add_argument("--dev", action="store_true", help="hot reload the level json when it changes")
+    parser.add_argument("--render-scale", type=float, default=RENDER_SCALE, help="internal world resolution, e.g. 0.5")
+    parser.add_argument("--pixel-perfect", action="store_true", default=PIXEL_PERFECT, help="integer upscale only")
+    parser.add_argument("--quality", choices=TIERS + ("auto",), default="auto", help="lock a quality tier")
+    parser.add_argument("--latency", action="store_true", help="measure input 2 screen latency, report on quit")
+    parser.add_argument("--late-input", action="store_true", help="read input as late as possible b4 each frame")
+    parser.add_argument("--vsync", action="store_true", help="sync presents 2 the display refresh")
+    parser.add_argument("--memory", action="store_true", help="print surface/sound memory use as u play")
+    parser.add_argument("--render-thread", action="store_true", help="draw on a 2nd thread while the game updates")
+    parser.add_argument("--backend", choices=("surface", "texture", "software"), default="surface",
+                        help="texture = SDL renderer + gpu textures, software = same on the cpu")
+    parser.add_argument("--telemetry", nargs="?", const="telemetry", metavar="DIR",
+                        help="log deaths, pickups, doors + room changes 2 DIR (default telemetry/)")
+    parser.add_argument("--no-lighting", action="store_true", help="fully lit rooms, no darkness pass")
+    args = parser.parse_args()
+    if args.render_thread and args.backend != "surface":
+        parser.error("--render-thread only works with --backend surface")
+
+    game = Game(record_path=args.record, replay_path=args.replay, fast=args.fast, dev=args.dev,
+                render_scale=args.render_scale, pixel_perfect=args.pixel_perfect, quality=args.quality,
+                latency=args.latency, late_input=args.late_input, vsync=args.vsync,
+                memory=args.memory, render_thread=args.render_thread, telemetry=args.telemetry,
+                backend=args.backend, lights=LIGHTING and not args.no_lighting)
     game.run()
\ No newline at end of file
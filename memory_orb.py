@@ -1,8 +1,30 @@
 import pygame
 import math
 from settings import *
+import images
+
+# glow rings, built once instead of every frame (and the texture backend only has 2 upload
+# each one once). keyed by exactly what ends up in the pixels - size, center + every ring's
+# alpha - so a cached glow is the same one the old per frame code would have drawn
+glows = {}
+
+
+def glow_surface(color, radius, pulse_size, pulse):
+    rings = tuple(max(0, min(255, int(100 * (pulse - r) / pulse_size))) for r in range(int(pulse), int(radius - 2), -1))
+    key = (color, int(pulse * 2), int(pulse), rings)
+    surface = glows.get(key)
+    if surface is None:
+        size, center = key[1], key[2]
+        surface = pygame.Surface((size, size), pygame.SRCALPHA)
+        for r, alpha in zip(range(center, int(radius - 2), -1), rings):
+            pygame.draw.circle(surface, (*color, alpha), (center, center), r)
+        glows[key] = surface
+    return surface
+
 
 class MemoryOrb(pygame.sprite.Sprite):
+    glow = True  # quality knob, see register_quality
+
     def __init__(self, x, y, memory_type, duration=None):
         super().__init__()
         self.pos = pygame.math.Vector2(x, y)
@@ -27,15 +49,11 @@ class MemoryOrb(pygame.sprite.Sprite):
         self.fade_start_time = 0
         
         # cassette image - same 4 all orbs regardless of color
-        raw = pygame.image.load("assets/ui/memory_icon.png").convert_alpha()
-        self.cassette = pygame.transform.scale(raw, (36, 36))
-
-        # sprite groups need an image attr 2 work
-        self.image = pygame.Surface((self.radius * 2, self.radius * 2), pygame.SRCALPHA)
+        self.cassette = images.load("assets/ui/memory_icon.png", (36, 36), alpha=True)
         
-    def collect(self):
+    def collect(self, now):
         self.collected = True
-        self.collected_time = pygame.time.get_ticks()
+        self.collected_time = now
         
     def update(self):
         # make it pulse
@@ -43,28 +61,31 @@ class MemoryOrb(pygame.sprite.Sprite):
         if self.pulse_offset > 2 * 3.14159:
             self.pulse_offset = 0
             
+    def pulse_radius(self):
+        # glow size changes with the pulse (the light it gives off does 2, see lighting.py)
+        return self.radius + self.pulse_size * abs(math.sin(self.pulse_offset))
+
     def draw(self, screen, offset):
         if not self.collected:
             cx = int(self.pos.x + offset.x)
             cy = int(self.pos.y + offset.y)
 
-            # glow size changes with the pulse
-            pulse = self.radius + self.pulse_size * abs(math.sin(self.pulse_offset))
-
-            # glow behind everything
-            glow_surface = pygame.Surface((int(pulse * 2), int(pulse * 2)), pygame.SRCALPHA)
-            for r in range(int(pulse), int(self.radius - 2), -1):
-                alpha = max(0, min(255, int(100 * (pulse - r) / self.pulse_size)))
-                pygame.draw.circle(glow_surface, (*self.color, alpha),
-                                   (int(pulse), int(pulse)), r)
-            screen.blit(glow_surface, (cx - int(pulse), cy - int(pulse)))
+            if self.glow:
+                # glow behind everything
+                pulse = self.pulse_radius()
+                glow = glow_surface(self.color, self.radius, self.pulse_size, pulse)
+                screen.blit(glow, (cx - int(pulse), cy - int(pulse)))
 
             # colored circle under the cassette
             orb_r = self.radius - 2
             dark = tuple(max(0, c - 55) for c in self.color)
-            pygame.draw.circle(screen, dark, (cx, cy), orb_r)
-            pygame.draw.circle(screen, self.color, (cx, cy), orb_r - 2)
+            screen.circle(dark, (cx, cy), orb_r)
+            screen.circle(self.color, (cx, cy), orb_r - 2)
 
             # cassette on top
             cw, ch = self.cassette.get_size()
-            screen.blit(self.cassette, (cx - cw // 2, cy - ch // 2))
\ No newline at end of file
+            screen.blit(self.cassette, (cx - cw // 2, cy - ch // 2))
+
+def register_quality(governor):
+    # the pulsing glow is pure eye candy
+    governor.register("orb_glow", [True, True, False], lambda on: setattr(MemoryOrb, "glow", on))
@@ -0,0 +1,206 @@
+import pygame
+from contextlib import nullcontext
+from settings import *
+import images
+
+# memory accounting - walks everything that holds surfaces / sounds and adds up the bytes,
+# by category. a surface shared by lots of sprites (see images.py) is only counted once,
+# under the first category that uses it, so "caches" is just what ONLY a cache is keeping
+# alive. every MEMORY_CHECK_INTERVAL ticks + after every load_room the totals get checked
+# against MEMORY_BUDGETS: tiles over budget clear the shared image cache (thats where tile
+# surfaces live, not in the rooms), entities over budget push old rooms out of the pool,
+# caches over budget get cleared, anything still over prints a warning (once)
+#
+# rooms get walked once, when they're built (room_bytes), after that a check only adds up
+# the few distinct surfaces each room uses instead of going over every tile again.
+# theres only a ledger at all with --memory or a budget in MEMORY_BUDGETS
+
+CATEGORIES = ("tiles", "entities", "ui", "audio", "caches")
+
+# room group -> name in the per room breakdown
+ROOM_PARTS = (("tiles", "tiles"), ("background_tiles", "background"), ("memory_orbs", "orbs"),
+              ("doors", "doors"), ("levers", "levers"), ("switches", "switches"),
+              ("platforms", "platforms"), ("enemies", "enemies"))
+
+
+def surface_bytes(surface):
+    if surface.get_parent() is not None:
+        return 0  # subsurface, the pixels belong 2 its parent
+    return surface.get_pitch() * surface.get_height()
+
+
+def sound_bytes(sound):
+    mixer = pygame.mixer.get_init()
+    if not mixer or not isinstance(sound, pygame.mixer.Sound):
+        return 0
+    freq, size, channels = mixer
+    return int(sound.get_length() * freq) * channels * (abs(size) // 8)
+
+
+def surfaces_in(value, depth=3, top=True):
+    """Every surface in value - an object's attributes, or lists / dicts of them."""
+    if isinstance(value, pygame.Surface):
+        yield value
+    elif depth > 0:
+        if isinstance(value, dict):
+            values = value.values()
+        elif isinstance(value, (list, tuple)):
+            values = value
+        elif top and hasattr(value, "__dict__"):
+            # only the object itself, not whatever it points at (ui.game would drag in everything)
+            values = vars(value).values()
+        else:
+            return
+        for item in values:
+            yield from surfaces_in(item, depth - 1, False)
+
+
+def format_bytes(n):
+    if n >= 1024 * 1024:
+        return f"{n / (1024 * 1024):.1f}MB"
+    return f"{n / 1024:.0f}KB"
+
+
+class Tally:
+    def __init__(self):
+        self.seen = set()
+        self.bytes = {}
+
+    def add(self, category, *things):
+        for thing in things:
+            for surface in surfaces_in(thing):
+                if id(surface) not in self.seen:
+                    self.seen.add(id(surface))
+                    self.bytes[category] = self.bytes.get(category, 0) + surface_bytes(surface)
+
+    def add_known(self, category, known):
+        # surface id -> bytes, from room_bytes
+        for key, n in known.items():
+            if key not in self.seen:
+                self.seen.add(key)
+                self.bytes[category] = self.bytes.get(category, 0) + n
+
+    def add_sound(self, category, sound):
+        if id(sound) not in self.seen:
+            self.seen.add(id(sound))
+            self.bytes[category] = self.bytes.get(category, 0) + sound_bytes(sound)
+
+
+def measure_room(room):
+    tally = Tally()
+    for group_name, part in ROOM_PARTS:
+        tally.add(part, *getattr(room, group_name))
+    tally.add("signs", room.signs)
+    return tally.bytes
+
+
+def distinct(*things):
+    return {id(surface): surface_bytes(surface) for thing in things for surface in surfaces_in(thing)}
+
+
+def room_bytes(room):
+    """(per part bytes, tile surfaces, entity surfaces) 4 a room, worked out once + kept on it."""
+    if room.bytes is None:
+        entities = [entity for group_name, _ in ROOM_PARTS[2:] for entity in getattr(room, group_name)]
+        room.bytes = (measure_room(room), distinct(*room.tiles, *room.background_tiles),
+                      distinct(*entities, room.signs))
+    return room.bytes
+
+
+def memory_ledger(verbose, budgets=MEMORY_BUDGETS):
+    """A MemoryLedger, or None if nobody asked 4 stats + theres no budget 2 keep."""
+    if verbose or any(budget is not None for budget in budgets.values()):
+        return MemoryLedger(budgets, verbose)
+    return None
+
+
+class MemoryLedger:
+    def __init__(self, budgets=MEMORY_BUDGETS, verbose=False, interval=MEMORY_CHECK_INTERVAL):
+        self.budgets = budgets
+        self.verbose = verbose  # --memory: print totals + room breakdowns as we go
+        self.interval = interval
+        self.countdown = interval
+        self.totals = dict.fromkeys(CATEGORIES, 0)
+        self.warned = set()
+        self.guard = nullcontext()  # the render thread's lock when there is one
+
+    def measure(self, game, level=None):
+        level = level or game.level
+        tally = Tally()
+        if level:
+            rooms = [room_bytes(room) for room in level.room_pool.values()]
+            for _, tiles, _ in rooms:
+                tally.add_known("tiles", tiles)
+            for _, _, entities in rooms:
+                tally.add_known("entities", entities)
+        if game.player:
+            tally.add("entities", game.player)
+
+        tally.add("ui", game.ui, game.menu, game.story_image, game.pause_surf)
+        for sound in game.sounds.values():
+            tally.add_sound("audio", sound)
+
+        tally.add("caches", list(images.cache.values()), getattr(game.world, "surface", None),
+                  list(game.world.images.values()), game.effects.frames,
+                  list(game.lighting.masks.values()), game.lighting.darkness)
+
+        self.totals = {category: tally.bytes.get(category, 0) for category in CATEGORIES}
+        return self.totals
+
+    def update(self, game):
+        self.countdown -= 1
+        if self.countdown > 0:
+            return
+        self.countdown = self.interval
+        self.check(game)
+        if self.verbose:
+            print(self.report())
+
+    def room_loaded(self, level):
+        game = level.game
+        if self.verbose:
+            parts = room_bytes(level.room)[0]
+            total = sum(parts.values())
+            detail = "  ".join(f"{part} {format_bytes(n)}" for part, n in parts.items() if n)
+            print(f"room {level.current_room}: {format_bytes(total)} ({detail})")
+        self.check(game, level)
+
+    def check(self, game, level=None):
+        with self.guard:  # the render thread fills the scaled image cache as it goes
+            self._check(game, level)
+
+    def _check(self, game, level=None):
+        level = level or game.level
+        totals = self.measure(game, level)
+        for category in CATEGORIES:
+            budget = self.budgets.get(category)
+            if budget is None or totals[category] <= budget:
+                self.warned.discard(category)
+                continue
+
+            if category == "caches":
+                images.clear()
+                game.world.images.clear()
+                game.lighting.clear()
+                totals = self.measure(game, level)
+            elif category == "tiles":
+                # tile images r shared thru images.cache, dropping rooms from the pool wouldnt
+                # free any. letting go of the cache frees the ones no pooled room still uses
+                images.clear()
+                totals = self.measure(game, level)
+            elif category == "entities" and level:
+                # rooms we already left r the only thing we can give back
+                size = len(level.room_pool)
+                while totals[category] > budget and size > 1:
+                    size -= 1
+                    level.shrink_pool(size)
+                    totals = self.measure(game, level)
+
+            if totals[category] > budget and category not in self.warned:
+                self.warned.add(category)
+                print(f"memory: {category} at {format_bytes(totals[category])}, "
+                      f"over the {format_bytes(budget)} budget")
+
+    def report(self):
+        parts = "  ".join(f"{category} {format_bytes(self.totals[category])}" for category in CATEGORIES)
+        return f"memory: {parts}  total {format_bytes(sum(self.totals.values()))}"
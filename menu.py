@@ -59,6 +59,7 @@ class Menu:
             "Space - Jump",
             "E - Interact with objects",
             "Esc - Pause game",
+            "F5 / F9 - Quick-save / Quick-load",
             "",
             "Press any key to return"
         ]
@@ -0,0 +1,103 @@
+from collections import deque
+from settings import *
+
+# one shared flow field per room: a BFS outwards from the player's tile over every
+# open cell. chasing ghosts just look at their own cell and step 2 the neighbour
+# thats closer, so it costs the same whether theres 1 ghost or 50.
+# the BFS only reruns when the player moves 2 a different cell, and its spread
+# over a few frames (FLOW_FIELD_BUDGET cells each) - ghosts keep using the old
+# field until the new one is done
+
+UNREACHED = -1
+NEIGHBOURS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+
+
+class FlowField:
+    def __init__(self, tile_grid, cols, rows, budget=FLOW_FIELD_BUDGET):
+        self.cols = cols
+        self.rows = rows
+        self.budget = budget
+
+        # 1 = ghosts can float thru, 0 = solid foreground tile
+        self.walkable = bytearray(b"\x01" * (cols * rows))
+        for (cx, cy) in tile_grid:
+            if 0 <= cx < cols and 0 <= cy < rows:
+                self.walkable[cy * cols + cx] = 0
+
+        self.distance = None  # finished field the ghosts read from
+        self.target = None
+        self._building = None  # (target, distance, queue) while a rebuild is in progress
+
+    def cell_at(self, pos):
+        cx, cy = int(pos[0] // TILE_SIZE), int(pos[1] // TILE_SIZE)
+        if 0 <= cx < self.cols and 0 <= cy < self.rows:
+            return cx, cy
+        return None
+
+    def open_cell(self, cx, cy):
+        return 0 <= cx < self.cols and 0 <= cy < self.rows and self.walkable[cy * self.cols + cx]
+
+    def set_open(self, cx, cy, is_open):
+        # a tile got added/removed (hot reload) - throw the field away so it rebuilds
+        if 0 <= cx < self.cols and 0 <= cy < self.rows:
+            self.walkable[cy * self.cols + cx] = 1 if is_open else 0
+            self.target = None
+            self._building = None
+
+    def update(self, player_pos):
+        cell = self.cell_at(player_pos)
+        building_toward = self._building[0] if self._building else self.target
+        if cell is not None and cell != building_toward:
+            distance = [UNREACHED] * (self.cols * self.rows)
+            distance[cell[1] * self.cols + cell[0]] = 0
+            self._building = (cell, distance, deque([cell]))
+
+        if self._building:
+            self._grow()
+
+    def _grow(self):
+        target, distance, queue = self._building
+        cols = self.cols
+        for _ in range(self.budget):
+            if not queue:
+                # done - swap it in
+                self.distance = distance
+                self.target = target
+                self._building = None
+                return
+            cx, cy = queue.popleft()
+            step = distance[cy * cols + cx] + 1
+            for dx, dy in NEIGHBOURS:
+                nx, ny = cx + dx, cy + dy
+                if not self.open_cell(nx, ny) or distance[ny * cols + nx] != UNREACHED:
+                    continue
+                # no cutting corners thru walls on diagonals
+                if dx and dy and not (self.open_cell(cx + dx, cy) and self.open_cell(cx, cy + dy)):
+                    continue
+                distance[ny * cols + nx] = step
+                queue.append((nx, ny))
+
+    def next_cell(self, pos):
+        """Neighbouring cell one step closer 2 the player, or None if theres no way there."""
+        if self.distance is None:
+            return None
+        cell = self.cell_at(pos)
+        if cell is None:
+            return None
+        cx, cy = cell
+        here = self.distance[cy * self.cols + cx]
+        if here == 0:
+            return cell
+
+        best = None
+        best_distance = here if here != UNREACHED else None
+        for dx, dy in NEIGHBOURS:
+            nx, ny = cx + dx, cy + dy
+            if not self.open_cell(nx, ny):
+                continue
+            if dx and dy and not (self.open_cell(cx + dx, cy) and self.open_cell(cx, cy + dy)):
+                continue
+            d = self.distance[ny * self.cols + nx]
+            if d != UNREACHED and (best_distance is None or d < best_distance):
+                best, best_distance = (nx, ny), d
+        return best
@@ -0,0 +1,159 @@
+import bisect
+import json
+import math
+from functools import lru_cache
+
+# moving platform paths, baked in2 one table of whole pixel positions per tick.
+#
+# the old platforms did start + move * progress every frame with progress a float that
+# kept getting speed added 2 it, then int() chopped it. 0.07 comes out as 0.07000000000000001
+# or 0.06999999999999999 depending on the tick, so the per tick delta went 1, 1, 0, 2, 1 ...
+# and whoever was riding it got shaken around by the same amount.
+#
+# now when a room gets built, each platform's path is worked out once:
+#
+#   - waypoints r joined by straight lines or a catmull-rom spline that goes thru all of them
+#   - every segment is cut in2 small pieces + the lengths added up, so "how far along" (arc
+#     length) can be turned back in2 a spot on the curve - a spline moves at the speed u asked
+#     4, not faster where the waypoints r far apart
+#   - each segment has its own speed (px per tick) and easing, so the time 4 a segment is
+#     length / speed ticks and the easing decides how far along it is on each of those
+#   - every tick's spot gets rounded 2 a whole pixel, once, and the whole cycle (there + back
+#     4 pingpong, round + round 4 loop) goes in the table
+#
+# a platform then just keeps a frame number. a tick is frame + 1 (mod the cycle) and a table
+# lookup, and the delta is the difference of 2 whole pixel spots, so it never drifts.
+# tables r cached by path, so rooms that get rebuilt when u come back dont bake again.
+#
+# json, next 2 x / y / width / height / id in a moving platform:
+#   "move_x": 0, "move_y": -100, "speed": 0.01      <- the old way, still works (speed = fraction per tick)
+#   "path": {"points": [[500, 350], [500, 200]],     <- waypoints after x, y
+#            "speed": 2 or [2, 0.5],                  <- px per tick, one 4 all or one per segment
+#            "ease": "inout" or ["in", "linear"],     <- linear / in / out / inout, same idea
+#            "curve": "line" or "spline",
+#            "mode": "pingpong" or "loop"}           <- loop drives back 2 the start + goes again
+
+EASES = {
+    "linear": lambda t: t,
+    "in": lambda t: t * t,
+    "out": lambda t: 1 - (1 - t) * (1 - t),
+    "inout": lambda t: t * t * (3 - 2 * t),
+}
+PIECE = 4  # px of curve per piece when measuring arc length
+
+
+class Path:
+    """One whole cycle of a platform's movement, a whole pixel (x, y) per tick."""
+
+    def __init__(self, points):
+        self.points = points
+        self.period = len(points)
+        xs = [x for x, y in points]
+        ys = [y for x, y in points]
+        self.bounds = (min(xs), min(ys), max(xs), max(ys))
+
+    def at(self, frame):
+        return self.points[frame % self.period]
+
+
+def pixel(v):
+    return math.floor(v + 0.5)
+
+
+def legacy(x, y, move_x, move_y, speed):
+    # start + move * progress, progress 0 -> 1 -> 0 in speed steps, but exact this time
+    if speed <= 0 or (move_x == 0 and move_y == 0):
+        return [(pixel(x), pixel(y))]
+    ticks = max(1, math.ceil(round(1 / speed, 9)))
+    return pingpong([(pixel(x + move_x * min(1.0, k * speed)), pixel(y + move_y * min(1.0, k * speed)))
+                     for k in range(ticks + 1)])
+
+
+def pingpong(there):
+    # there + back, without the 2 ends twice
+    return there + there[-2:0:-1]
+
+
+def each(value, count):
+    # one value 4 every segment, or a list with one per segment (the last one repeats)
+    if not isinstance(value, list):
+        return [value] * count
+    return [value[min(i, len(value) - 1)] for i in range(count)]
+
+
+def catmull_rom(p0, p1, p2, p3, t):
+    t2, t3 = t * t, t * t * t
+    return tuple(0.5 * (2 * b + (c - a) * t + (2 * a - 5 * b + 4 * c - d) * t2 + (3 * b - a - 3 * c + d) * t3)
+                 for a, b, c, d in zip(p0, p1, p2, p3))
+
+
+def segment_curve(waypoints, i, spline, closed):
+    """The i-th segment as a function of t (0..1)."""
+    n = len(waypoints)
+    p1, p2 = waypoints[i], waypoints[(i + 1) % n]
+    if not spline:
+        return lambda t: (p1[0] + (p2[0] - p1[0]) * t, p1[1] + (p2[1] - p1[1]) * t)
+    if closed:
+        p0, p3 = waypoints[(i - 1) % n], waypoints[(i + 2) % n]
+    else:
+        # open ends just repeat the end point, so the curve still starts + stops on it
+        p0, p3 = waypoints[max(0, i - 1)], waypoints[min(n - 1, i + 2)]
+    return lambda t: catmull_rom(p0, p1, p2, p3, t)
+
+
+def measure(curve):
+    # arc length table: cumulative length at each piece + the spots themselves
+    chord = math.dist(curve(0.0), curve(1.0))
+    pieces = max(8, int(chord / PIECE))
+    spots = [curve(k / pieces) for k in range(pieces + 1)]
+    lengths = [0.0]
+    for a, b in zip(spots, spots[1:]):
+        lengths.append(lengths[-1] + math.dist(a, b))
+    return spots, lengths
+
+
+def along(spots, lengths, distance):
+    # spot that far along the segment, in between 2 pieces if need be
+    i = min(len(lengths) - 1, max(1, bisect.bisect_left(lengths, distance)))
+    a, b = spots[i - 1], spots[i]
+    span = lengths[i] - lengths[i - 1]
+    t = (distance - lengths[i - 1]) / span if span else 0.0
+    return a[0] + (b[0] - a[0]) * t, a[1] + (b[1] - a[1]) * t
+
+
+def waypoint_path(x, y, path):
+    waypoints = [(x, y)] + [tuple(point) for point in path["points"]]
+    closed = path.get("mode", "pingpong") == "loop"
+    spline = path.get("curve", "line") == "spline"
+    count = len(waypoints) if closed else len(waypoints) - 1
+    if count < 1 or (count == 1 and closed):
+        return [(pixel(x), pixel(y))]
+    speeds = each(path.get("speed", 1), count)
+    eases = [EASES[name] for name in each(path.get("ease", "linear"), count)]
+
+    ticks = []
+    for i in range(count):
+        spots, lengths = measure(segment_curve(waypoints, i, spline, closed))
+        total = lengths[-1]
+        steps = max(1, round(total / speeds[i])) if speeds[i] > 0 else 1
+        for k in range(steps):  # the end of the segment is the start of the next one
+            spot = along(spots, lengths, total * eases[i](k / steps))
+            ticks.append((pixel(spot[0]), pixel(spot[1])))
+    if closed:
+        return ticks  # the last segment ends back at the start, which is frame 0
+    ticks.append((pixel(waypoints[-1][0]), pixel(waypoints[-1][1])))
+    return pingpong(ticks)
+
+
+@lru_cache(maxsize=1024)
+def baked(key):
+    data = json.loads(key)
+    if "path" in data:
+        return Path(waypoint_path(data["x"], data["y"], data["path"]))
+    return Path(legacy(data["x"], data["y"], data.get("move_x", 0), data.get("move_y", 0), data.get("speed", 0)))
+
+
+def platform_path(platform_data):
+    """The baked Path 4 a moving platform's json (cached, so keep the result read only)."""
+    keys = ("x", "y", "move_x", "move_y", "speed", "path")
+    return baked(json.dumps({k: platform_data[k] for k in keys if k in platform_data}, sort_keys=True))
@@ -1,5 +1,9 @@
 import pygame
 from settings import *
+from collision import sweep_aabb, swept_bounds, penetration
+import images
+import telemetry
+from scheduler import tick_past
 
 class Player:
     def __init__(self, game, start_pos):
@@ -21,6 +25,12 @@ class Player:
         self.interacting = False
         self.on_moving_platform = None
         self.is_dead = False
+        self.respawn_timer = None
+
+        # forgiving jumps: space pressed a few ticks b4 landing still counts (jump_buffer),
+        # and so does space pressed a few ticks after walking off a ledge (coyote)
+        self.jump_buffer = 0
+        self.coyote = 0
         
         # animation stuff
         self.current_sprite = 0
@@ -34,40 +44,48 @@ class Player:
         self.memories = []
         
     def load_sprites(self):
-        # load every animation from disk
-        self.animations = {
-            "idle": [pygame.image.load(f"assets/player/idle/{i}.png") for i in range(4)],
-            "walk": [pygame.image.load(f"assets/player/walk/{i}.png") for i in range(6)],
-            "jump": [pygame.image.load(f"assets/player/jump/{i}.png") for i in range(2)],
-            "fall": [pygame.image.load(f"assets/player/fall/{i}.png") for i in range(2)]
-        }
-        
-        # resize all of them 2 match player size
-        for action in self.animations:
-            for i, sprite in enumerate(self.animations[action]):
-                self.animations[action][i] = pygame.transform.scale(sprite, (int(self.size.x), int(self.size.y)))
+        # load every animation from disk, sized 2 the player + flipped copies 4 facing left
+        size = (int(self.size.x), int(self.size.y))
+        counts = {"idle": 4, "walk": 6, "jump": 2, "fall": 2}
+        self.animations = {state: [images.load(f"assets/player/{state}/{i}.png", size) for i in range(n)]
+                           for state, n in counts.items()}
+        self.animations_left = {state: [images.load(f"assets/player/{state}/{i}.png", size, flip=True)
+                                        for i in range(n)]
+                                for state, n in counts.items()}
         
     def handle_event(self, event):
         if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_SPACE and self.on_ground:
-                self.jump()
+            if event.key == pygame.K_SPACE:
+                if self.can_jump():
+                    self.jump()
+                else:
+                    self.jump_buffer = JUMP_BUFFER_FRAMES  # remember it til we land
             elif event.key == pygame.K_e:
                 self.interacting = True
         elif event.type == pygame.KEYUP:
             if event.key == pygame.K_e:
                 self.interacting = False
     
+    def can_jump(self):
+        return self.on_ground or self.coyote > 0
+
     def jump(self):
-        if self.on_ground:
+        if self.can_jump():
             self.vel.y = -PLAYER_JUMP_STRENGTH
             self.jumping = True
             self.on_ground = False
+            self.jump_buffer = 0
+            self.coyote = 0
             self.game.sounds['jump'].play()
             self.state = "jump"
     
     def collect_memory(self, memory):
         self.memories.append(memory)
+        self.schedule_fade(memory)
         self.game.sounds['collect'].play()
+        if self.game.telemetry:
+            self.game.telemetry.record(telemetry.COLLECT, self.game.level.current_room,
+                                       memory.memory_type, memory.rect.x)
         
     def has_memory(self, memory_type):
         for memory in self.memories:
@@ -79,6 +97,11 @@ class Player:
         if memory in self.memories:
             self.memories.remove(memory)
             self.game.sounds['memory_fade'].play()
+            self.game.effects.burst("fade", self.rect.center, memory.color)
+            if self.game.telemetry:
+                self.game.telemetry.record(telemetry.FORGET, memory.memory_type,
+                                           self.game.get_ticks() - memory.collected_time,
+                                           self.game.level.current_room)
             
     def update_animation(self):
         # pick the right frame 4 the current state
@@ -87,11 +110,9 @@ class Player:
         if self.current_sprite >= len(self.animations[self.state]):
             self.current_sprite = 0
             
-        sprite = self.animations[self.state][int(self.current_sprite)]
-        
-        # flip it if going left
-        if not self.facing_right:
-            sprite = pygame.transform.flip(sprite, True, False)
+        # flipped frames if going left
+        frames = self.animations if self.facing_right else self.animations_left
+        sprite = frames[self.state][int(self.current_sprite)]
             
         return sprite
     
@@ -105,14 +126,20 @@ class Player:
     def die(self):
         if not self.is_dead:
             self.is_dead = True
+            self.game.effects.burst("death", self.rect.center)
+            if self.game.telemetry:
+                self.game.telemetry.record(telemetry.DIE, self.game.level.current_room,
+                                           int(self.pos.x), int(self.pos.y))
             # TODO: add a death sound lol
             # self.game.sounds['death'].play()
             
-            # wait a sec then respawn
-            pygame.time.set_timer(pygame.USEREVENT + 1, 1000)  # 1000ms = 1 second
+            # wait a sec then respawn (replays bring their own respawns)
+            if self.game.auto_respawn:
+                self.respawn_timer = self.game.scheduler.after(RESPAWN_TICKS, self.game.respawn)
     
     def respawn(self):
-        pygame.time.set_timer(pygame.USEREVENT + 1, 0)  # stop the timer, dont want it firing again
+        self.game.scheduler.cancel(self.respawn_timer)  # dont want it firing again
+        self.respawn_timer = None
         self.pos = pygame.math.Vector2(self.spawn_point)
         self.vel = pygame.math.Vector2(0, 0)
         self.rect.x = self.pos.x
@@ -120,6 +147,8 @@ class Player:
         self.is_dead = False
         self.on_ground = False
         self.jumping = False
+        self.jump_buffer = 0
+        self.coyote = 0
         
         # optional: lose ur memories on death - uncomment 2 enable
         #self.memories.clear()
@@ -128,7 +157,14 @@ class Player:
         if self.is_dead:
             return  # skip everything when dead
         
-        keys = pygame.key.get_pressed()
+        keys = self.game.keys
+
+        # buffered jump from a few ticks ago, now that we can
+        if self.jump_buffer > 0:
+            if self.can_jump():
+                self.jump()
+            else:
+                self.jump_buffer -= 1
 
         # left and right movement
         self.vel.x = 0
@@ -148,19 +184,26 @@ class Player:
         # pull down every frame
         self.vel.y += PLAYER_GRAVITY
 
-        # step 1: move horizontal
-        self.pos.x += self.vel.x
-        self.rect.x = self.pos.x
-        self.check_horizontal_collisions()
+        # step 1: ride along with the platform we were standing on
+        riding = self.on_moving_platform
+        if riding:
+            dx, dy = riding.delta
+            self.move_and_collide(dx, dy, ignore=riding)
 
-        # step 2: move vertical
-        self.pos.y += self.vel.y
-        self.rect.y = self.pos.y
-        self.check_vertical_collisions()
+        # step 2: sweep the whole velocity in one go
+        self.on_ground = False
+        self.on_moving_platform = None
+        self.move_and_collide(self.vel.x, self.vel.y)
+
+        # coyote time refills while standing, runs out in the air
+        if self.on_ground:
+            self.coyote = COYOTE_FRAMES
+        elif self.coyote > 0:
+            self.coyote -= 1
 
         # sync rect 2 pos
-        self.rect.x = self.pos.x
-        self.rect.y = self.pos.y
+        self.rect.x = int(self.pos.x)
+        self.rect.y = int(self.pos.y)
 
         # update animation based on velocity
         if not self.on_ground:
@@ -168,75 +211,96 @@ class Player:
 
         # fell 2 far?
         self.check_death()
-        
-        # tick the memory timers
-        self.update_memories()
-
-    def check_horizontal_collisions(self):
-        for tile in self.game.level.get_colliding_tiles(self):
-            if self.vel.x > 0:
-                self.pos.x = tile.rect.left - self.size.x
-            elif self.vel.x < 0:
-                self.pos.x = tile.rect.right
-        self.rect.x = self.pos.x  # keep in sync
-
-    def check_vertical_collisions(self):
-        self.on_ground = False
-        landed_on_platform = None
-        
-        # need prev bottom 4 one-way platform check
-        prev_bottom = self.rect.bottom - self.vel.y
 
-        for tile in self.game.level.get_colliding_tiles(self):
-            # is this a platform u can jump thru from below?
-            is_one_way = hasattr(tile, 'one_way') and tile.one_way
-            
-            if self.vel.y > 0:  # falling / landing
-                # one-way: only land if coming from above
-                if is_one_way:
-                    if prev_bottom <= tile.rect.top + 5:  # lil tolerance
-                        self.pos.y = tile.rect.top - self.size.y
-                        self.vel.y = 0
-                        self.on_ground = True
-                        self.jumping = False
-                        if hasattr(tile, "is_moving_platform") and tile.is_moving_platform:
-                            landed_on_platform = tile
-                else:
-                    # solid tile - always lands
-                    # the rect.bottom check prevents teleporting thru walls
-                    if self.rect.bottom <= tile.rect.top + abs(self.vel.y) + 5:
-                        self.pos.y = tile.rect.top - self.size.y
-                        self.vel.y = 0
-                        self.on_ground = True
-                        self.jumping = False
-                        if hasattr(tile, "is_moving_platform") and tile.is_moving_platform:
-                            landed_on_platform = tile
-            elif self.vel.y < 0 and not is_one_way:  # hit the ceiling
-                self.pos.y = tile.rect.bottom
-                self.vel.y = 0
-
-        # stick 2 the moving platform
-        if landed_on_platform:
-            dx, dy = landed_on_platform.delta
-            self.pos.x += dx
-            self.pos.y += dy
-            self.on_moving_platform = landed_on_platform
-        else:
-            self.on_moving_platform = None
-
-        self.rect.y = int(self.pos.y)  # int cast fixes subpixel jitter
-                
-    def update_memories(self):
-        # check each memory - copy the list so we can remove while looping
-        for memory in self.memories[:]:
-            if memory.duration and pygame.time.get_ticks() - memory.collected_time > memory.duration:
-                if not memory.is_fading:
-                    memory.is_fading = True
-                    memory.fade_start_time = pygame.time.get_ticks()
-                
-                # 2 seconds 2 fully fade, then remove it
-                if pygame.time.get_ticks() - memory.fade_start_time > 2000:
-                    self.forget_memory(memory)
+    def move_and_collide(self, dx, dy, ignore=None):
+        # slide along whatever we hit - each hit kills one axis so 3 rounds is always enough
+        w, h = self.size.x, self.size.y
+        self.push_out(ignore)
+
+        for _ in range(3):
+            if dx == 0 and dy == 0:
+                break
+
+            left, top, right, bottom = swept_bounds(self.pos.x, self.pos.y, w, h, dx, dy)
+            first = None
+            for tile in self.game.level.get_solids_in_area(left, top, right, bottom):
+                if tile is ignore:
+                    continue
+                hit = sweep_aabb(self.pos.x, self.pos.y, w, h, dx, dy, tile.rect)
+                if hit is None:
+                    continue
+                toi, nx, ny = hit
+                # one-way platforms only stop u from above
+                if getattr(tile, 'one_way', False) and ny != -1:
+                    continue
+                if first is None or toi < first[0]:
+                    first = (toi, nx, ny, tile)
+
+            if first is None:
+                self.pos.x += dx
+                self.pos.y += dy
+                break
+
+            toi, nx, ny, tile = first
+            self.pos.x += dx * toi
+            self.pos.y += dy * toi
+            self.on_collide(tile, nx, ny)
+
+            # whats left of the move, minus the part going into the wall
+            dx *= 1 - toi
+            dy *= 1 - toi
+            if nx:
+                dx = 0
+            if ny:
+                dy = 0
+
+    def on_collide(self, tile, nx, ny):
+        # snap exactly onto the surface so floats dont creep in
+        if ny == -1:  # landed on top
+            self.pos.y = tile.rect.top - self.size.y
+            self.vel.y = 0
+            self.on_ground = True
+            self.jumping = False
+            if getattr(tile, 'is_moving_platform', False):
+                self.on_moving_platform = tile
+        elif ny == 1:  # bonked the ceiling
+            self.pos.y = tile.rect.bottom
+            self.vel.y = 0
+        elif nx == -1:
+            self.pos.x = tile.rect.left - self.size.x
+        elif nx == 1:
+            self.pos.x = tile.rect.right
+
+    def push_out(self, ignore=None):
+        # if something moved into us (platform, door teleport) shove out the shallow way first
+        w, h = self.size.x, self.size.y
+        for tile in self.game.level.get_solids_in_area(self.pos.x, self.pos.y, self.pos.x + w, self.pos.y + h):
+            if tile is ignore or getattr(tile, 'one_way', False):
+                continue
+            push = penetration(self.pos.x, self.pos.y, w, h, tile.rect)
+            if push:
+                self.pos.x += push[0]
+                self.pos.y += push[1]
+
+    def fade_timer(self, memory):
+        # (tick, callback, args) 4 whatever happens next 2 this memory, None if it never fades
+        if memory.is_fading:
+            return tick_past(memory.fade_start_time + MEMORY_FADE_MS), self.forget_memory, (memory,)
+        if memory.duration:
+            return tick_past(memory.collected_time + memory.duration), self.start_fading, (memory,)
+        return None
+
+    def schedule_fade(self, memory):
+        timer = self.fade_timer(memory)
+        if timer:
+            self.game.scheduler.at(timer[0], timer[1], *timer[2])
+
+    def start_fading(self, memory):
+        # time's up - fade out, then its gone MEMORY_FADE_MS later
+        if memory in self.memories:
+            memory.is_fading = True
+            memory.fade_start_time = self.game.get_ticks()
+            self.schedule_fade(memory)
     
     def draw(self, screen):
         sprite = self.update_animation()
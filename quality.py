@@ -0,0 +1,75 @@
+from collections import deque
+from contextlib import nullcontext
+from settings import *
+
+# adaptive quality - watches how long each frame's actual work takes (not the sleep in
+# clock.tick) and drops a tier when we keep blowing the FPS budget, or climbs back up
+# once there's been plenty of headroom 4 a while. the two thresholds + cooldown r the
+# hysteresis so it doesnt flip-flop every other second.
+#
+# every subsystem registers its own knobs: a value per tier + a function that applies it
+
+TIERS = ("high", "medium", "low", "lowest")
+
+
+class QualityGovernor:
+    def __init__(self, tier=0, auto=True, budget_ms=1000 / FPS, window=QUALITY_WINDOW):
+        self.tier = tier
+        self.auto = auto
+        self.budget_ms = budget_ms
+        self.frame_times = deque(maxlen=window)
+        self.total = 0.0
+        self.knobs = {}
+        self.cooldown = 0
+        self.calm_frames = 0  # how long we've been comfortably under budget
+        self.guard = nullcontext()  # the render thread's lock when there is one
+
+    def register(self, name, values, apply):
+        """values = one setting per tier (high first). apply gets called right away + on every change."""
+        values = list(values) + [values[-1]] * (len(TIERS) - len(values))
+        self.knobs[name] = (values, apply)
+        apply(values[self.tier])
+
+    def set_tier(self, tier):
+        tier = max(0, min(len(TIERS) - 1, tier))
+        if tier == self.tier:
+            return
+        old = self.tier
+        self.tier = tier
+        with self.guard:
+            for values, apply in self.knobs.values():
+                if values[tier] != values[old]:
+                    apply(values[tier])
+        # give the new tier a sec 2 settle b4 judging it
+        self.frame_times.clear()
+        self.total = 0.0
+        self.cooldown = FPS
+        self.calm_frames = 0
+
+    def frame(self, frame_ms):
+        if len(self.frame_times) == self.frame_times.maxlen:
+            self.total -= self.frame_times[0]
+        self.frame_times.append(frame_ms)
+        self.total += frame_ms
+
+        if not self.auto:
+            return
+        if self.cooldown > 0:
+            self.cooldown -= 1
+            return
+        if len(self.frame_times) < self.frame_times.maxlen:
+            return
+
+        average = self.total / len(self.frame_times)
+        if average > self.budget_ms * QUALITY_DOWN_AT:
+            self.set_tier(self.tier + 1)
+        elif average < self.budget_ms * QUALITY_UP_AT:
+            self.calm_frames += 1
+            if self.calm_frames >= QUALITY_UP_AFTER:
+                self.set_tier(self.tier - 1)
+        else:
+            self.calm_frames = 0
+
+    @property
+    def average_ms(self):
+        return self.total / len(self.frame_times) if self.frame_times else 0.0
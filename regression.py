@@ -0,0 +1,206 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+# level regression farm - runs a bunch of levels x input sequences headlessly
+# across every core and tells u which ones broke.
+#
+# scenario file (json):
+# {
+#   "runs": [
+#     {
+#       "name": "speedrun",
+#       "level": "assets/levels/level_*.json",   <- globs are fine, one run per match
+#       "replay": "replays/speedrun.rep",        <- a --record log ...
+#       "script": [["right", 120], ["right+jump", 1], ["interact", 5]],  <- ... or scripted steps
+#       "ticks": 3600,                            <- cap 4 scripted runs (default: until script ends)
+#       "expect": {"goal_room": "puzzle3", "rooms": ["puzzle1"], "min_memories": 2,
+#                  "max_deaths": 0, "max_ticks": 3000}
+#     }
+#   ]
+# }
+#
+# script inputs: left, right, jump, interact - join with "+". jump presses space on the
+# first tick of the step, interact holds E 4 the whole step
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_jobs(scenario_paths):
+    jobs = []
+    for scenario_path in scenario_paths:
+        base = os.path.dirname(os.path.abspath(scenario_path))
+        with open(scenario_path, 'r') as file:
+            scenario = json.load(file)
+
+        for run in scenario["runs"]:
+            pattern = os.path.join(base, run["level"])
+            levels = sorted(glob.glob(pattern)) or [pattern]
+            for level_path in levels:
+                job = dict(run)
+                job["level"] = level_path
+                job.setdefault("name", os.path.basename(scenario_path))
+                if "replay" in job:
+                    job["replay"] = os.path.join(base, job["replay"])
+                jobs.append(job)
+    return jobs
+
+
+def script_ticks(script):
+    # expand [["right+jump", 3], ...] into (keys, events) per tick
+    import pygame
+    from replay import ReplayKeys, KEY_BITS
+
+    bits = {"left": 1 << KEY_BITS.index(pygame.K_LEFT), "right": 1 << KEY_BITS.index(pygame.K_RIGHT)}
+    holding_e = False
+    for inputs, count in script:
+        names = inputs.split("+") if inputs else []
+        mask = 0
+        for name in names:
+            mask |= bits.get(name, 0)
+        keys = ReplayKeys(mask)
+
+        for i in range(count):
+            events = []
+            if i == 0:
+                # let go of E from the last step b4 pressing anything new
+                if holding_e:
+                    events.append(pygame.event.Event(pygame.KEYUP, key=pygame.K_e))
+                    holding_e = False
+                if "jump" in names:
+                    events.append(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE))
+                if "interact" in names:
+                    events.append(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_e))
+                    holding_e = True
+            yield keys, events
+
+
+def run_job(job):
+    from headless import HeadlessGame
+    from replay import ReplayPlayer
+
+    result = {"name": job["name"], "level": os.path.relpath(job["level"], ROOT), "error": None}
+    started = time.perf_counter()
+    try:
+        replay = ReplayPlayer(job["replay"]) if "replay" in job else None
+        game = HeadlessGame(job["level"], auto_respawn=replay is None)
+
+        rooms = [game.level.current_room]
+        seen_memories = set()
+        deaths = 0
+        was_dead = False
+        goal_room = job.get("expect", {}).get("goal_room")
+        completed_at = None
+
+        if replay:
+            inputs = None
+            total = len(replay.ticks)
+        else:
+            inputs = script_ticks(job.get("script", []))
+            total = job.get("ticks")
+
+        while total is None or game.ticks < total:
+            if replay:
+                replay.feed(game)
+                game.step()
+                replay.verify(game)
+            else:
+                step = next(inputs, None)
+                if step is None:
+                    if total is None:
+                        break
+                    step = (None, ())
+                game.step(*step)
+
+            # bookkeeping 4 the report
+            if game.level.current_room != rooms[-1]:
+                rooms.append(game.level.current_room)
+            seen_memories.update(game.player.memories)
+            if game.player.is_dead and not was_dead:
+                deaths += 1
+            was_dead = game.player.is_dead
+            if completed_at is None and goal_room and game.level.current_room == goal_room:
+                completed_at = game.ticks
+
+        result.update({
+            "ticks": game.ticks,
+            "rooms": rooms,
+            "memories": len(seen_memories),
+            "deaths": deaths,
+            "completed_at": completed_at,
+            "desync": replay.mismatch if replay else None,
+        })
+        result["failures"] = check(job.get("expect", {}), result)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        result["failures"] = ["crashed"]
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def check(expect, result):
+    failures = []
+    if result["desync"] is not None:
+        failures.append(f"replay desynced at tick {result['desync']}")
+    if "goal_room" in expect and result["completed_at"] is None:
+        failures.append(f"never reached {expect['goal_room']}")
+    if "max_ticks" in expect and result["completed_at"] is not None and result["completed_at"] > expect["max_ticks"]:
+        failures.append(f"took {result['completed_at']} ticks (max {expect['max_ticks']})")
+    for room in expect.get("rooms", []):
+        if room not in result["rooms"]:
+            failures.append(f"never entered {room}")
+    if result["memories"] < expect.get("min_memories", 0):
+        failures.append(f"collected {result['memories']} memories (min {expect['min_memories']})")
+    if "max_deaths" in expect and result["deaths"] > expect["max_deaths"]:
+        failures.append(f"died {result['deaths']} times (max {expect['max_deaths']})")
+    return failures
+
+
+def init_worker():
+    # assets are loaded with relative paths
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+
+
+def print_report(results):
+    passed = sum(1 for r in results if not r["failures"])
+    for r in results:
+        status = "FAIL" if r["failures"] else "ok"
+        line = f"{status:4} {r['name']} [{r['level']}]"
+        if r["error"] is None:
+            line += f" ticks={r['ticks']} rooms={len(r['rooms'])} memories={r['memories']} deaths={r['deaths']}"
+            if r["completed_at"] is not None:
+                line += f" done@{r['completed_at']}"
+        print(line)
+        for failure in r["failures"]:
+            print(f"       - {failure}")
+        if r["error"]:
+            print(f"       {r['error']}")
+    print(f"\n{passed}/{len(results)} runs passed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="run level regression scenarios headlessly")
+    parser.add_argument("scenarios", nargs="+", help="scenario json files")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processes (default: all cores)")
+    parser.add_argument("--report", metavar="FILE", help="also write the results as json")
+    args = parser.parse_args()
+
+    jobs = load_jobs(args.scenarios)
+    with Pool(processes=max(1, min(args.workers, len(jobs) or 1)), initializer=init_worker) as pool:
+        results = pool.map(run_job, jobs, chunksize=1)
+
+    print_report(results)
+    if args.report:
+        with open(args.report, 'w') as file:
+            json.dump({"results": results}, file, indent=2)
+
+    sys.exit(0 if all(not r["failures"] for r in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import weakref
+import pygame
+from settings import *
+
+# world rendering at a lower internal resolution.
+# the level + player draw into a RenderTarget like it was the screen (same WIDTH x HEIGHT
+# coordinates), it scales the positions and hands back pre-scaled copies of every image,
+# then present() does ONE upscale into the window per frame. at scale 1 it just draws
+# straight into the window, no extra copy - unless its offscreen (the render thread draws
+# the world on its own thread, and only the main thread gets 2 touch the window)
+
+
+class RenderTarget:
+    def __init__(self, window, scale=RENDER_SCALE, pixel_perfect=PIXEL_PERFECT, offscreen=False):
+        self.window = window
+        self.offscreen = offscreen
+        self.set_scale(scale, pixel_perfect)
+
+    def set_scale(self, scale, pixel_perfect=None):
+        if pixel_perfect is not None:
+            self.pixel_perfect = pixel_perfect
+        self.scale = scale
+        self.size = (max(1, round(WIDTH * scale)), max(1, round(HEIGHT * scale)))
+        self.images = weakref.WeakKeyDictionary()  # original surface -> scaled copy
+
+        window_w, window_h = self.window.get_size()
+        if self.pixel_perfect:
+            # biggest whole-number zoom that fits, centered with black bars
+            zoom = max(1, min(window_w // self.size[0], window_h // self.size[1]))
+            out_w, out_h = self.size[0] * zoom, self.size[1] * zoom
+        else:
+            out_w, out_h = window_w, window_h
+        self.output = pygame.Rect((window_w - out_w) // 2, (window_h - out_h) // 2, out_w, out_h)
+
+        if self.size == self.output.size and not self.offscreen:
+            self.surface = self.window.subsurface(self.output)  # 1:1, draw right into the window
+            self.upscale_into = None
+        else:
+            self.surface = pygame.Surface(self.size).convert()
+            self.upscale_into = self.window.subsurface(self.output)
+
+    def register_quality(self, governor):
+        # never go above what the player asked 4, just lower on the bottom tiers
+        base = self.scale
+        scales = [base, base, min(base, 0.75), min(base, 0.5)]
+        governor.register("render_scale", scales, lambda scale: self.set_scale(scale))
+
+    @property
+    def scaled(self):
+        return self.scale != 1.0
+
+    # --- the bits of the Surface api the world draw code uses ---
+
+    def get_size(self):
+        return WIDTH, HEIGHT
+
+    def fill(self, color):
+        self.surface.fill(color)
+
+    def image(self, image, keep=True):
+        # scaled copies r cached per surface, which only pays off 4 surfaces that get drawn
+        # again next frame. one-offs (made fresh every frame) pass keep=False
+        if not self.scaled:
+            return image
+        scaled = self.images.get(image)
+        if scaled is None:
+            w, h = image.get_size()
+            scaled = pygame.transform.scale(image, (max(1, round(w * self.scale)), max(1, round(h * self.scale))))
+            if keep:
+                self.images[image] = scaled
+        return scaled
+
+    def blit(self, image, pos, area=None, special_flags=0):
+        if not self.scaled:
+            return self.surface.blit(image, pos, area, special_flags)
+        s = self.scale
+        if area is not None:
+            # same part of the scaled copy, edges rounded so side by side areas still meet
+            area = pygame.Rect(area)
+            left, top = round(area.left * s), round(area.top * s)
+            area = pygame.Rect(left, top, round(area.right * s) - left, round(area.bottom * s) - top)
+        return self.surface.blit(self.image(image), (round(pos[0] * s), round(pos[1] * s)), area, special_flags)
+
+    def blits(self, sequence):
+        if self.scaled:
+            s = self.scale
+            sequence = [(self.image(image), (round(pos[0] * s), round(pos[1] * s))) for image, pos in sequence]
+        self.surface.blits(sequence, doreturn=False)
+
+    def circle(self, color, center, radius):
+        s = self.scale
+        pygame.draw.circle(self.surface, color, (round(center[0] * s), round(center[1] * s)),
+                           max(1, round(radius * s)))
+
+    def shade(self, darkness):
+        # multiply the lighting map (lighting.py) over the world drawn so far
+        if darkness.get_size() != self.size:
+            darkness = self.image(darkness, keep=False)  # a new map every time the lights change
+        self.surface.blit(darkness, (0, 0), special_flags=pygame.BLEND_RGB_MULT)
+
+    def present(self):
+        # the one and only upscale per frame
+        if self.upscale_into is None:
+            return
+        if self.window.get_rect() != self.output:
+            self.window.fill(BLACK)  # letterbox bars, before the subsurface write
+        if self.size == self.output.size:
+            self.upscale_into.blit(self.surface, (0, 0))  # offscreen at 1:1, just a copy
+        elif self.pixel_perfect or self.surface.get_bitsize() < 24:
+            pygame.transform.scale(self.surface, self.output.size, self.upscale_into)
+        else:
+            pygame.transform.smoothscale(self.surface, self.output.size, self.upscale_into)
@@ -0,0 +1,161 @@
+import threading
+import time
+from collections import namedtuple
+import pygame
+from settings import *
+
+# optional render thread (--render-thread). the main thread keeps doing events + update,
+# and instead of drawing it runs the usual world draw code against a DrawList, which just
+# writes down every blit / circle / fill / shade. that list + the hud state get frozen in2
+# a Frame (tuples all the way down, the images in it r never drawn into) and handed over.
+# the render thread replays the newest frame onto the world RenderTarget - the blits, the
+# scaling, the lighting multiply, the part that costs. frames it didnt get 2 in time r just
+# skipped, the sim never waits on it.
+#
+# SDL only lets the main thread touch the window (macOS + some drivers just break), so the
+# render thread never does: the world target is offscreen, and once a frame is rasterized
+# the main thread picks it up at the end of its next tick - one copy / upscale in2 the
+# window, the hud, flip. the python draw code that builds the DrawList stays on the main
+# thread 2, it reads the live game state which the sim is about 2 change.
+#
+# most of the heavy lifting (blit, scale) lets go of the GIL, so on a multi-core box the
+# two really do overlap. menu / story / pause screens r drawn on the main thread like
+# before, holding the lock so the two never touch the world at the same time
+
+Frame = namedtuple("Frame", "world hud inputs")
+
+
+class DrawList:
+    """Stands in 4 the RenderTarget while the sim thread draws, remembers what 2 draw."""
+
+    scale = 1.0
+    scaled = False
+
+    def __init__(self):
+        self.commands = []
+
+    def get_size(self):
+        return WIDTH, HEIGHT
+
+    def image(self, image, keep=True):
+        return image
+
+    def fill(self, color):
+        self.commands.append(("fill", tuple(color)))
+
+    def blit(self, image, pos, area=None, special_flags=0):
+        self.commands.append(("blit", image, (pos[0], pos[1]), area and pygame.Rect(area), special_flags))
+
+    def blits(self, sequence, doreturn=True):
+        self.commands.append(("blits", tuple(sequence)))
+
+    def circle(self, color, center, radius):
+        self.commands.append(("circle", tuple(color), (center[0], center[1]), radius))
+
+    def shade(self, darkness):
+        self.commands.append(("shade", darkness))
+
+    def freeze(self):
+        return tuple(self.commands)
+
+
+def replay(commands, target):
+    for command in commands:
+        kind = command[0]
+        if kind == "blit":
+            target.blit(command[1], command[2], command[3], command[4])
+        elif kind == "blits":
+            target.blits(command[1])
+        elif kind == "circle":
+            target.circle(command[1], command[2], command[3])
+        elif kind == "fill":
+            target.fill(command[1])
+        elif kind == "shade":
+            target.shade(command[1])
+
+
+class RenderThread:
+    def __init__(self, game):
+        self.game = game
+        self.lock = threading.Lock()  # whoever holds this owns the world target
+        self.ready = threading.Condition()
+        self.latest = None  # newest frame, waiting 2 get rasterized
+        self.done = None  # rasterized frame, waiting 4 the main thread 2 show it
+        self.dropped = 0  # bumped when the main thread takes the world back
+        self.running = True
+        self.presented = 0
+        self.skipped = 0
+        self.thread = threading.Thread(target=self.run, name="render", daemon=True)
+        self.thread.start()
+
+    def publish(self, frame):
+        with self.ready:
+            if self.latest is not None:
+                self.skipped += 1  # render thread fell behind, the newer one wins
+            self.latest = frame
+            self.ready.notify()
+
+    def drop(self):
+        with self.ready:
+            self.dropped += 1
+            self.latest = None
+            self.done = None
+            self.ready.notify()
+
+    def run(self):
+        while True:
+            with self.ready:
+                # one rasterized frame at a time, the world target only holds one
+                while (self.latest is None or self.done is not None) and self.running:
+                    self.ready.wait()
+                if not self.running:
+                    return
+                frame, self.latest = self.latest, None
+                dropped = self.dropped
+            with self.lock:
+                self.rasterize(frame)
+            with self.ready:
+                if dropped == self.dropped:  # not if the main thread drew over it meanwhile
+                    self.done = frame
+
+    def rasterize(self, frame):
+        world = self.game.world
+        world.fill(BG_COLOR)
+        replay(frame.world, world)
+
+    def show(self):
+        """Main thread only: put the last rasterized frame on the window, if theres one."""
+        with self.ready:
+            frame = self.done
+        if frame is None:
+            return False
+        game = self.game
+        with self.lock:
+            game.screen.fill(BG_COLOR)
+            game.world.present()
+            game.ui.draw(game.screen, frame.hud)
+            pygame.display.flip()
+        with self.ready:
+            self.done = None
+            self.ready.notify()  # free 2 rasterize the next one
+        self.presented += 1
+        if game.latency:
+            game.latency.presented(time.perf_counter(), frame.inputs)
+        return True
+
+    def stop(self):
+        with self.ready:
+            self.running = False
+            self.ready.notify()
+        self.thread.join(timeout=1)
+
+
+def capture(game):
+    """Everything the render thread needs 4 one playing frame."""
+    world = DrawList()
+    game.level.draw(world)
+    game.player.draw(world)
+    game.lighting.draw(world, game.level, game.player, game.world.scale)  # map at the size it ends up
+    game.effects.draw(world, game.level.camera_offset)
+    inputs = game.latency.take() if game.latency else ()
+    return Frame(world.freeze(), game.ui.hud_state(), inputs)
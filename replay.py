@@ -0,0 +1,164 @@
+import pygame
+import struct
+import zlib
+
+# input replays - one tiny record per simulated tick so a whole run fits in a few KB.
+# header: magic, version, level number, tick count
+# body (zlib'd): per tick -> key bits, event count, event codes, state hash
+
+MAGIC = b"ECHR"
+VERSION = 3  # 2: memories fade on the scheduler, even while dead. 3: platforms follow baked paths
+HEADER = struct.Struct("<4sBHI")
+TICK = struct.Struct("<BB")
+HASH = struct.Struct("<I")
+
+# held keys that Player.update polls, in bit order
+KEY_BITS = (pygame.K_LEFT, pygame.K_a, pygame.K_RIGHT, pygame.K_d)
+RESPAWN_BIT = 0x80
+
+# the key events Player.handle_event cares about
+EVENT_CODES = {
+    (pygame.KEYDOWN, pygame.K_SPACE): 1,
+    (pygame.KEYDOWN, pygame.K_e): 2,
+    (pygame.KEYUP, pygame.K_e): 3,
+}
+CODE_EVENTS = {code: key for key, code in EVENT_CODES.items()}
+
+
+class ReplayError(Exception):
+    pass
+
+
+class ReplayKeys:
+    """Stands in 4 pygame.key.get_pressed() during playback."""
+
+    def __init__(self, mask):
+        self.mask = mask
+
+    def __getitem__(self, key):
+        for bit, bound_key in enumerate(KEY_BITS):
+            if key == bound_key:
+                return bool(self.mask & (1 << bit))
+        return False
+
+
+def key_mask(keys):
+    mask = 0
+    for bit, key in enumerate(KEY_BITS):
+        if keys[key]:
+            mask |= 1 << bit
+    return mask
+
+
+def state_hash(game):
+    """Cheap crc over everything the sim decides - used 2 catch replays drifting."""
+    player = game.player
+    level = game.level
+    parts = [struct.pack("<ddddBB", player.pos.x, player.pos.y, player.vel.x, player.vel.y,
+                         player.is_dead, player.on_ground),
+             level.current_room.encode()]
+    for memory in player.memories:
+        parts.append(struct.pack("<iiB", memory.collected_time, memory.fade_start_time, memory.is_fading))
+        parts.append(memory.memory_type.encode())
+    for door in level.doors:
+        parts.append(struct.pack("<BB", door.is_open, door.opening))
+    for lever in level.levers:
+        parts.append(struct.pack("<B", lever.activated))
+    for switch in level.switches:
+        parts.append(struct.pack("<B", switch.activated))
+    for platform in level.platforms:
+        parts.append(struct.pack("<IB", platform.frame, platform.active))
+    return zlib.crc32(b"".join(parts))
+
+
+class ReplayRecorder:
+    def __init__(self, path):
+        self.path = path
+        self.level_number = None
+        self.ticks = []
+        self.pending_events = []
+        self.pending_respawn = False
+
+    def begin(self, level_number):
+        # a restart starts a fresh log, the old one gets saved first
+        if self.ticks:
+            self.save()
+        self.level_number = level_number
+        self.ticks = []
+        self.pending_events = []
+        self.pending_respawn = False
+
+    def record_event(self, event):
+        code = EVENT_CODES.get((event.type, getattr(event, "key", None)))
+        if code:
+            self.pending_events.append(code)
+
+    def record_respawn(self):
+        self.pending_respawn = True
+
+    def end_tick(self, keys, game):
+        # called after every simulated tick - paused frames never get here
+        mask = key_mask(keys)
+        if self.pending_respawn:
+            mask |= RESPAWN_BIT
+        self.ticks.append((mask, bytes(self.pending_events[:255]), state_hash(game)))
+        self.pending_events = []
+        self.pending_respawn = False
+
+    def save(self):
+        if self.level_number is None:
+            return
+        body = bytearray()
+        for mask, events, digest in self.ticks:
+            body += TICK.pack(mask, len(events))
+            body += events
+            body += HASH.pack(digest)
+        with open(self.path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, self.level_number, len(self.ticks)))
+            file.write(zlib.compress(bytes(body), 9))
+
+
+class ReplayPlayer:
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            data = file.read()
+
+        magic, version, self.level_number, count = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ReplayError(f"{path} is not a v{VERSION} replay")
+
+        body = zlib.decompress(data[HEADER.size:])
+        self.ticks = []
+        offset = 0
+        for _ in range(count):
+            mask, n_events = TICK.unpack_from(body, offset)
+            offset += TICK.size
+            events = body[offset:offset + n_events]
+            offset += n_events
+            digest, = HASH.unpack_from(body, offset)
+            offset += HASH.size
+            self.ticks.append((mask, events, digest))
+
+        self.index = 0
+        self.mismatch = None  # first tick where the hash didnt match
+
+    @property
+    def finished(self):
+        return self.index >= len(self.ticks)
+
+    def feed(self, game):
+        # push this tick's recorded input into the game b4 it simulates
+        mask, events, _ = self.ticks[self.index]
+        if mask & RESPAWN_BIT and game.player.is_dead:
+            game.player.respawn()
+        for code in events:
+            event_type, key = CODE_EVENTS[code]
+            game.player.handle_event(pygame.event.Event(event_type, key=key))
+        game.keys = ReplayKeys(mask)
+
+    def verify(self, game):
+        # compare against the recorded hash after the tick ran
+        digest = self.ticks[self.index][2]
+        if self.mismatch is None and state_hash(game) != digest:
+            self.mismatch = self.index
+        self.index += 1
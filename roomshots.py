@@ -0,0 +1,211 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import weakref
+from multiprocessing import Pool
+from render import RenderTarget
+
+# renders every room of every level 2 png thru the normal Level.draw code - offscreen,
+# dummy video driver, one process per core. 4 room overviews + catching rendering changes:
+# give it a folder of golden images and it diffs every room against them.
+#
+#   python roomshots.py                                   all levels -> previews/
+#   python roomshots.py assets/levels/level_1.json --thumb 320
+#   python roomshots.py --golden goldens --update-golden  (re)write the goldens
+#   python roomshots.py --golden goldens                  fail if a room changed
+#
+# a pixel counts as changed when its color moved more than --tolerance (0-1, how far apart
+# 2 colors r), and a room fails when more than --threshold of its pixels changed. failing
+# rooms get a <room>.diff.png next 2 the output with the changed pixels in red
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_LEVELS = "assets/levels/level_*.json"
+
+
+class Canvas(RenderTarget):
+    """A RenderTarget over a plain surface the size of the whole room, never scaled or presented."""
+
+    def __init__(self, surface):
+        # not RenderTarget.__init__ - that sizes everything off the window + WIDTH x HEIGHT
+        self.window = self.surface = surface
+        self.offscreen = True
+        self.pixel_perfect = False
+        self.scale = 1.0
+        self.size = surface.get_size()
+        self.images = weakref.WeakKeyDictionary()
+        self.output = surface.get_rect()
+        self.upscale_into = None
+
+    def get_size(self):
+        return self.surface.get_size()
+
+
+def load_jobs(level_patterns):
+    from bundle import read_json
+
+    jobs = []
+    for pattern in level_patterns:
+        matches = sorted(glob.glob(pattern)) or sorted(glob.glob(os.path.join(ROOT, pattern))) or [pattern]
+        for level_path in map(os.path.abspath, matches):
+            for room_name in read_json(level_path)["rooms"]:
+                jobs.append((level_path, room_name))
+    return jobs
+
+
+def room_size(level):
+    from settings import TILE_SIZE
+    right, bottom = TILE_SIZE, TILE_SIZE
+    things = list(level.tiles) + list(level.background_tiles) + [sign["rect"] for sign in level.signs]
+    for group in (level.memory_orbs, level.doors, level.levers, level.switches, level.enemies):
+        things.extend(group)
+    for platform in level.platforms:
+        # the whole path it can travel, not just where it starts
+        things.append(platform.reach())
+    for thing in things:
+        rect = getattr(thing, "rect", thing)
+        right, bottom = max(right, rect.right), max(bottom, rect.bottom)
+    return right, bottom
+
+
+def render_room(level_path, room_name):
+    import pygame
+    from settings import BG_COLOR
+    from headless import HeadlessGame
+
+    game = HeadlessGame(level_path)
+    level = game.level
+    if level.current_room != room_name:
+        level.load_room(room_name)
+    level.camera_offset.update(0, 0)
+
+    surface = pygame.Surface(room_size(level)).convert()
+    canvas = Canvas(surface)
+    canvas.fill(BG_COLOR)
+    level.draw(canvas)
+    return surface
+
+
+def pixel_diff(surface, golden, tolerance):
+    """(fraction of pixels that changed, mask of them) - sizes must match."""
+    import pygame
+    new = pygame.PixelArray(surface)
+    old = pygame.PixelArray(golden.convert(surface))
+    matches = new.compare(old, tolerance).make_surface()  # white = same, black = changed
+    new.close()
+    old.close()
+    changed = pygame.mask.from_threshold(matches, (0, 0, 0), (1, 1, 1, 255))
+    w, h = surface.get_size()
+    return changed.count() / (w * h), changed
+
+
+def run_job(job):
+    import pygame
+
+    level_path, room_name, options = job
+    stem = os.path.splitext(os.path.basename(level_path))[0]
+    out_dir = os.path.join(options["out"], stem)
+    result = {"level": os.path.relpath(level_path, ROOT), "room": room_name, "status": "ok",
+              "changed": None, "error": None}
+    started = time.perf_counter()
+    try:
+        surface = render_room(level_path, room_name)
+        result["size"] = surface.get_size()
+        os.makedirs(out_dir, exist_ok=True)
+        out_path = os.path.join(out_dir, f"{room_name}.png")
+        pygame.image.save(surface, out_path)
+        result["path"] = out_path
+
+        if options["thumb"]:
+            w, h = surface.get_size()
+            size = (options["thumb"], max(1, round(h * options["thumb"] / w)))
+            thumb_path = os.path.join(out_dir, f"{room_name}.thumb.png")
+            pygame.image.save(pygame.transform.smoothscale(surface, size), thumb_path)
+
+        if options["golden"]:
+            golden_path = os.path.join(options["golden"], stem, f"{room_name}.png")
+            if options["update_golden"]:
+                os.makedirs(os.path.dirname(golden_path), exist_ok=True)
+                pygame.image.save(surface, golden_path)
+                result["status"] = "updated"
+            elif not os.path.exists(golden_path):
+                result["status"] = "no golden"
+            else:
+                golden = pygame.image.load(golden_path)
+                if golden.get_size() != surface.get_size():
+                    result["status"] = "resized"
+                else:
+                    changed, mask = pixel_diff(surface, golden, options["tolerance"])
+                    result["changed"] = round(changed, 6)
+                    if changed > options["threshold"]:
+                        result["status"] = "changed"
+                        diff = surface.copy()
+                        diff.fill((128, 128, 128), special_flags=pygame.BLEND_RGB_MULT)
+                        diff.blit(mask.to_surface(setcolor=(255, 0, 0), unsetcolor=None), (0, 0))
+                        pygame.image.save(diff, os.path.join(out_dir, f"{room_name}.diff.png"))
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def init_worker():
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    from headless import init_headless
+    init_headless()
+
+
+FAILING = ("changed", "resized", "no golden", "error")
+
+
+def print_report(results):
+    for r in results:
+        line = f"{r['status']:9} {r['level']} {r['room']}"
+        if "size" in r:
+            line += f" {r['size'][0]}x{r['size'][1]}"
+        if r["changed"] is not None:
+            line += f" changed={r['changed'] * 100:.3f}%"
+        print(line)
+        if r["error"]:
+            print(f"          {r['error']}")
+    failed = sum(1 for r in results if r["status"] in FAILING)
+    print(f"\n{len(results) - failed}/{len(results)} rooms ok")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="render every room 2 png, optionally diff against goldens")
+    parser.add_argument("levels", nargs="*", default=[DEFAULT_LEVELS], help="level json files / globs")
+    parser.add_argument("--out", default="previews", help="output folder (default previews/)")
+    parser.add_argument("--thumb", type=int, metavar="WIDTH", help="also write thumbnails this wide")
+    parser.add_argument("--golden", metavar="DIR", help="compare against the goldens in DIR")
+    parser.add_argument("--update-golden", action="store_true", help="write the renders as the new goldens")
+    parser.add_argument("--tolerance", type=float, default=0.02, help="color distance that still counts as same")
+    parser.add_argument("--threshold", type=float, default=0.001, help="fraction of changed pixels allowed")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processes (default: all cores)")
+    parser.add_argument("--report", metavar="FILE", help="also write the results as json")
+    args = parser.parse_args()
+
+    options = {"out": os.path.abspath(args.out), "thumb": args.thumb, "tolerance": args.tolerance,
+               "threshold": args.threshold, "update_golden": args.update_golden,
+               "golden": os.path.abspath(args.golden) if args.golden else None}
+    sys.path.insert(0, ROOT)
+    jobs = [(level_path, room_name, options) for level_path, room_name in load_jobs(args.levels)]
+    with Pool(processes=max(1, min(args.workers, len(jobs) or 1)), initializer=init_worker) as pool:
+        results = pool.map(run_job, jobs, chunksize=1)
+
+    print_report(results)
+    if args.report:
+        with open(args.report, 'w') as file:
+            json.dump({"results": results}, file, indent=2)
+
+    sys.exit(0 if all(r["status"] not in FAILING for r in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+import os
+import queue
+import struct
+import threading
+from settings import RESPAWN_TICKS
+from memory_orb import MemoryOrb
+from level import Level
+
+# save files - small binary chunks, later chunks win.
+#
+#   header: magic + version
+#   chunk:  kind (u8) | name (u8 len + utf8) | payload (u32 len + bytes)
+#
+# a full save writes the core chunk (player, clock, current room) and one chunk per room.
+# quick-saves only append the core chunk + the rooms that changed since the last save,
+# and the file gets rewritten from scratch every COMPACT_AFTER quick-saves so it cant grow forever.
+# the actual file writing happens on a background thread so the frame never waits on disk
+
+MAGIC = b"ECHS"
+VERSION = 3  # 2: platforms save where they r in their baked path, 3: the respawn tick
+HEADER = struct.Struct("<4sB")
+CHUNK_HEAD = struct.Struct("<B")
+COUNT = struct.Struct("<H")
+CHUNK_CORE = 1
+CHUNK_ROOM = 2
+COMPACT_AFTER = 32
+
+DOOR = struct.Struct("<BBi")
+FLAG = struct.Struct("<B")
+PLATFORM = struct.Struct("<IB")
+ENEMY = struct.Struct("<ddB")
+PLAYER = struct.Struct("<dddddd4B")
+RESPAWN = struct.Struct("<i")  # tick a dead player comes back on, -1 if nothing's scheduled
+MEMORY = struct.Struct("<iiiB")
+
+
+class SaveError(Exception):
+    pass
+
+
+def pack_str(text):
+    data = text.encode()
+    return struct.pack("<B", len(data)) + data
+
+
+def unpack_str(data, offset):
+    length = data[offset]
+    return data[offset + 1:offset + 1 + length].decode(), offset + 1 + length
+
+
+def pack_list(items, fmt):
+    out = bytearray(COUNT.pack(len(items)))
+    for item in items:
+        out += fmt.pack(*item)
+    return bytes(out)
+
+
+def unpack_list(data, offset, fmt):
+    count, = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    items = []
+    for _ in range(count):
+        items.append(fmt.unpack_from(data, offset))
+        offset += fmt.size
+    return items, offset
+
+
+def pack_room(snapshot):
+    return b"".join([
+        pack_list([(i,) for i in snapshot["orbs"]], COUNT),
+        pack_list(snapshot["doors"], DOOR),
+        pack_list([(a,) for a in snapshot["levers"]], FLAG),
+        pack_list([(a,) for a in snapshot["switches"]], FLAG),
+        pack_list(snapshot["platforms"], PLATFORM),
+        pack_list(snapshot["enemies"], ENEMY),
+    ])
+
+
+def unpack_room(data):
+    offset = 0
+    orbs, offset = unpack_list(data, offset, COUNT)
+    doors, offset = unpack_list(data, offset, DOOR)
+    levers, offset = unpack_list(data, offset, FLAG)
+    switches, offset = unpack_list(data, offset, FLAG)
+    platforms, offset = unpack_list(data, offset, PLATFORM)
+    enemies, offset = unpack_list(data, offset, ENEMY)
+    return {
+        "orbs": [i for i, in orbs],
+        "doors": [(bool(o), bool(g), t) for o, g, t in doors],
+        "levers": [bool(a) for a, in levers],
+        "switches": [bool(a) for a, in switches],
+        "platforms": [(f, bool(a)) for f, a in platforms],
+        "enemies": [(x, y, bool(r)) for x, y, r in enemies],
+    }
+
+
+def pack_core(game):
+    player = game.player
+    level = game.level
+    out = bytearray()
+    out += struct.pack("<HI", level.level_number, game.ticks)
+    out += pack_str(level.level_path)
+    out += pack_str(level.current_room)
+    out += PLAYER.pack(player.pos.x, player.pos.y, player.vel.x, player.vel.y,
+                       player.spawn_point.x, player.spawn_point.y,
+                       player.facing_right, player.on_ground, player.jumping, player.is_dead)
+    timer = player.respawn_timer
+    out += RESPAWN.pack(timer.tick if timer is not None and timer.pending else -1)
+    out += struct.pack("<B", len(player.memories))
+    for memory in player.memories:
+        out += pack_str(memory.memory_type)
+        duration = -1 if memory.duration is None else memory.duration
+        out += MEMORY.pack(duration, memory.collected_time, memory.fade_start_time, memory.is_fading)
+    return bytes(out)
+
+
+def unpack_core(data):
+    level_number, ticks = struct.unpack_from("<HI", data)
+    offset = 6
+    level_path, offset = unpack_str(data, offset)
+    current_room, offset = unpack_str(data, offset)
+    player = PLAYER.unpack_from(data, offset)
+    offset += PLAYER.size
+    respawn, = RESPAWN.unpack_from(data, offset)
+    offset += RESPAWN.size
+    count = data[offset]
+    offset += 1
+    memories = []
+    for _ in range(count):
+        memory_type, offset = unpack_str(data, offset)
+        memories.append((memory_type,) + MEMORY.unpack_from(data, offset))
+        offset += MEMORY.size
+    return {"level_number": level_number, "ticks": ticks, "level_path": level_path,
+            "current_room": current_room, "player": player, "respawn": respawn, "memories": memories}
+
+
+def pack_chunk(kind, name, payload):
+    return CHUNK_HEAD.pack(kind) + pack_str(name) + struct.pack("<I", len(payload)) + payload
+
+
+def room_snapshots(level):
+    # pooled rooms get snapshotted fresh, evicted ones already are
+    snapshots = dict(level.room_snapshots)
+    for name, room in level.room_pool.items():
+        snapshots[name] = room.snapshot()
+    return snapshots
+
+
+def read_save(path):
+    with open(path, "rb") as file:
+        data = file.read()
+    if len(data) < HEADER.size:
+        raise SaveError(f"{path} is empty")
+    magic, version = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise SaveError(f"{path} is not a v{VERSION} save")
+
+    core = None
+    rooms = {}
+    offset = HEADER.size
+    while offset < len(data):
+        kind, = CHUNK_HEAD.unpack_from(data, offset)
+        name, offset = unpack_str(data, offset + CHUNK_HEAD.size)
+        length, = struct.unpack_from("<I", data, offset)
+        offset += 4
+        payload = data[offset:offset + length]
+        if len(payload) < length:
+            break  # half-written tail from a crash, everything b4 it is still good
+        offset += length
+        if kind == CHUNK_CORE:
+            core = payload
+        elif kind == CHUNK_ROOM:
+            rooms[name] = payload
+
+    if core is None:
+        raise SaveError(f"{path} has no player data")
+    return unpack_core(core), {name: unpack_room(payload) for name, payload in rooms.items()}
+
+
+class SaveWriter:
+    def __init__(self, path):
+        self.path = path
+        self.saved_rooms = {}  # room name -> bytes last written, 2 spot changes
+        self.appends = 0
+        self.failed = False  # set by the writer thread, only save() (main thread) clears it
+
+        self.jobs = queue.Queue()
+        self.thread = threading.Thread(target=self._work, daemon=True)
+        self.thread.start()
+
+    def save(self, game, full=False):
+        # pack on this thread (cheap + consistent), write on the other one
+        rooms = {name: pack_room(snap) for name, snap in room_snapshots(game.level).items()}
+        core = pack_chunk(CHUNK_CORE, "", pack_core(game))
+
+        if self.failed:
+            self.failed = False
+            full = True  # the last write didnt make it, whats on disk cant be appended 2
+        full = full or not self.saved_rooms or self.appends >= COMPACT_AFTER or not os.path.exists(self.path)
+        if full:
+            changed = rooms
+            self.appends = 0
+        else:
+            changed = {name: data for name, data in rooms.items() if self.saved_rooms.get(name) != data}
+            self.appends += 1
+        self.saved_rooms = rooms
+
+        chunks = [core] + [pack_chunk(CHUNK_ROOM, name, data) for name, data in changed.items()]
+        self.jobs.put((full, b"".join(chunks)))
+        return len(changed)
+
+    def forget(self):
+        # after a load the file and the game dont match anymore, next save starts over
+        self.saved_rooms = {}
+
+    def flush(self):
+        self.jobs.join()
+
+    def _work(self):
+        while True:
+            full, data = self.jobs.get()
+            try:
+                if full:
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    tmp = self.path + ".tmp"
+                    with open(tmp, "wb") as file:
+                        file.write(HEADER.pack(MAGIC, VERSION))
+                        file.write(data)
+                    os.replace(tmp, self.path)
+                else:
+                    with open(self.path, "ab") as file:
+                        file.write(data)
+            except OSError as e:
+                print(f"couldnt save: {e}")
+                self.failed = True  # make the next one a full rewrite
+            finally:
+                self.jobs.task_done()
+
+
+def load_game(game, path):
+    core, rooms = read_save(path)
+    game.scheduler.clear()  # every timer gets rebuilt from the saved state below
+
+    # same level? reuse the rooms that r already built
+    level = game.level
+    if level is None or level.level_path != core["level_path"]:
+        level = Level(game, core["level_number"], core["level_path"])
+        game.level = level
+
+    # rooms the player only got 2 after saving go back 2 how the json has them
+    for name in [name for name in level.room_pool if name not in rooms]:
+        del level.room_pool[name]
+    for name in [name for name in level.room_snapshots if name not in rooms]:
+        del level.room_snapshots[name]
+
+    for name, snapshot in rooms.items():
+        room = level.room_pool.get(name)
+        # a live room can be rewound in place unless the save still has orbs it already lost
+        if room is not None and set(snapshot["orbs"]) <= {orb.index for orb in room.memory_orbs}:
+            room.restore(snapshot)
+        else:
+            level.room_pool.pop(name, None)
+            level.room_snapshots[name] = snapshot
+    level.load_room(core["current_room"])
+
+    game.ticks = core["ticks"]
+    player = game.player
+    x, y, vx, vy, sx, sy, facing_right, on_ground, jumping, is_dead = core["player"]
+    player.pos.update(x, y)
+    player.vel.update(vx, vy)
+    player.spawn_point.update(sx, sy)
+    player.facing_right, player.on_ground, player.jumping = bool(facing_right), bool(on_ground), bool(jumping)
+    # not die() - that would burst particles + log a death that already happened
+    player.is_dead = bool(is_dead)
+    player.respawn_timer = None
+    if is_dead and game.auto_respawn:
+        due = core["respawn"] if core["respawn"] >= 0 else game.ticks + RESPAWN_TICKS
+        player.respawn_timer = game.scheduler.at(due, game.respawn)  # picks up where it was
+    player.on_moving_platform = None
+    player.rect.x, player.rect.y = int(x), int(y)
+
+    player.memories = []
+    for memory_type, duration, collected_time, fade_start_time, is_fading in core["memories"]:
+        memory = MemoryOrb(0, 0, memory_type, None if duration < 0 else duration)
+        memory.collected = True
+        memory.collected_time = collected_time
+        memory.fade_start_time = fade_start_time
+        memory.is_fading = bool(is_fading)
+        player.memories.append(memory)
+    game.scheduler.batch(filter(None, map(player.fade_timer, player.memories)))
+    for room in level.room_pool.values():
+        level.schedule_doors(room)
@@ -0,0 +1,96 @@
+import heapq
+import itertools
+from settings import FPS
+
+# game-time timers. stuff that used 2 poll the clock every frame (respawning, doors swinging
+# open, memories fading out) asks 4 a callback instead, and the game calls advance() once
+# per simulated tick. its a min-heap of (tick, order, timer), so a tick with nothing due
+# costs one peek, and timers due on the same tick fire in the order they were scheduled -
+# replays stay deterministic.
+#
+# time is game.ticks, which only moves while actually playing, so pause / menus stop every
+# timer 4 free and --fast replays + headless runs line up with normal play. cancel() just
+# marks the timer dead, the heap drops it when it comes up (or all at once if too many
+# dead ones pile up)
+
+COMPACT_AFTER = 64  # cancelled timers b4 its worth rebuilding the heap
+
+
+def tick_past(ms):
+    """First tick where get_ticks() (ticks * 1000 // FPS) is past ms."""
+    return -(-(ms + 1) * FPS // 1000)
+
+
+class Timer:
+    __slots__ = ("tick", "callback", "args")
+
+    def __init__(self, tick, callback, args):
+        self.tick = tick
+        self.callback = callback  # None once its fired or been cancelled
+        self.args = args
+
+    @property
+    def pending(self):
+        return self.callback is not None
+
+
+class Scheduler:
+    def __init__(self, game):
+        self.game = game
+        self.heap = []
+        self.order = itertools.count()
+        self.cancelled = 0
+
+    def __len__(self):
+        return len(self.heap) - self.cancelled
+
+    def at(self, tick, callback, *args):
+        timer = Timer(tick, callback, args)
+        heapq.heappush(self.heap, (tick, next(self.order), timer))
+        return timer
+
+    def after(self, ticks, callback, *args):
+        return self.at(self.game.ticks + ticks, callback, *args)
+
+    def past_ms(self, ms, callback, *args):
+        # same moment a `get_ticks() > ms` poll would have caught
+        return self.at(tick_past(ms), callback, *args)
+
+    def batch(self, entries):
+        """Schedule a bunch of (tick, callback, args) in one go - one heapify instead of a push each."""
+        timers = []
+        for tick, callback, args in entries:
+            timer = Timer(tick, callback, args)
+            self.heap.append((tick, next(self.order), timer))
+            timers.append(timer)
+        heapq.heapify(self.heap)
+        return timers
+
+    def cancel(self, timer):
+        if timer is None or timer.callback is None:
+            return
+        timer.callback = None
+        self.cancelled += 1
+        if self.cancelled > COMPACT_AFTER and self.cancelled * 2 > len(self.heap):
+            self.heap = [entry for entry in self.heap if entry[2].callback is not None]
+            heapq.heapify(self.heap)
+            self.cancelled = 0
+
+    def advance(self):
+        heap = self.heap
+        now = self.game.ticks
+        while heap and heap[0][0] <= now:
+            timer = heapq.heappop(heap)[2]
+            callback = timer.callback
+            if callback is None:
+                self.cancelled -= 1
+                continue
+            timer.callback = None
+            callback(*timer.args)
+
+    def clear(self):
+        # new level / loaded save - whatever was pending belongs 2 the old state
+        for entry in self.heap:
+            entry[2].callback = None
+        self.heap = []
+        self.cancelled = 0
@@ -4,6 +4,17 @@ HEIGHT = 705
 FPS = 60
 TITLE = "Echoes of the Labyrinth"
 
+# the world can render at a lower internal res and get upscaled once (0.5, 0.75 look best)
+RENDER_SCALE = 1.0
+PIXEL_PERFECT = False  # whole-number upscale with black bars instead of stretching
+
+# quality governor - drops effects when frames take 2 long (see quality.py)
+QUALITY_AUTO = True
+QUALITY_WINDOW = 30        # frames averaged
+QUALITY_DOWN_AT = 0.9      # avg work over 90% of the frame budget -> lower tier
+QUALITY_UP_AT = 0.5        # under 50% ...
+QUALITY_UP_AFTER = FPS * 3  # ... 4 3 seconds straight -> higher tier
+
 # colors we use everywhere
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -21,9 +32,52 @@ PLAYER_SPEED = 5
 PLAYER_JUMP_STRENGTH = 15
 PLAYER_GRAVITY = 0.8
 PLAYER_SIZE = (50, 80)
+JUMP_BUFFER_FRAMES = 6  # space this many ticks b4 landing still jumps (0 = off)
+COYOTE_FRAMES = 6       # can still jump this many ticks after walking off a ledge (0 = off)
+RESPAWN_TICKS = FPS     # dead this long b4 respawning (game time, so pausing holds it)
+
+# input latency (--latency / --late-input, see latency.py)
+LATE_INPUT_MARGIN_MS = 2.0  # safety gap left b4 the predicted present when sampling late
+LATENCY_BUCKET_MS = 4       # histogram bucket width
 
-# level stuff - just tile size 4 now
+# level stuff
 TILE_SIZE = 64
+ROOM_POOL_SIZE = 3  # rooms kept fully built, older ones shrink 2 a snapshot
+
+# dev mode (--dev): how many ticks between checks 4 level file edits
+HOT_RELOAD_INTERVAL = 30
+
+# everything under assets/ packed in2 one file (python bundle.py), loose files r the fallback
+BUNDLE_PATH = "assets.pak"
+
+# saving - F5 quick-saves, F9 quick-loads
+SAVE_PATH = "saves/quicksave.sav"
+
+# enemy stuff - how many cells of the chase flow field get built per frame
+FLOW_FIELD_BUDGET = 400
+
+# memory budgets in bytes per category (None = no limit), checked every few seconds.
+# see memstats.py 4 what happens when one is blown. all None = no checking at all unless
+# --memory, e.g. "tiles": 64 * 1024 * 1024
+MEMORY_BUDGETS = {
+    "tiles": None,
+    "entities": None,
+    "ui": None,
+    "audio": None,
+    "caches": None,
+}
+MEMORY_CHECK_INTERVAL = FPS * 5
+
+# gameplay telemetry (--telemetry) - see telemetry.py
+TELEMETRY_FORMAT = "jsonl"  # or "binary"
+TELEMETRY_CAPACITY = 8192  # events the ring holds b4 the writer has 2 catch up
+TELEMETRY_FLUSH = 1.0  # seconds between writes
+TELEMETRY_SEGMENT_EVENTS = 50000  # events per segment file b4 rotating
+TELEMETRY_KEEP = 20  # segment files kept, oldest get deleted
+
+# particles (needs numpy, otherwise effects r just off)
+PARTICLE_CAPACITY = 50000
+PARTICLE_BUDGET = 2000  # most particles spawned in one frame
 
 # memory types - duration in ms, None = never fades
 MEMORY_TYPES = {
@@ -32,4 +86,22 @@ MEMORY_TYPES = {
     'green': {'color': GREEN, 'duration': 20000},  # 20 secs
     'purple': {'color': PURPLE, 'duration': 15000},  # 15 secs
     'yellow': {'color': YELLOW, 'duration': 30000}  # 30 secs
-}
\ No newline at end of file
+}
+MEMORY_FADE_MS = 2000  # how long a memory takes 2 fade out once its time is up
+
+
+# lighting (see lighting.py) - rooms r dark, the player, orbs + doors light them up
+LIGHTING = True
+LIGHT_AMBIENT = (55, 55, 85)  # what u can still see with no light at all
+LIGHT_PLAYER_RADIUS = 200
+LIGHT_PLAYER_COLOR = (255, 225, 180)
+LIGHT_MEMORY_RADIUS = 120  # every memory u carry glows around u in its color
+LIGHT_MEMORY_LEVEL = 0.5
+LIGHT_ORB_SCALE = 6  # orb light radius = its pulsing glow radius * this
+LIGHT_DOOR_RADIUS = 150
+LIGHT_DOOR_COLOR = (255, 200, 140)  # doors that dont need a memory
+LIGHT_DOOR_CLOSED = 0.3  # closed doors glow this much, open ones fully
+LIGHT_STEPS = 16  # intensity levels, so a fading light recomposites 16 times not every tick
+LIGHT_RADIUS_STEP = 4  # px
+LIGHT_NUMPY_AT = 100  # this many lights on screen -> one numpy pass instead of a blit each
+LIGHT_GRID = 8  # px per cell 4 the numpy pass (smoothscaled up after)
\ No newline at end of file
@@ -0,0 +1,228 @@
+import argparse
+import json
+import os
+import random
+import time
+from settings import TILE_SIZE, MEMORY_TYPES
+
+# procedural stress levels - same json schema as assets/levels/level_N.json, just way bigger,
+# 4 profiling load / update / draw at 10x-1000x the shipped content.
+#
+#   python stressgen.py stress.json --size 400x120 --density 0.25 --ghosts 200
+#   python main.py ... / python regression.py stress.json / HeadlessGame("stress.json")
+#
+# the file is written as its generated, one tile row at a time, so a 4000x4000 room never
+# sits in memory as a list of lists. every row gets its own rng (seed, room, row), which
+# means placing an entity can just regenerate the row it lands on 2 check the cell is empty
+# instead of keeping the whole grid around. same seed + same args = byte-identical file
+#
+# room 0 is "start" (thats where Level begins), the rest r stress1, stress2, ... and every
+# room has a door 2 the next one (the last loops back). the player spawns bottom-left on a
+# cleared patch of floor
+
+TILE_MAPPING = {"0": "empty", "1": "background_wall", "2": "wall", "3": "platform", "4": "spikes"}
+EMPTY, BACKGROUND, WALL, PLATFORM, SPIKES = range(5)
+SPAWN_CLEAR = 4  # tiles kept empty right + up from the spawn
+MEMORY_NAMES = sorted(MEMORY_TYPES)
+
+
+def room_name(index):
+    return "start" if index == 0 else f"stress{index}"
+
+
+class RoomGen:
+    def __init__(self, seed, index, cols, rows, density):
+        self.seed = seed
+        self.index = index
+        self.cols = cols
+        self.rows = rows
+        self.density = density
+        self.rng = random.Random(f"{seed}:{index}:entities")
+        self.spawn = (1, rows - 2)  # cell the player (or whoever comes thru a door) lands in
+
+    def row(self, y):
+        """Foreground tile ids 4 row y - always the same 4 the same seed."""
+        if y == self.rows - 1:
+            return [WALL] * self.cols  # floor
+        row = [EMPTY] * self.cols
+        row[0] = row[-1] = WALL
+        if y == 0:
+            return [WALL] * self.cols  # ceiling
+
+        rng = random.Random(f"{self.seed}:{self.index}:{y}")
+        x = 1
+        while x < self.cols - 1:
+            # ledges instead of salt + pepper, density is still roughly the solid fraction
+            if rng.random() < self.density / 3:
+                length = rng.randint(1, 6)
+                kind = rng.choice((WALL, WALL, PLATFORM, SPIKES))
+                for i in range(x, min(x + length, self.cols - 1)):
+                    row[i] = kind
+                x += length
+            x += 1
+
+        sx, sy = self.spawn
+        if sy - SPAWN_CLEAR <= y <= sy:
+            for i in range(sx, min(sx + SPAWN_CLEAR + 1, self.cols - 1)):
+                row[i] = EMPTY
+        return row
+
+    def free_cell(self, tries=20):
+        """Random empty cell (or the last one tried if the room is packed)."""
+        for _ in range(tries):
+            x = self.rng.randint(1, max(1, self.cols - 2))
+            y = self.rng.randint(1, max(1, self.rows - 2))
+            if self.row(y)[x] == EMPTY:
+                break
+        return x, y
+
+    def spot(self, tries=20):
+        x, y = self.free_cell(tries)
+        return x * TILE_SIZE, y * TILE_SIZE
+
+    def memory(self, none_chance=0.3):
+        return None if self.rng.random() < none_chance else self.rng.choice(MEMORY_NAMES)
+
+    # --- entities, one dict at a time in the level json format ---
+
+    def orb(self, i):
+        x, y = self.spot()
+        orb = {"x": x + 16, "y": y + 16, "memory_type": self.rng.choice(MEMORY_NAMES)}
+        if self.rng.random() < 0.2:
+            orb["duration"] = self.rng.choice((5000, 15000, 30000))
+        return orb
+
+    def door(self, i, target_index, target_room):
+        x, y = self.spot()
+        tx, ty = target_room.spawn
+        return {"x": x, "y": y - TILE_SIZE, "width": 64, "height": 128, "required_memory": self.memory(),
+                "target_room": room_name(target_index), "target_x": tx * TILE_SIZE, "target_y": ty * TILE_SIZE - 40}
+
+    def lever(self, i, platforms):
+        x, y = self.spot()
+        return {"x": x, "y": y, "target_id": self.target(platforms),
+                "action": self.rng.choice(("toggle", "activate", "deactivate"))}
+
+    def switch(self, i, platforms):
+        x, y = self.spot()
+        return {"x": x, "y": y, "required_memory": self.memory(), "target_id": self.target(platforms),
+                "action": "activate"}
+
+    def target(self, platforms):
+        return f"platform{self.rng.randrange(platforms)}" if platforms else "none"
+
+    def platform(self, i):
+        x, y = self.spot()
+        platform = {"x": x, "y": y, "width": 128, "height": 32,
+                    "move_x": self.rng.choice((0, 0, 1, -1)) * self.rng.randint(64, 320),
+                    "move_y": self.rng.choice((0, 1, -1)) * self.rng.randint(64, 256),
+                    "speed": round(self.rng.uniform(0.005, 0.02), 4), "id": f"platform{i}",
+                    "active": self.rng.random() < 0.5}
+        if self.rng.random() < 0.5:
+            # half of them get a waypoint path instead (see paths.py)
+            del platform["move_x"], platform["move_y"], platform["speed"]
+            points, px, py = [], x, y
+            for _ in range(self.rng.randint(2, 5)):
+                px = min(max(0, px + self.rng.randint(-256, 256)), (self.cols - 4) * TILE_SIZE)
+                py = min(max(0, py + self.rng.randint(-192, 192)), (self.rows - 2) * TILE_SIZE)
+                points.append([px, py])
+            platform["path"] = {"points": points, "speed": [self.rng.choice((1, 2, 3)) for _ in points],
+                                "ease": self.rng.choice(("linear", "inout")),
+                                "curve": self.rng.choice(("line", "spline")),
+                                "mode": self.rng.choice(("pingpong", "loop"))}
+        return platform
+
+    def ghost(self, i, chase):
+        x, y = self.spot()
+        reach = self.rng.randint(2, 10) * TILE_SIZE
+        right_edge = (self.cols - 1) * TILE_SIZE
+        return {"x": x, "y": y, "patrol_left": max(TILE_SIZE, x - reach),
+                "patrol_right": min(right_edge, x + reach), "speed": self.rng.choice((1, 2, 3)),
+                "chase": self.rng.random() < chase}
+
+    def sign(self, i):
+        x, y = self.spot()
+        return {"x": x, "y": y, "width": 210, "height": 50, "image": "objects/sign.png"}
+
+
+def write_list(file, key, items):
+    file.write(f',\n      "{key}": [')
+    for i, item in enumerate(items):
+        file.write(("," if i else "") + "\n        " + json.dumps(item))
+    file.write("\n      ]")
+
+
+def write_room(file, gen, target_index, target, counts, background, chase):
+    stats = {"tiles": 0}
+    file.write(f'    {json.dumps(room_name(gen.index))}: {{\n      "tile_mapping": {json.dumps(TILE_MAPPING)},\n')
+    file.write('      "layers": {')
+    layers = ["foreground"] + (["background"] if background else [])
+    for n, layer in enumerate(layers):
+        file.write(("," if n else "") + f'\n        "{layer}": [')
+        for y in range(gen.rows):
+            row = gen.row(y) if layer == "foreground" else [BACKGROUND] * gen.cols
+            stats["tiles"] += gen.cols - row.count(EMPTY)
+            file.write(("," if y else "") + "\n          " + json.dumps(row, separators=(",", ":")))
+        file.write("\n        ]")
+    file.write("\n      }")
+
+    platforms = counts["platforms"]
+    write_list(file, "memory_orbs", (gen.orb(i) for i in range(counts["orbs"])))
+    write_list(file, "doors", (gen.door(i, target_index, target) for i in range(max(1, counts["doors"]))))
+    write_list(file, "levers", (gen.lever(i, platforms) for i in range(counts["levers"])))
+    write_list(file, "switches", (gen.switch(i, platforms) for i in range(counts["switches"])))
+    write_list(file, "moving_platforms", (gen.platform(i) for i in range(platforms)))
+    write_list(file, "enemies", (gen.ghost(i, chase) for i in range(counts["ghosts"])))
+    write_list(file, "signs", (gen.sign(i) for i in range(counts["signs"])))
+    file.write("\n    }")
+    return stats
+
+
+def generate(path, seed=0, rooms=1, cols=60, rows=20, density=0.2, counts=None, background=True, chase=0.0):
+    counts = dict({"orbs": 0, "doors": 1, "levers": 0, "switches": 0, "platforms": 0, "ghosts": 0, "signs": 0},
+                  **(counts or {}))
+    gens = [RoomGen(seed, i, cols, rows, density) for i in range(rooms)]
+    sx, sy = gens[0].spawn
+    tiles = 0
+    with open(path, "w") as file:
+        file.write('{\n  "player_start": ' + json.dumps({"x": sx * TILE_SIZE, "y": sy * TILE_SIZE - 40}))
+        file.write(',\n  "rooms": {\n')
+        for i, gen in enumerate(gens):
+            if i:
+                file.write(",\n")
+            target_index = (i + 1) % rooms
+            tiles += write_room(file, gen, target_index, gens[target_index], counts, background, chase)["tiles"]
+        file.write("\n  }\n}\n")
+    return tiles
+
+
+def parse_size(text):
+    cols, _, rows = text.lower().partition("x")
+    return int(cols), int(rows or cols)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="generate a big seeded level json 4 stress testing")
+    parser.add_argument("out", help="level json 2 write")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rooms", type=int, default=1)
+    parser.add_argument("--size", type=parse_size, default=(60, 20), metavar="COLSxROWS", help="tiles per room")
+    parser.add_argument("--density", type=float, default=0.2, help="roughly what fraction of cells r solid")
+    parser.add_argument("--no-background", action="store_true", help="skip the background wall layer")
+    for kind, default in (("orbs", 10), ("doors", 1), ("levers", 5), ("switches", 5), ("platforms", 5),
+                          ("ghosts", 10), ("signs", 2)):
+        parser.add_argument(f"--{kind}", type=int, default=default, help=f"{kind} per room (default {default})")
+    parser.add_argument("--chase", type=float, default=0.0, help="fraction of ghosts that chase")
+    args = parser.parse_args()
+
+    counts = {kind: getattr(args, kind) for kind in ("orbs", "doors", "levers", "switches", "platforms",
+                                                     "ghosts", "signs")}
+    started = time.perf_counter()
+    tiles = generate(args.out, args.seed, args.rooms, args.size[0], args.size[1], args.density, counts,
+                     not args.no_background, args.chase)
+    print(f"wrote {args.out}: {args.rooms} room(s) of {args.size[0]}x{args.size[1]}, {tiles} tiles, "
+          f"{os.path.getsize(args.out) / 1024 / 1024:.1f}MB in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+import glob
+import gzip
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from settings import *
+
+# gameplay telemetry (--telemetry) - deaths, cassettes picked up / forgotten, doors, levers,
+# switches, room changes. recording is one tuple dropped in2 a preallocated ring, nothing
+# else happens on the frame loop. a writer thread wakes up every TELEMETRY_FLUSH seconds,
+# grabs whatever's new, and appends it (compressed) 2 the current segment file. segments
+# rotate every TELEMETRY_SEGMENT_EVENTS events and only the newest TELEMETRY_KEEP stay.
+# if the writer ever falls a whole ring behind, the oldest events get dropped (and counted)
+#
+#   jsonl:  each flush is one gzip member, so `zcat seg.jsonl.gz` just works
+#   binary: each flush is <u32 length><zlib block> of fixed records, strings get defined
+#           once per segment by a STRING record b4 their first use
+#
+# read_segment() turns either kind back in2 dicts
+
+STRING, DIE, COLLECT, FORGET, DOOR_OPEN, LEVER, SWITCH, ROOM = range(8)
+
+# event code -> (name, what a / b / c r)
+EVENTS = {
+    DIE: ("die", ("room", "x", "y")),
+    COLLECT: ("collect", ("room", "memory", "x")),
+    FORGET: ("forget", ("memory", "held_ms", "room")),
+    DOOR_OPEN: ("door_open", ("room", "to", "memory")),
+    LEVER: ("lever", ("room", "platform", "action")),
+    SWITCH: ("switch", ("room", "platform", "memory")),
+    ROOM: ("room", ("from", "to", "ms")),
+}
+EVENT_CODES = {name: code for code, (name, _) in EVENTS.items()}
+
+# fields that hold text (the binary format stores them as string ids, "" = None)
+STRING_FIELDS = {"room", "memory", "to", "from", "platform", "action"}
+
+RECORD = struct.Struct("<IBiii")  # tick, code, a, b, c (strings r ids)
+STRING_RECORD = struct.Struct("<IBiH")  # 0, STRING, id, length, then the utf-8 bytes
+BLOCK = struct.Struct("<I")
+
+
+class Telemetry:
+    def __init__(self, game, folder="telemetry", fmt=TELEMETRY_FORMAT, capacity=TELEMETRY_CAPACITY,
+                 interval=TELEMETRY_FLUSH, segment_events=TELEMETRY_SEGMENT_EVENTS, keep=TELEMETRY_KEEP):
+        self.game = game
+        self.folder = folder
+        self.fmt = fmt
+        self.interval = interval
+        self.segment_events = segment_events
+        self.keep = keep
+
+        # power of 2 so the slot is just head & mask
+        size = 1
+        while size < capacity:
+            size *= 2
+        self.ring = [None] * size
+        self.mask = size - 1
+        self.head = 0  # next slot the game writes (only the game thread touches this)
+        self.tail = 0  # next slot the writer reads (only the writer touches this)
+        self.dropped = 0
+
+        self.session = time.strftime("%Y%m%d-%H%M%S")
+        self.segment = 0
+        self.segment_count = 0
+        self.file = None
+        self.strings = {}
+
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self._work, name="telemetry", daemon=True)
+        self.thread.start()
+
+    def record(self, code, a=0, b=0, c=0):
+        # hot path - keep it this small
+        head = self.head
+        self.ring[head & self.mask] = (self.game.ticks, code, a, b, c)
+        self.head = head + 1
+
+    def close(self):
+        self.stop.set()
+        self.thread.join()
+
+    # --- writer thread ---
+
+    def _work(self):
+        while not self.stop.wait(self.interval):
+            self.flush()
+        self.flush()
+        if self.file:
+            self.file.close()
+
+    def flush(self):
+        head = self.head
+        start = max(self.tail, head - len(self.ring))
+        events = [self.ring[i & self.mask] for i in range(start, head)]
+        # anything the game lapped while we were copying is garbage now
+        lapped = max(0, self.head - len(self.ring) - start)
+        self.dropped += (start - self.tail) + lapped
+        events = events[lapped:]
+        self.tail = head
+        if not events:
+            return
+        try:
+            self._write(events)
+        except OSError as e:
+            print(f"telemetry: couldnt write: {e}")
+
+    def _write(self, events):
+        if self.file is None or self.segment_count >= self.segment_events:
+            self._rotate()
+        if self.fmt == "binary":
+            data = zlib.compress(self._pack(events))
+            self.file.write(BLOCK.pack(len(data)) + data)
+        else:
+            lines = "".join(json.dumps(event_dict(event)) + "\n" for event in events)
+            self.file.write(gzip.compress(lines.encode("utf-8")))
+        self.file.flush()
+        self.segment_count += len(events)
+
+    def _pack(self, events):
+        out = []
+        for event in events:
+            fields = list(event[2:])
+            for i, value in enumerate(fields):
+                if isinstance(value, str) or value is None:
+                    fields[i] = self._string_id(value or "", out)
+            out.append(RECORD.pack(event[0], event[1], *fields))
+        return b"".join(out)
+
+    def _string_id(self, text, out):
+        string_id = self.strings.get(text)
+        if string_id is None:
+            string_id = self.strings[text] = len(self.strings)
+            encoded = text.encode("utf-8")
+            out.append(STRING_RECORD.pack(0, STRING, string_id, len(encoded)) + encoded)
+        return string_id
+
+    def _rotate(self):
+        if self.file:
+            self.file.close()
+        os.makedirs(self.folder, exist_ok=True)
+        ext = "bin" if self.fmt == "binary" else "jsonl.gz"
+        path = os.path.join(self.folder, f"{self.session}-{self.segment:04d}.{ext}")
+        self.file = open(path, "ab")
+        self.segment += 1
+        self.segment_count = 0
+        self.strings = {}  # every segment can be read on its own
+
+        old = sorted(glob.glob(os.path.join(self.folder, "*.bin")) + glob.glob(os.path.join(self.folder, "*.jsonl.gz")))
+        for stale in old[:max(0, len(old) - self.keep)]:
+            os.remove(stale)
+
+
+def event_dict(event):
+    tick, code, a, b, c = event
+    name, fields = EVENTS[code]
+    return {"t": tick, "e": name, fields[0]: a, fields[1]: b, fields[2]: c}
+
+
+def read_segment(path):
+    """Every event in a segment file, as dicts."""
+    if path.endswith(".jsonl.gz"):
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            return [json.loads(line) for line in file if line.strip()]
+
+    events, strings = [], {}
+    with open(path, "rb") as file:
+        data = file.read()
+    at = 0
+    while at < len(data):
+        (length,) = BLOCK.unpack_from(data, at)
+        block = zlib.decompress(data[at + BLOCK.size:at + BLOCK.size + length])
+        at += BLOCK.size + length
+        pos = 0
+        while pos < len(block):
+            tick, code, a, b, c = RECORD.unpack_from(block, pos)
+            if code == STRING:
+                _, _, string_id, n = STRING_RECORD.unpack_from(block, pos)
+                pos += STRING_RECORD.size
+                strings[string_id] = block[pos:pos + n].decode("utf-8")
+                pos += n
+                continue
+            pos += RECORD.size
+            name, fields = EVENTS[code]
+            values = [strings.get(v) or None if field in STRING_FIELDS else v for field, v in zip(fields, (a, b, c))]
+            events.append({"t": tick, "e": name, **dict(zip(fields, values))})
+    return events
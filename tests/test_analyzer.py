@@ -0,0 +1,51 @@
+import json
+import pytest
+import analyzer
+
+LEVEL = "assets/levels/level_1.json"
+
+
+def report_lines(graph, result, capsys):
+    analyzer.report(graph, result)
+    lines = capsys.readouterr().out.splitlines()
+    return lines[1:]  # everything but "explored N states", shards repeat some work
+
+
+@pytest.mark.parametrize("jobs", [2, 3])
+def test_sharded_search_matches_serial(jobs, capsys, monkeypatch):
+    graph, serial = analyzer.analyze(LEVEL, jobs=1)
+    monkeypatch.setattr(analyzer, "SERIAL_FIRST", 0)  # level 1 is small enough 2 never shard otherwise
+    _, sharded = analyzer.analyze(LEVEL, jobs=jobs)
+
+    assert sharded[0] == serial[0]  # earliest time into each room
+    assert sharded[1] == serial[1]  # earliest time each door / lever / switch gets used
+    assert report_lines(graph, sharded, capsys) == report_lines(graph, serial, capsys)
+
+
+def door(x, memory, target):
+    return {"x": x, "y": 0, "width": 0, "height": 0, "required_memory": memory,
+            "target_room": target, "target_x": 0, "target_y": 0}
+
+
+def test_opened_doors_stay_open(tmp_path):
+    # blue only lasts long enough 2 open the door 2 the hall. the green orb is down in
+    # the cellar, which only leads back 2 the start, so the vault needs the hall door
+    # again long after blue is gone
+    level = {
+        "player_start": {"x": 0, "y": 0},
+        "rooms": {
+            "start": {"memory_orbs": [{"x": 100, "y": 0, "memory_type": "blue", "duration": 1000}],
+                      "doors": [door(200, "blue", "hall")]},
+            "hall": {"doors": [door(200, None, "cellar"), door(400, "green", "vault")]},
+            "cellar": {"memory_orbs": [{"x": 2000, "y": 0, "memory_type": "green"}],
+                       "doors": [door(2100, None, "start")]},
+            "vault": {},
+        },
+    }
+    path = tmp_path / "level.json"
+    path.write_text(json.dumps(level))
+
+    graph, (rooms, used, _) = analyzer.analyze(str(path))
+    assert "vault" in rooms
+    assert ("door", "hall", 1) in used
+    assert analyzer.report(graph, (rooms, used, 0)) == 0
@@ -0,0 +1,63 @@
+import random
+import pygame
+import pytest
+from headless import HeadlessGame
+from replay import ReplayKeys
+from vecenv import VecEnv, LEFT, RIGHT, JUMP, INTERACT
+
+TICKS = 2000
+
+
+def mashed(seed):
+    # a new random button combo every tick, lots of wall + corner hits
+    rng = random.Random(seed)
+    return [rng.randrange(16) for _ in range(TICKS)]
+
+
+def held(seed):
+    # buttons held 4 a while like a person would, so it actually gets places
+    rng = random.Random(seed)
+    actions = []
+    while len(actions) < TICKS:
+        action = rng.randrange(16) & ~JUMP
+        for _ in range(rng.randint(1, 40)):
+            actions.append(action | (JUMP if rng.random() < 0.1 else 0))
+    return actions[:TICKS]
+
+
+def play_game(actions):
+    game = HeadlessGame()
+    states, interacting = [], False
+    for action in actions:
+        mask = (1 if action & LEFT else 0) | (4 if action & RIGHT and not action & LEFT else 0)
+        events = []
+        if action & JUMP:
+            events.append(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE))
+        if bool(action & INTERACT) != interacting:
+            interacting = bool(action & INTERACT)
+            events.append(pygame.event.Event(pygame.KEYDOWN if interacting else pygame.KEYUP, key=pygame.K_e))
+        game.step(ReplayKeys(mask), events)
+        player = game.player
+        states.append((player.pos.x, player.pos.y, game.level.current_room, player.is_dead, len(player.memories)))
+    return states
+
+
+def play_env(actions):
+    env = VecEnv(1, reset_on_death=False, max_steps=TICKS + 1)
+    env.reset()
+    states = []
+    for action in actions:
+        env.step([action])
+        states.append((float(env.x[0]), float(env.y[0]), env.room_names[env.room[0]],
+                       bool(env.dead[0]), int(env.taken[0].sum())))
+    return states
+
+
+@pytest.mark.parametrize("script", [mashed, held])
+@pytest.mark.parametrize("seed", [0, 3, 11])
+def test_matches_the_game_tick_for_tick(script, seed):
+    actions = script(seed)
+    game, env = play_game(actions), play_env(actions)
+    for tick, (want, got) in enumerate(zip(game, env)):
+        # exact, not close - a float thats off by an ulp is a different death / landing later
+        assert got == want, f"tick {tick}, action {actions[tick]}"
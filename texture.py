@@ -0,0 +1,121 @@
+import weakref
+import pygame
+from pygame._sdl2 import video
+from settings import *
+import images
+
+# texture backend (--backend texture, or --backend software 4 SDL's cpu renderer - same code
+# path, no gpu needed, handy 4 testing). instead of blitting surfaces onto the window every
+# frame, every image gets uploaded as a Texture the first time its drawn and after that a
+# draw is just a texture copy. it has the same little api as RenderTarget (blit / blits /
+# circle / fill / image / get_size) so Level, Player, Ghost, MemoryOrb, the particles and the
+# hud draw into it without knowing.
+#
+# draws r queued and go out in one go at flip(), in order, only touching a texture's alpha
+# when it actually changes. flipped images from images.load(flip=True) use the original's
+# texture with flip_x, and surface alpha (set_alpha) becomes the copy's alpha.
+#
+# SDL scales the finished frame 2 the window (logical size), so theres no internal render
+# scale here - the draw code always sees scale 1. menus / story / pause screens still draw
+# in2 game.screen, which gets uploaded as one overlay on top when its in use
+
+BLENDMODE_MOD = 4  # SDL_BLENDMODE_MOD, dst = src * dst
+
+
+class TextureTarget:
+    scale = 1.0
+    scaled = False
+
+    def __init__(self, software=False, vsync=False):
+        self.window = video.Window(TITLE, size=(WIDTH, HEIGHT))
+        self.renderer = video.Renderer(self.window, accelerated=0 if software else -1, vsync=vsync)
+        self.renderer.logical_size = (WIDTH, HEIGHT)
+        self.images = weakref.WeakKeyDictionary()  # surface -> (texture, flip_x)
+        self.circles = {}  # (color, radius) -> surface, so circles r textures 2
+        self.queue = []
+        self.uploads = 0
+
+    def register_quality(self, governor):
+        pass  # scaling the frame is free here, nothing 2 trade 4 speed
+
+    # --- the RenderTarget api ---
+
+    def get_size(self):
+        return WIDTH, HEIGHT
+
+    def image(self, image, keep=True):
+        return image
+
+    def texture(self, image):
+        entry = self.images.get(image)
+        if entry is None:
+            original = images.mirrors.get(image)
+            if original is not None:
+                entry = (self.texture(original)[0], True)  # one upload 4 both directions
+            else:
+                entry = (video.Texture.from_surface(self.renderer, image), False)
+                self.uploads += 1
+            self.images[image] = entry
+        return entry
+
+    def fill(self, color):
+        self.queue.append((None, pygame.Color(color), None, False, None))
+
+    def blit(self, image, pos, area=None, special_flags=0):
+        texture, flip_x = self.texture(image)
+        if area is not None:
+            area = pygame.Rect(area)
+            dest = (round(pos[0]), round(pos[1]), area.width, area.height)
+        else:
+            dest = (round(pos[0]), round(pos[1]), texture.width, texture.height)
+        self.queue.append((texture, dest, area, flip_x, image.get_alpha()))
+
+    def blits(self, sequence, doreturn=True):
+        for image, pos in sequence:
+            self.blit(image, pos)
+
+    def circle(self, color, center, radius):
+        radius = max(1, round(radius))
+        key = (tuple(color), radius)
+        surface = self.circles.get(key)
+        if surface is None:
+            surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(surface, color, (radius, radius), radius)
+            self.circles[key] = surface
+        self.blit(surface, (round(center[0]) - radius, round(center[1]) - radius))
+
+    def shade(self, darkness):
+        # the lighting map (lighting.py) - a fresh surface each time it changes, so its own upload
+        texture, _ = self.texture(darkness)
+        texture.blend_mode = BLENDMODE_MOD
+        self.queue.append((texture, (0, 0, WIDTH, HEIGHT), None, False, None))
+
+    def present(self):
+        pass  # the world pass is done, the hud goes on top b4 flip() shows it
+
+    def render(self, overlay=None):
+        renderer = self.renderer
+        renderer.draw_color = pygame.Color(BLACK)
+        renderer.clear()
+        for texture, dest, area, flip_x, alpha in self.queue:
+            if texture is None:
+                renderer.draw_color = dest  # a fill, dest is the color
+                renderer.fill_rect((0, 0, WIDTH, HEIGHT))
+                continue
+            alpha = 255 if alpha is None else alpha
+            if texture.alpha != alpha:
+                texture.alpha = alpha
+            texture.draw(srcrect=area, dstrect=dest, flip_x=flip_x)
+        self.queue = []
+
+        if overlay is not None:
+            # menus + pause screen, drawn the old way - uploaded fresh, but only when shown
+            video.Texture.from_surface(renderer, overlay).draw()
+
+    def flip(self, overlay=None):
+        self.render(overlay)
+        self.renderer.present()
+
+    def to_surface(self):
+        """The frame render() just drew (b4 flip) - 4 comparing against the surface backend."""
+        return self.renderer.to_surface()
@@ -1,58 +1,94 @@
 import pygame
 import math
 from settings import *
+import images
 
 class UI:
+    glow = True  # quality knob, see register_quality
+
     def __init__(self, game):
         self.game = game
         self.font = pygame.font.Font(None, 32)
 
         # cassette img 4 the inventory bar
-        raw = pygame.image.load("assets/ui/memory_icon.png").convert_alpha()
-        self.cassette = pygame.transform.scale(raw, (36, 36))
+        self.cassette = images.load("assets/ui/memory_icon.png", (36, 36), alpha=True)
+        self.icons = {}  # (color, radius, glow) -> finished cassette icon
+        self.covers = {}  # (alpha, radius) -> fade overlay
     def update(self):
         pass
         
-    def draw(self):
-        # show cassettes in the hud
-        self.draw_memory_status()
+    def draw(self, screen=None, state=None):
+        # show cassettes in the hud. the render thread passes in a state it captured earlier
+        if state is None:
+            state = self.hud_state()
+        self.draw_memory_status(screen or self.game.screen, state)
+
+    def hud_state(self):
+        """(color, fade alpha or None) 4 each cassette - plain tuples, safe 2 hand 2 another thread."""
+        player = self.game.player
+        if not player or not player.memories:
+            return ()
+        now = self.game.get_ticks()
+        state = []
+        for memory in player.memories:
+            fade_alpha = None
+            if memory.is_fading:
+                fade_progress = (now - memory.fade_start_time) / MEMORY_FADE_MS
+                fade_alpha = max(0, min(180, int(180 * (1 - fade_progress))))
+            state.append((memory.color, fade_alpha))
+        return tuple(state)
         
-    def draw_memory_status(self):
+    def draw_memory_status(self, screen, state):
         # show collected cassettes in the top left
-        if self.game.player and self.game.player.memories:
-            orb_r = 22          # circle radius
-            spacing = 14
-            start_x = orb_r + 10
-            start_y = orb_r + 10
+        orb_r = 22          # circle radius
+        spacing = 14
+        start_x = orb_r + 10
+        start_y = orb_r + 10
+
+        for i, (color, fade_alpha) in enumerate(state):
+            cx = start_x + i * (orb_r * 2 + spacing)
+            cy = start_y
+
+            icon = self.icon(color, orb_r)
+            screen.blit(icon, (cx - icon.get_width() // 2, cy - icon.get_height() // 2))
 
-            for i, memory in enumerate(self.game.player.memories):
-                cx = start_x + i * (orb_r * 2 + spacing)
-                cy = start_y
-                color = memory.color
+            # cover it up as it fades out
+            if fade_alpha is not None:
+                screen.blit(self.fade_cover(fade_alpha, orb_r), (cx - orb_r, cy - orb_r))
 
+    def icon(self, color, orb_r):
+        # glow + circle + cassette baked in2 one image per color, only blits every frame
+        # (and only one upload each with the texture backend)
+        key = (color, orb_r, self.glow)
+        icon = self.icons.get(key)
+        if icon is None:
+            glow_size = orb_r + 8
+            icon = pygame.Surface((glow_size * 2, glow_size * 2), pygame.SRCALPHA)
+            c = glow_size
+            if self.glow:
                 # glow ring behind everything
-                glow_size = orb_r + 8
-                glow_surf = pygame.Surface((glow_size * 2, glow_size * 2), pygame.SRCALPHA)
                 for r in range(glow_size, orb_r - 1, -1):
                     alpha = max(0, min(120, int(120 * (glow_size - r) / 8)))
-                    pygame.draw.circle(glow_surf, (*color, alpha),
-                                       (glow_size, glow_size), r)
-                self.game.screen.blit(glow_surf, (cx - glow_size, cy - glow_size))
-
-                # colored circle
-                dark = tuple(max(0, c - 55) for c in color)
-                pygame.draw.circle(self.game.screen, dark, (cx, cy), orb_r)
-                pygame.draw.circle(self.game.screen, color, (cx, cy), orb_r - 2)
-
-                # cassette on top
-                cw, ch = self.cassette.get_size()
-                self.game.screen.blit(self.cassette, (cx - cw // 2, cy - ch // 2))
-
-                # cover it up as it fades out
-                if memory.is_fading:
-                    fade_progress = (pygame.time.get_ticks() - memory.fade_start_time) / 2000
-                    fade_alpha = max(0, min(180, int(180 * (1 - fade_progress))))
-                    fade_surf = pygame.Surface((orb_r * 2, orb_r * 2), pygame.SRCALPHA)
-                    pygame.draw.circle(fade_surf, (20, 20, 40, fade_alpha),
-                                       (orb_r, orb_r), orb_r)
-                    self.game.screen.blit(fade_surf, (cx - orb_r, cy - orb_r))
\ No newline at end of file
+                    pygame.draw.circle(icon, (*color, alpha), (c, c), r)
+
+            # colored circle
+            dark = tuple(max(0, v - 55) for v in color)
+            pygame.draw.circle(icon, dark, (c, c), orb_r)
+            pygame.draw.circle(icon, color, (c, c), orb_r - 2)
+
+            # cassette on top
+            cw, ch = self.cassette.get_size()
+            icon.blit(self.cassette, (c - cw // 2, c - ch // 2))
+            self.icons[key] = icon
+        return icon
+
+    def fade_cover(self, alpha, orb_r):
+        cover = self.covers.get((alpha, orb_r))
+        if cover is None:
+            cover = pygame.Surface((orb_r * 2, orb_r * 2), pygame.SRCALPHA)
+            pygame.draw.circle(cover, (20, 20, 40, alpha), (orb_r, orb_r), orb_r)
+            self.covers[(alpha, orb_r)] = cover
+        return cover
+
+def register_quality(governor):
+    governor.register("hud_glow", [True, True, True, False], lambda on: setattr(UI, "glow", on))
@@ -0,0 +1,573 @@
+import argparse
+import time
+import numpy as np
+from settings import *
+from headless import HeadlessGame
+from scheduler import tick_past
+
+# batched training environment. one Player per process (with a window) tops out at a few
+# thousand steps a second, this runs N independent agents on one level at once, gym style:
+#
+#   env = VecEnv(agents=1024)
+#   obs = env.reset(seed=0)
+#   obs, rewards, dones, info = env.step(actions)  # actions = int per agent, LEFT|JUMP...
+#
+# the level gets loaded thru Level (same json, same defaults) and every room is flattened
+# in2 arrays once: one solid grid 4 all rooms (room, row, col), plus rects + room index 4
+# orbs, doors, levers, switches, platforms and ghosts. everything an agent owns is a row in
+# a numpy array - position, velocity, ground / coyote / jump buffer, which room its in, its
+# memories (per memory type: the tick it starts fading), which orbs it took, which doors it
+# opened, its levers + switches, and its own copy of every platform. a tick is the same
+# steps as Game.update (player physics, doors, levers, switches, platforms, pickups, ghosts,
+# going thru doors), each one done 4 all agents at once.
+#
+# physics is Player.update with the sweep split in2 an x pass and a y pass against the
+# grid (only the one column / row the leading edge just entered gets checked). the axis that
+# didnt get stopped is then redone with the game's float steps, so 1 agent comes out the
+# same as HeadlessGame down 2 the last bit - tests/test_vecenv.py mashes random buttons
+# thru both and checks every tick (a test, not a proof - other levels can have corners it
+# never tried)
+# platform riding, push out + per agent platform movement work like the game. ghosts
+# patrol on each agent's own clock 4 their room, which only runs while the agent is in it,
+# same as Level only updating the current room (chasers patrol 2, theres no flow field per
+# agent). entity state is dense over the whole
+# level, so its meant 4 puzzle sized levels, not stressgen monsters
+#
+# agents that die or run out of steps get reset on the spot, like gym vector envs do
+
+LEFT, RIGHT, JUMP, INTERACT = 1, 2, 4, 8  # action bits, JUMP = space pressed this step
+NUM_ACTIONS = 16
+MEMORY_NAMES = sorted(MEMORY_TYPES)
+NEVER = np.iinfo(np.int64).max // 4
+DEATH_Y = 800  # same as Player.check_death
+GHOST_SIZE = (50, 60)
+GHOST_PERIOD_LIMIT = FPS * 600  # patrols that never repeat just loop after this many ticks
+OBS_FIELDS = ("x", "y", "vx", "vy", "on_ground", "room") + tuple(f"has_{name}" for name in MEMORY_NAMES)
+
+REWARDS = {
+    "orb": 1.0,  # per memory picked up
+    "door": 1.0,  # per door opened
+    "room": 5.0,  # first time in each room
+    "death": -5.0,
+    "step": 0.0,
+}
+
+
+def rect_edges(rects):
+    """(n, 4) left, top, right, bottom from pygame rects."""
+    return np.array([(r.left, r.top, r.right, r.bottom) for r in rects], np.float64).reshape(-1, 4)
+
+
+def patrol_table(ghost):
+    # every x the ghost's patrol goes thru, til it comes back 2 where it started
+    x, right = ghost.pos.x, ghost.moving_right
+    start = (x, right)
+    xs = []
+    while len(xs) < GHOST_PERIOD_LIMIT:
+        if right:
+            x += ghost.speed
+            if x >= ghost.patrol_right:
+                right = False
+        else:
+            x -= ghost.speed
+            if x <= ghost.patrol_left:
+                right = True
+        xs.append(int(x))
+        if (x, right) == start:
+            break
+    return [xs[-1]] + xs[:-1]  # table[t % period] = x after t updates
+
+
+class VecEnv:
+    def __init__(self, agents=256, level_path=None, level_number=1, max_steps=FPS * 60,
+                 reset_on_death=True, rewards=None, seed=None):
+        self.n = agents
+        self.max_steps = max_steps
+        self.reset_on_death = reset_on_death
+        self.rewards = dict(REWARDS, **(rewards or {}))
+        self.rng = np.random.default_rng(seed)
+        self.load(HeadlessGame(level_path, level_number).level)
+        self.reset()
+
+    # --- the level, flattened once ---
+
+    def load(self, level):
+        self.room_names = list(level.rooms)
+        index = {name: i for i, name in enumerate(self.room_names)}
+        rooms = [level.build_room(name) for name in self.room_names]
+        self.start_room = index[level.current_room]
+        self.spawn = level.player_start_pos
+
+        cells = [cell for room in rooms for cell in room.tile_grid]
+        cols = max((x for x, y in cells), default=0) + 1
+        rows = max((y for x, y in cells), default=0) + 1
+        self.solid = np.zeros((len(rooms), rows + 1, cols + 1), bool)  # +1 = empty border 4 clipping 2
+        for r, room in enumerate(rooms):
+            for x, y in room.tile_grid:
+                self.solid[r, y, x] = True
+
+        def entities(group):
+            found = [(r, entity) for r, room in enumerate(rooms) for entity in getattr(room, group)]
+            return np.array([r for r, _ in found], np.int64), [entity for _, entity in found]
+
+        memory = {name: i for i, name in enumerate(MEMORY_NAMES)}
+
+        def needs(things):
+            return np.array([memory[t.required_memory] if t.required_memory else -1 for t in things], np.int64)
+
+        self.orb_room, orbs = entities("memory_orbs")
+        self.orb_rect = rect_edges([orb.rect for orb in orbs])
+        self.orb_type = np.array([memory[orb.memory_type] for orb in orbs], np.int64)
+        self.orb_duration = np.array([-1 if orb.duration is None else orb.duration for orb in orbs], np.int64)
+
+        self.door_room, doors = entities("doors")
+        self.door_rect = rect_edges([door.rect for door in doors])
+        self.door_zone = rect_edges([door.rect.inflate(60, 60) for door in doors])
+        self.door_need = needs(doors)
+        self.door_target = np.array([index.get(door.target_room, -1) for door in doors], np.int64)
+        self.door_to = np.array([(door.target_x, door.target_y) for door in doors], np.float64).reshape(-1, 2)
+        self.door_ms = np.array([door.open_duration for door in doors], np.int64)
+
+        self.plat_room, platforms = entities("platforms")
+        self.plat_size = np.array([p.rect.size for p in platforms], np.int64).reshape(-1, 2)
+        # every platform's baked path (paths.py) end 2 end, platform p's frame f is row base[p] + f
+        self.plat_period = np.array([p.path.period for p in platforms], np.int64)
+        self.plat_base = np.cumsum(self.plat_period) - self.plat_period
+        self.plat_path = np.array([spot for p in platforms for spot in p.path.points], np.int64).reshape(-1, 2)
+        self.plat_active = np.array([p.active for p in platforms], bool)
+
+        # levers then switches, in the order Level.update runs them: (index, room, zone, need,
+        # action, platforms it hits)
+        self.levers = []
+        for kind in ("levers", "switches"):
+            rooms_of, things = entities(kind)
+            for r, thing in zip(rooms_of, things):
+                targets = np.flatnonzero((self.plat_room == r) &
+                                         np.array([p.id == thing.target_id for p in platforms], bool))
+                need = memory[thing.required_memory] if getattr(thing, "required_memory", None) else -1
+                self.levers.append((len(self.levers), r, rect_edges([thing.rect.inflate(40, 40)])[0], need,
+                                    thing.action, targets))
+
+        self.ghost_room, ghosts = entities("enemies")
+        tables = [patrol_table(ghost) for ghost in ghosts]
+        self.ghost_period = np.array([len(t) for t in tables], np.int64)
+        self.ghost_x = np.zeros((len(ghosts), max(self.ghost_period, default=1)), np.int64)
+        for g, table in enumerate(tables):
+            self.ghost_x[g, :len(table)] = table
+        self.ghost_y = np.array([ghost.rect.y for ghost in ghosts], np.int64)
+
+    # --- episodes ---
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        n, rooms = self.n, len(self.room_names)
+        self.x = np.zeros(n)
+        self.y = np.zeros(n)
+        self.vx = np.zeros(n)
+        self.vy = np.zeros(n)
+        self.on_ground = np.zeros(n, bool)
+        self.coyote = np.zeros(n, np.int64)
+        self.jump_buffer = np.zeros(n, np.int64)
+        self.riding = np.full(n, -1, np.int64)
+        self.dead = np.zeros(n, bool)
+        self.respawn_at = np.full(n, NEVER, np.int64)
+        self.room = np.zeros(n, np.int64)
+        self.ticks = np.zeros(n, np.int64)
+        self.held = np.zeros((n, len(MEMORY_NAMES)), np.int64)  # tick each memory type starts fading
+        self.taken = np.zeros((n, len(self.orb_room)), bool)
+        self.open_at = np.zeros((n, len(self.door_room)), np.int64)
+        self.arrival = np.zeros((n, len(self.door_room)), bool)
+        self.pulled = np.zeros((n, len(self.levers)), bool)
+        self.plat_on = np.zeros((n, len(self.plat_room)), bool)
+        self.plat_frame = np.zeros((n, len(self.plat_room)), np.int64)
+        self.plat_x = np.zeros((n, len(self.plat_room)), np.int64)
+        self.plat_y = np.zeros((n, len(self.plat_room)), np.int64)
+        self.plat_dx = np.zeros((n, len(self.plat_room)), np.int64)
+        self.plat_dy = np.zeros((n, len(self.plat_room)), np.int64)
+        self.visited = np.zeros((n, rooms), bool)
+        self.room_ticks = np.zeros((n, rooms), np.int64)  # ticks spent in each room, 4 ghosts
+        self.returns = np.zeros(n)
+        self.restart(np.ones(n, bool))
+        return self.observe()
+
+    def restart(self, agents):
+        """Fresh episode 4 the agents in the mask."""
+        self.x[agents], self.y[agents] = self.spawn
+        self.vx[agents] = self.vy[agents] = 0
+        self.on_ground[agents] = False
+        self.coyote[agents] = self.jump_buffer[agents] = 0
+        self.riding[agents] = -1
+        self.dead[agents] = False
+        self.respawn_at[agents] = NEVER
+        self.room[agents] = self.start_room
+        self.ticks[agents] = 0
+        self.room_ticks[agents] = 0
+        self.held[agents] = 0
+        self.taken[agents] = False
+        self.open_at[agents] = NEVER
+        self.arrival[agents] = False
+        self.pulled[agents] = False
+        self.plat_on[agents] = self.plat_active
+        self.plat_frame[agents] = 0
+        self.plat_x[agents] = self.plat_path[self.plat_base, 0]
+        self.plat_y[agents] = self.plat_path[self.plat_base, 1]
+        self.plat_dx[agents] = self.plat_dy[agents] = 0
+        self.visited[agents] = False
+        self.visited[agents, self.start_room] = True
+        self.returns[agents] = 0
+
+    def sample_actions(self):
+        return self.rng.integers(0, NUM_ACTIONS, self.n)
+
+    def observe(self):
+        has = self.ticks[:, None] < self.held
+        return np.column_stack((self.x, self.y, self.vx, self.vy, self.on_ground, self.room, has)).astype(np.float32)
+
+    # --- one tick 4 everyone ---
+
+    def step(self, actions):
+        actions = np.asarray(actions)
+        alive = ~self.dead
+        interacting = alive & (actions & INTERACT > 0)
+
+        # space pressed: jump now, or remember it 4 a few ticks (Player.handle_event)
+        pressed = alive & (actions & JUMP > 0)
+        can = self.on_ground | (self.coyote > 0)
+        self.jump(pressed & can)
+        self.jump_buffer[pressed & ~can] = JUMP_BUFFER_FRAMES
+
+        self.ticks += 1
+        self.room_ticks[np.arange(len(self.room)), self.room] += 1  # only the room ur in moves
+        if not self.reset_on_death:
+            self.respawn(self.ticks >= self.respawn_at)
+            alive = ~self.dead
+        now = self.ticks * 1000 // FPS
+
+        # --- Player.update ---
+        buffered = alive & (self.jump_buffer > 0)
+        can = self.on_ground | (self.coyote > 0)
+        self.jump(buffered & can)
+        self.jump_buffer[buffered & ~can] -= 1
+
+        self.vx[:] = 0
+        self.vx[alive & (actions & LEFT > 0)] = -PLAYER_SPEED
+        self.vx[alive & (actions & (LEFT | RIGHT) == RIGHT)] = PLAYER_SPEED
+        self.vy[alive] += PLAYER_GRAVITY
+
+        riding = alive & (self.riding >= 0)
+        if riding.any():
+            plat = np.maximum(self.riding, 0)
+            rows = np.arange(self.n)
+            self.move(np.where(riding, self.plat_dx[rows, plat], 0), np.where(riding, self.plat_dy[rows, plat], 0),
+                      self.riding)
+        self.on_ground[alive] = False
+        self.riding[alive] = -1
+        self.move(np.where(alive, self.vx, 0), np.where(alive, self.vy, 0), np.full(self.n, -1))
+
+        self.coyote = np.where(self.on_ground, COYOTE_FRAMES, np.maximum(self.coyote - 1, 0))
+        died = alive & (self.y > DEATH_Y)
+
+        # --- Level.update ---
+        left, top = np.trunc(self.x), np.trunc(self.y)  # player.rect
+        right, bottom = left + PLAYER_SIZE[0], top + PLAYER_SIZE[1]
+        has = self.ticks[:, None] < self.held
+
+        rewards = np.full(self.n, self.rewards["step"])
+        opened = self.open_doors(interacting, has, now, left, top, right, bottom)
+        rewards += opened * self.rewards["door"]
+        self.pull_levers(interacting, has, left, top, right, bottom)
+        self.move_platforms()
+
+        # pickups
+        grab = (~self.taken & (self.orb_room == self.room[:, None]) & alive[:, None] &
+                overlap(left, top, right, bottom, self.orb_rect))
+        if grab.any():
+            self.taken |= grab
+            fades = np.where(self.orb_duration < 0, NEVER, tick_past(now[:, None] + self.orb_duration))
+            for kind in range(len(MEMORY_NAMES)):
+                mine = grab & (self.orb_type == kind)
+                self.held[:, kind] = np.maximum(self.held[:, kind], np.where(mine, fades, 0).max(axis=1, initial=0))
+            rewards += grab.sum(axis=1) * self.rewards["orb"]
+
+        # ghosts
+        if len(self.ghost_room):
+            clock = self.room_ticks[:, self.ghost_room]
+            gx = self.ghost_x[np.arange(len(self.ghost_room)), clock % self.ghost_period]
+            gy = self.ghost_y
+            touched = ((self.ghost_room == self.room[:, None]) & (left[:, None] < gx + GHOST_SIZE[0]) &
+                       (right[:, None] > gx) & (top[:, None] < gy + GHOST_SIZE[1]) & (bottom[:, None] > gy))
+            died |= alive & ~died & touched.any(axis=1)
+
+        rewards += self.go_through_doors(alive, left, top, right, bottom) * self.rewards["room"]
+
+        # deaths + episode ends
+        rewards += died * self.rewards["death"]
+        self.dead |= died
+        if not self.reset_on_death:
+            self.respawn_at[died] = self.ticks[died] + RESPAWN_TICKS
+        self.returns += rewards
+        truncated = self.ticks >= self.max_steps
+        dones = truncated | (died if self.reset_on_death else False)
+        info = {"died": died, "truncated": truncated, "room": self.room.copy(),
+                "episode_return": np.where(dones, self.returns, 0.0), "episode_length": np.where(dones, self.ticks, 0)}
+        if dones.any():
+            self.restart(dones)
+        return self.observe(), rewards, dones, info
+
+    def jump(self, agents):
+        self.vy[agents] = -PLAYER_JUMP_STRENGTH
+        self.on_ground[agents] = False
+        self.jump_buffer[agents] = 0
+        self.coyote[agents] = 0
+
+    def respawn(self, agents):
+        # Player.respawn - back 2 the spawn point, same room, memories kept
+        self.x[agents], self.y[agents] = self.spawn
+        self.vx[agents] = self.vy[agents] = 0
+        self.dead[agents] = False
+        self.on_ground[agents] = False
+        self.jump_buffer[agents] = self.coyote[agents] = 0
+        self.respawn_at[agents] = NEVER
+
+    # --- physics ---
+
+    def move(self, dx, dy, ignore):
+        # the tile grid only gets checked at the row / column the leading edge moves in2, so
+        # a sweep cant cover a whole tile - split the (rare) huge moves up
+        self.push_out(ignore)
+        far = max(np.abs(dx).max(initial=0), np.abs(dy).max(initial=0))
+        parts = max(1, int(np.ceil(far / (TILE_SIZE - 1))))
+        if parts == 1:
+            self.sweep(dx, dy, ignore)
+            return
+        x0, y0 = self.x, self.y
+        free = np.ones(self.n, bool)
+        for _ in range(parts):
+            free &= self.sweep(dx / parts, dy / parts, ignore)
+        # nothing in the way: one add, like the game, not parts of them
+        self.x = np.where(free, x0 + dx, self.x)
+        self.y = np.where(free, y0 + dy, self.y)
+
+    def platforms(self, ignore):
+        """Platform edges (n, p) + which ones count 4 each agent."""
+        left, top = self.plat_x, self.plat_y
+        right, bottom = left + self.plat_size[:, 0], top + self.plat_size[:, 1]
+        usable = (self.plat_room == self.room[:, None]) & (np.arange(len(self.plat_room)) != ignore[:, None])
+        return left, top, right, bottom, usable
+
+    def solid_at(self, rows, cols):
+        rows = np.clip(rows, -1, self.solid.shape[1] - 1)  # -1 = the empty border
+        cols = np.clip(cols, -1, self.solid.shape[2] - 1)
+        return self.solid[self.room, rows, cols]
+
+    def edge(self, pos, move, size):
+        """Cell the leading edge moves in2 (if it does) + where the box stops if that cell is solid."""
+        ahead = move > 0
+        old = np.where(ahead, np.ceil((pos + size) / TILE_SIZE) - 1, np.floor(pos / TILE_SIZE)).astype(np.int64)
+        # ending up exactly against the next cell counts as a hit 2 (sweep_aabb takes toi == 1),
+        # thats what lands u when a fall ends right on the floor
+        new = np.where(ahead, np.floor((pos + move + size) / TILE_SIZE),
+                       np.ceil((pos + move) / TILE_SIZE) - 1).astype(np.int64)
+        entered = np.where(ahead, new > old, new < old) & (move != 0)
+        stop = np.where(ahead, new * TILE_SIZE - size, (new + 1) * TILE_SIZE)
+        return new, entered, stop
+
+    def blocked(self, entered, new, when, pos, move, size, column):
+        # any solid cell along the entered row / column, over the span the box covers - except
+        # ones the box has already slid past by the time (when, 0..1) it gets there
+        first = np.floor(pos / TILE_SIZE).astype(np.int64)
+        last = (np.ceil((pos + size) / TILE_SIZE) - 1).astype(np.int64)
+        end = pos + move
+        hit = np.zeros(self.n, bool)
+        for k in range(-(-size // TILE_SIZE) + 1):
+            cell = first + k
+            near, far = cell * TILE_SIZE, (cell + 1) * TILE_SIZE
+            stays = (end < far) & (end + size > near)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                leaves = np.where(move > 0, (far - pos) / move, (near - pos - size) / move)
+                gone = ~stays & (leaves - when <= 1e-6)
+            cells = self.solid_at(cell, new) if column else self.solid_at(new, cell)
+            hit |= entered & (cell <= last) & ~gone & cells
+        return hit
+
+    def sweep(self, dx, dy, ignore):
+        # Player.move_and_collide, one axis at a time but both from the starting spot - a wall
+        # stops x while u still rise / fall past it, a floor stops y while u still walk off it
+        w, h = PLAYER_SIZE
+        x0, y0 = self.x, self.y
+        col, in_x, stop_x = self.edge(x0, dx, w)
+        row, in_y, stop_y = self.edge(y0, dy, h)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            when_x = (stop_x - x0) / dx  # how far thru the move the edge gets 2 the new cell
+            when_y = (stop_y - y0) / dy
+        hit_x = self.blocked(in_x, col, when_x, y0, dy, h, True)
+        hit_y = self.blocked(in_y, row, when_y, x0, dx, w, False)
+
+        # the one cell neither pass looked at: the corner. whichever axis reached it last is
+        # the side that hit, same as the sweep's entry time
+        corner = in_x & in_y & ~hit_x & ~hit_y & self.solid_at(row, col)
+        hit_x |= corner & (when_x > when_y)
+        hit_y |= corner & (when_x <= when_y)
+        x1 = np.where(hit_x, stop_x, x0 + dx)
+        y1 = np.where(hit_y, stop_y, y0 + dy)
+        landed = hit_y & (dy > 0)
+        bonked = hit_y & (dy < 0)
+
+        if len(self.plat_room):
+            pl, pt, pr, pb, usable = self.platforms(ignore)
+            x, y, mx, my = x0[:, None], y0[:, None], dx[:, None], dy[:, None]
+            # the other axis is checked where the box is when it touches, not where it started,
+            # so clipping a platform's corner mid jump lets u past like the real sweep does
+            with np.errstate(divide="ignore", invalid="ignore"):
+                t = np.where(mx > 0, (pl - w - x) / mx, (pr - x) / mx)
+                at = np.where(my == 0, y, y + my * t)
+            beside = usable & (at < pb) & (at + h > pt)
+            stop_r = beside & (mx > 0) & (x + w <= pl) & (x1[:, None] + w > pl)
+            stop_l = beside & (mx < 0) & (x >= pr) & (x1[:, None] < pr)
+            x1 = np.minimum(x1, np.where(stop_r, pl - w, np.inf).min(axis=1))
+            x1 = np.maximum(x1, np.where(stop_l, pr, -np.inf).max(axis=1))
+
+            with np.errstate(divide="ignore", invalid="ignore"):
+                t = np.where(my > 0, (pt - h - y) / my, (pb - y) / my)
+                at = np.where(mx == 0, x, x + mx * t)
+            above = usable & (at < pr) & (at + w > pl)
+            land = above & (my > 0) & (y + h <= pt) & (y1[:, None] + h > pt)
+            tops = np.where(land, pt - h, np.inf)
+            on_plat = tops.min(axis=1) < y1
+            y1 = np.where(on_plat, tops.min(axis=1), y1)
+            self.riding = np.where(on_plat, tops.argmin(axis=1), np.where(landed, -1, self.riding))
+            landed |= on_plat
+            under = above & (my < 0) & (y >= pb) & (y1[:, None] < pb)
+            ceiling = np.where(under, pb, -np.inf).max(axis=1)
+            bonked |= ceiling > y1
+            y1 = np.maximum(y1, ceiling)
+
+        # the game moves up 2 the first hit + then the rest (2 float adds, not 1), so the axis
+        # that didnt stop gets there the same way or it drifts by an ulp every tick
+        free_x, free_y = x0 + dx, y0 + dy
+        stopped_x, stopped_y = x1 != free_x, y1 != free_y
+        with np.errstate(divide="ignore", invalid="ignore"):
+            toi_x = np.where(dx > 0, ((x1 + w) - (x0 + w)) / dx, (x1 - x0) / dx)  # sweep_aabb's entry
+            toi_y = np.where(dy > 0, ((y1 + h) - (y0 + h)) / dy, (y1 - y0) / dy)
+            y1 = np.where(stopped_x & ~stopped_y, (y0 + dy * toi_x) + dy * (1 - toi_x), y1)
+            x1 = np.where(stopped_y & ~stopped_x, (x0 + dx * toi_y) + dx * (1 - toi_y), x1)
+
+        self.x, self.y = x1, y1
+        self.vy[landed | bonked] = 0
+        self.on_ground |= landed
+        return ~stopped_x & ~stopped_y
+
+    def push_out(self, ignore):
+        # platforms that moved in2 us shove us out the shallow way (Player.push_out)
+        if not len(self.plat_room):
+            return
+        w, h = PLAYER_SIZE
+        pl, pt, pr, pb, usable = self.platforms(ignore)
+        x, y = self.x[:, None], self.y[:, None]
+        over_x = np.minimum(x + w, pr) - np.maximum(x, pl)
+        over_y = np.minimum(y + h, pb) - np.maximum(y, pt)
+        inside = usable & (over_x > 1e-6) & (over_y > 1e-6)
+        if not inside.any():
+            return
+        sideways = over_x < over_y
+        push_x = np.where(x + w / 2 < (pl + pr) / 2, -over_x, over_x)
+        push_y = np.where(y + h / 2 < (pt + pb) / 2, -over_y, over_y)
+        self.x = self.x + np.where(inside & sideways, push_x, 0).sum(axis=1)
+        self.y = self.y + np.where(inside & ~sideways, push_y, 0).sum(axis=1)
+
+    # --- the puzzle bits ---
+
+    def open_doors(self, interacting, has, now, left, top, right, bottom):
+        # Door.update - a closed door the agent is at + has the memory 4 starts swinging open
+        here = self.door_room == self.room[:, None]
+        allowed = (self.door_need < 0) | has[:, np.maximum(self.door_need, 0)]
+        start = (here & interacting[:, None] & (self.open_at == NEVER) & allowed &
+                 overlap(left, top, right, bottom, self.door_zone))
+        if start.any():
+            self.open_at = np.where(start, tick_past(now[:, None] + self.door_ms), self.open_at)
+        return start.sum(axis=1)
+
+    def pull_levers(self, interacting, has, left, top, right, bottom):
+        # levers + switches, one at a time so they hit platforms in the same order as the game
+        for i, room, zone, need, action, targets in self.levers:
+            pull = interacting & ~self.pulled[:, i] & (self.room == room)
+            if need >= 0:
+                pull &= has[:, need]
+            pull &= (left < zone[2]) & (right > zone[0]) & (top < zone[3]) & (bottom > zone[1])
+            if not pull.any():
+                continue
+            self.pulled[:, i] |= pull
+            who = np.flatnonzero(pull)[:, None]
+            if action == "activate":
+                self.plat_on[who, targets] = True
+            elif action == "deactivate":
+                self.plat_on[who, targets] = False
+            elif action == "toggle":
+                self.plat_on[who, targets] = ~self.plat_on[who, targets]
+
+    def move_platforms(self):
+        # MovingPlatform.update, 4 the platforms in each agent's room
+        if not len(self.plat_room):
+            return
+        moving = self.plat_on & (self.plat_room == self.room[:, None])
+        self.plat_frame = np.where(moving, (self.plat_frame + 1) % self.plat_period, self.plat_frame)
+        spot = self.plat_path[self.plat_base + self.plat_frame]
+        x, y = spot[..., 0], spot[..., 1]
+        self.plat_dx, self.plat_dy = x - self.plat_x, y - self.plat_y
+        self.plat_x, self.plat_y = x, y
+
+    def go_through_doors(self, alive, left, top, right, bottom):
+        # the door u came in thru doesnt count til u step off it, then open doors take u places
+        here = self.door_room == self.room[:, None]
+        touching = here & overlap(left, top, right, bottom, self.door_rect)
+        self.arrival &= touching
+        through = (alive[:, None] & touching & (self.ticks[:, None] >= self.open_at) & ~self.arrival &
+                   (self.door_target >= 0))
+        going = through.any(axis=1)
+        if not going.any():
+            return np.zeros(self.n)
+
+        who = np.flatnonzero(going)
+        door = through[who].argmax(axis=1)  # first one, like the break in Level.update
+        self.room[who] = self.door_target[door]
+        self.x[who], self.y[who] = self.door_to[door, 0], self.door_to[door, 1]
+        self.riding[who] = -1
+        left, top = np.trunc(self.x[who]), np.trunc(self.y[who])
+        self.arrival[who] = ((self.door_room == self.room[who, None]) &
+                             overlap(left, top, left + PLAYER_SIZE[0], top + PLAYER_SIZE[1], self.door_rect))
+        new = np.zeros(self.n, bool)
+        new[who] = ~self.visited[who, self.room[who]]
+        self.visited[who, self.room[who]] = True
+        return new
+
+
+def overlap(left, top, right, bottom, rects):
+    """(agents, rects) colliderect between each agent's rect + a (k, 4) edge table."""
+    return ((left[:, None] < rects[:, 2]) & (right[:, None] > rects[:, 0]) &
+            (top[:, None] < rects[:, 3]) & (bottom[:, None] > rects[:, 1]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="run random agents thru a level 2 measure VecEnv throughput")
+    parser.add_argument("level", nargs="?", help="level json (default: level 1)")
+    parser.add_argument("--agents", type=int, default=1024)
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    env = VecEnv(args.agents, args.level, seed=args.seed)
+    env.reset(seed=args.seed)
+    episodes, total = 0, 0.0
+    started = time.perf_counter()
+    for _ in range(args.steps):
+        obs, rewards, dones, info = env.step(env.sample_actions())
+        episodes += int(dones.sum())
+        total += float(info["episode_return"].sum())
+    took = time.perf_counter() - started
+    print(f"{args.agents} agents x {args.steps} steps in {took:.2f}s = {args.agents * args.steps / took:,.0f} "
+          f"agent-steps/s, {episodes} episodes finished (avg return {total / max(1, episodes):.2f})")
+
+
+if __name__ == "__main__":
+    main()